@@ -0,0 +1,7 @@
+-- Idempotency key for practice_notes written through the local note queue
+-- (note_queue.py). Retried batches upsert on client_id and skip rows that already landed.
+ALTER TABLE practice_notes
+ADD COLUMN IF NOT EXISTS client_id UUID;
+
+CREATE UNIQUE INDEX IF NOT EXISTS practice_notes_client_id_key
+ON practice_notes (client_id);
@@ -0,0 +1,27 @@
+-- Composite indexes for the app's practice_notes / rounds reads.
+-- Each one matches a filter + sort the app actually issues, so those reads stay
+-- index scans as history grows. Checked by scripts/check_query_plans.py.
+
+-- hole_bundle.last_note: WHERE layout = ? AND hole_number = ? ORDER BY created_at DESC LIMIT 1
+CREATE INDEX IF NOT EXISTS practice_notes_hole_recent_idx
+ON practice_notes (layout, hole_number, created_at DESC);
+
+-- hole_bundle.round_notes: WHERE round_id = ? AND hole_number = ? ORDER BY created_at
+-- resume_session next hole: MAX(hole_number) WHERE round_id = ?
+-- Export notes / embedded practice_notes(*) / "Cancel Round" delete: WHERE round_id = ?
+-- (also serves the foreign key check when a round is deleted)
+CREATE INDEX IF NOT EXISTS practice_notes_round_hole_idx
+ON practice_notes (round_id, hole_number, created_at);
+
+-- Parquet shot export: keyset pages ORDER BY created_at, id
+CREATE INDEX IF NOT EXISTS practice_notes_created_id_idx
+ON practice_notes (created_at, id);
+
+-- resume_session latest round: WHERE user_id = ? ORDER BY created_at DESC LIMIT 1
+CREATE INDEX IF NOT EXISTS rounds_user_recent_idx
+ON rounds (user_id, created_at DESC);
+
+-- Export round list (ORDER BY created_at DESC LIMIT 20) and bulk export keyset
+-- pages (ORDER BY created_at DESC, id DESC)
+CREATE INDEX IF NOT EXISTS rounds_created_id_idx
+ON rounds (created_at DESC, id DESC);
@@ -0,0 +1,16 @@
+-- Hole-relative wind.
+-- scripts/process_geometry.py stores each hole's throwing bearing (tee -> basket,
+-- degrees clockwise from north); the app splits the live wind along it and logs
+-- the components with every note.
+ALTER TABLE hole_geometry
+ADD COLUMN IF NOT EXISTS bearing_deg DOUBLE PRECISION;
+
+ALTER TABLE practice_notes
+ADD COLUMN IF NOT EXISTS headwind_mph REAL,   -- > 0 into the thrower's face, < 0 tailwind
+ADD COLUMN IF NOT EXISTS crosswind_mph REAL;  -- > 0 from the right
+
+-- hole_geometry is now part of the app's cached course index (see course_version.sql)
+DROP TRIGGER IF EXISTS hole_geometry_bump_version ON hole_geometry;
+CREATE TRIGGER hole_geometry_bump_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON hole_geometry
+FOR EACH STATEMENT EXECUTE FUNCTION bump_course_version();
@@ -0,0 +1,4 @@
+-- wind_gust is logged by the app and filled by scripts/backfill_weather.py
+-- but was missing from add_weather_columns.sql.
+ALTER TABLE practice_notes
+ADD COLUMN IF NOT EXISTS wind_gust INTEGER;
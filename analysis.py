@@ -0,0 +1,72 @@
+import pandas as pd
+
+# Helpers for the Analysis tab.
+# Inputs are rows from the practice_hole_stats / practice_disc_stats views
+# (see analysis_stats.sql), so the work here scales with holes and discs, not shots.
+
+
+def summarize_hole_stats(hole_rows):
+    """Combine per-hole rows into the tab's headline numbers.
+
+    Returns {"avg_strokes", "entries", "strokes_by_hole"}; avg_strokes is None
+    when no strokes have been logged.
+    """
+    entries = sum(r['entries'] for r in hole_rows)
+    stroke_count = sum(r['stroke_count'] for r in hole_rows)
+    stroke_total = sum(r['stroke_total'] for r in hole_rows)
+
+    strokes_by_hole = pd.Series(
+        {r['hole_number']: r['avg_strokes'] for r in hole_rows if r['stroke_count']},
+        dtype="float64"
+    ).sort_index()
+    strokes_by_hole.index.name = "hole_number"
+
+    return {
+        "avg_strokes": stroke_total / stroke_count if stroke_count else None,
+        "entries": entries,
+        "strokes_by_hole": strokes_by_hole
+    }
+
+
+def rating_by_disc(disc_rows):
+    """Average confidence per disc as a Series indexed by disc name."""
+    series = pd.Series(
+        {r['disc_used']: r['avg_rating'] for r in disc_rows if r['rating_count']},
+        dtype="float64"
+    ).sort_index()
+    series.index.name = "disc_used"
+    return series
+
+
+# --- RAW NOTES ---
+# pandas equivalents of the practice_hole_stats / practice_disc_stats views, for offline
+# analysis of exported shots (e.g. the Parquet export) and the load-test fake backend.
+
+def _notes_frame(notes, columns):
+    frame = notes if isinstance(notes, pd.DataFrame) else pd.DataFrame(list(notes))
+    # Missing columns come back empty; the caller's frame is never modified
+    return frame.reindex(columns=columns)
+
+
+def _stats_rows(grouped, value, count_col, total_col, avg_col):
+    stats = grouped[value].agg(entries="size", count="count", total="sum", avg="mean").reset_index()
+    stats["total"] = stats["total"].astype("int64")
+    # AVG over no values is NULL in SQL
+    stats["avg"] = stats["avg"].astype(object).where(stats["count"] > 0, None)
+    return stats.rename(columns={"count": count_col, "total": total_col, "avg": avg_col}).to_dict("records")
+
+
+def hole_stats_from_notes(notes):
+    """practice_hole_stats rows computed from raw practice_notes (DataFrame or list of rows)."""
+    frame = _notes_frame(notes, ["layout", "hole_number", "strokes"])
+    frame = frame.astype({"strokes": "float64"})
+    return _stats_rows(frame.groupby(["layout", "hole_number"], dropna=False, sort=True), "strokes",
+                       "stroke_count", "stroke_total", "avg_strokes")
+
+
+def disc_stats_from_notes(notes):
+    """practice_disc_stats rows computed from raw practice_notes; notes without a disc are excluded."""
+    frame = _notes_frame(notes, ["layout", "disc_used", "result_rating"])
+    frame = frame[frame["disc_used"].notna()].astype({"result_rating": "float64"})
+    return _stats_rows(frame.groupby(["layout", "disc_used"], dropna=False, sort=True), "result_rating",
+                       "rating_count", "rating_total", "avg_rating")
@@ -0,0 +1,33 @@
+-- Pre-aggregated stats for the Analysis tab.
+-- The app reads O(holes + discs) rows per layout instead of every practice note.
+-- security_invoker keeps practice_notes RLS in force for whoever queries the view.
+
+-- Per-hole stroke stats
+CREATE OR REPLACE VIEW practice_hole_stats
+WITH (security_invoker = true) AS
+SELECT
+    layout,
+    hole_number,
+    COUNT(*) AS entries,
+    COUNT(strokes) AS stroke_count,
+    COALESCE(SUM(strokes), 0) AS stroke_total,
+    AVG(strokes)::DOUBLE PRECISION AS avg_strokes
+FROM practice_notes
+GROUP BY layout, hole_number;
+
+-- Per-disc confidence stats (notes without a disc are excluded, as in the old pandas groupby)
+CREATE OR REPLACE VIEW practice_disc_stats
+WITH (security_invoker = true) AS
+SELECT
+    layout,
+    disc_used,
+    COUNT(*) AS entries,
+    COUNT(result_rating) AS rating_count,
+    COALESCE(SUM(result_rating), 0) AS rating_total,
+    AVG(result_rating)::DOUBLE PRECISION AS avg_rating
+FROM practice_notes
+WHERE disc_used IS NOT NULL
+GROUP BY layout, disc_used;
+
+GRANT SELECT ON practice_hole_stats TO authenticated;
+GRANT SELECT ON practice_disc_stats TO authenticated;
@@ -0,0 +1,31 @@
+-- Bulk weather write-back for scripts/backfill_weather.py.
+-- Takes a jsonb array of {id, temperature, wind_speed, wind_gust, wind_direction}
+-- and fills only the weather columns that are still NULL, in one UPDATE. Other
+-- columns (and weather a user set since the scan) are left alone.
+--
+-- Returns the number of notes updated.
+CREATE OR REPLACE FUNCTION backfill_note_weather(p_rows JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY INVOKER
+SET search_path = public
+AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    UPDATE practice_notes n
+    SET temperature = COALESCE(n.temperature, r.temperature),
+        wind_speed = COALESCE(n.wind_speed, r.wind_speed),
+        wind_gust = COALESCE(n.wind_gust, r.wind_gust),
+        wind_direction = COALESCE(n.wind_direction, r.wind_direction)
+    FROM jsonb_to_recordset(p_rows) AS r(id INTEGER, temperature INTEGER, wind_speed INTEGER, wind_gust INTEGER, wind_direction VARCHAR(10))
+    WHERE n.id = r.id
+      AND (n.temperature IS NULL OR n.wind_speed IS NULL OR n.wind_gust IS NULL OR n.wind_direction IS NULL);
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$;
+
+-- Maintenance only (the script uses the service key)
+REVOKE EXECUTE ON FUNCTION backfill_note_weather(JSONB) FROM PUBLIC, anon, authenticated;
@@ -0,0 +1,37 @@
+# Helpers for the sidebar Bag Check.
+# Pure functions over `discs` rows so the grouping/formatting can be reused and timed
+# without Streamlit.
+
+BAG_CATEGORIES = {
+    "Putters": ["Putter", "Approach"],
+    "Mids": ["Midrange"],
+    "Fairways": ["Fairway Driver"],
+    "Distance": ["Distance Driver"]
+}
+
+
+def flight_numbers(disc):
+    """Speed/Glide/Turn/Fade, with whole numbers shown without decimals (5.0 -> 5)."""
+    flight_nums = f"{disc.get('speed')}/{disc.get('glide')}/{disc.get('turn')}/{disc.get('fade')}"
+    return flight_nums.replace('.0', '')
+
+
+def group_bag(discs, allowed=None):
+    """Bag Check lines per category: [(category, [caption, ...]), ...] in BAG_CATEGORIES order.
+
+    `allowed` is an optional collection of disc names (the active round's bag).
+    Every category is returned, even when empty, as the sidebar shows all headers.
+    """
+    if allowed is not None:
+        allowed = set(allowed)
+        discs = [d for d in discs if d['name'] in allowed]
+
+    # One pass over the bag; discs keep their bag order within a category
+    groups = {cat_name: [] for cat_name in BAG_CATEGORIES}
+    category_of = {t: cat_name for cat_name, types in BAG_CATEGORIES.items() for t in types}
+    for d in discs:
+        cat_name = category_of.get(d.get('disc_type'))
+        if cat_name:
+            # Format: Name (Plastic) - Speed/Glide/Turn/Fade
+            groups[cat_name].append(f"• **{d['name']}** ({d.get('plastic', 'N/A')}) | *{flight_numbers(d)}*")
+    return list(groups.items())
@@ -0,0 +1,37 @@
+import pytest
+
+from analysis import disc_stats_from_notes, hole_stats_from_notes, rating_by_disc, summarize_hole_stats
+from synthetic import make_notes_frame
+
+# The Analysis pipeline over raw notes (the pandas twin of analysis_stats.sql),
+# from a season of practice to a league's worth of history.
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda n: f"{n}rows")
+def notes(request):
+    return make_notes_frame(request.param)
+
+
+def test_hole_stats_from_notes(benchmark, notes):
+    rows = benchmark.pedantic(hole_stats_from_notes, args=(notes,), rounds=5, iterations=1, warmup_rounds=1)
+    assert sum(r['entries'] for r in rows) == len(notes)
+
+
+def test_disc_stats_from_notes(benchmark, notes):
+    rows = benchmark.pedantic(disc_stats_from_notes, args=(notes,), rounds=5, iterations=1, warmup_rounds=1)
+    assert sum(r['entries'] for r in rows) == notes['disc_used'].notna().sum()
+
+
+@pytest.mark.threshold(0.35)
+def test_analysis_tab_summary(benchmark):
+    # What the tab does per rerun with the view rows: 36 holes, 25 discs
+    notes = make_notes_frame(10_000)
+    hole_rows, disc_rows = hole_stats_from_notes(notes), disc_stats_from_notes(notes)
+
+    def summarize():
+        return summarize_hole_stats(hole_rows), rating_by_disc(disc_rows)
+
+    summary, ratings = benchmark(summarize)
+    assert summary['entries'] == len(notes) and len(ratings) == 25
@@ -0,0 +1,14 @@
+from bag import group_bag
+
+# Sidebar Bag Check: grouping and caption formatting, run on every full rerun.
+
+
+def test_group_bag(benchmark, bag):
+    groups = benchmark(group_bag, bag)
+    assert sum(len(lines) for _, lines in groups) == len(bag)
+
+
+def test_group_bag_round_filter(benchmark, bag):
+    allowed = [d['name'] for d in bag[::2]]
+    groups = benchmark(group_bag, bag, allowed)
+    assert sum(len(lines) for _, lines in groups) == len(allowed)
@@ -0,0 +1,50 @@
+import io
+import json
+
+import pytest
+
+from history_export import shots_to_table, write_ndjson_gz, write_shots_parquet
+from synthetic import make_rounds
+
+# Export serialization: the per-round JSON download, gzip NDJSON for the bulk
+# export and the Parquet shot table, on locally generated rounds.
+
+COURSE_HOLES = {
+    (layout, h): {"par": 3, "Attack_Hole": "Yes" if h % 3 == 0 else "No", "suggested_disc": "Envy"}
+    for layout in ("Shorts (Round 1)", "Longs (Round 2)") for h in range(1, 19)
+}
+
+
+def shots(rounds):
+    """Flatten rounds into shot rows with the embedded round, as SHOT_COLUMNS selects them."""
+    return [dict(note, rounds={"name": r['name'], "created_at": r['created_at'], "ended_at": r['ended_at']})
+            for r in rounds for note in r['practice_notes']]
+
+
+def test_round_json(benchmark, rounds_page):
+    # The History tab's single-round download
+    selected = rounds_page[0]
+    round_data = {"round_info": {k: v for k, v in selected.items() if k != "practice_notes"},
+                  "shots": selected['practice_notes']}
+    text = benchmark(json.dumps, round_data, indent=2, default=str)
+    assert '"shots"' in text
+
+
+def test_ndjson_gz_page(benchmark, rounds_page):
+    count = benchmark(lambda: write_ndjson_gz(rounds_page, io.BytesIO()))
+    assert count == len(rounds_page)
+
+
+@pytest.mark.threshold(0.30)
+def test_shots_to_table_page(benchmark):
+    notes = shots(make_rounds(56))[:1000]   # One SHOT_PAGE_SIZE page
+    table = benchmark(shots_to_table, notes, COURSE_HOLES)
+    assert table.num_rows == 1000
+
+
+def test_shots_parquet_10k(benchmark):
+    notes = shots(make_rounds(556))[:10_000]
+    pages = [notes[i:i + 1000] for i in range(0, len(notes), 1000)]
+    rows = benchmark.pedantic(lambda: write_shots_parquet(pages, COURSE_HOLES, io.BytesIO()),
+                              rounds=5, iterations=1, warmup_rounds=1)
+    assert rows == 10_000
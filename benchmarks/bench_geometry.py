@@ -0,0 +1,31 @@
+import pytest
+
+from synthetic import make_geometry_rows
+from geodesy import inverse
+from process_geometry import compute_geometry, point_key
+
+# process_geometry's per-batch work (Vincenty inverse + payload building),
+# for one course's worth of rows and for a large backfill batch.
+
+
+def elevation_cache(rows):
+    cache = {}
+    for i, row in enumerate(rows):
+        cache[point_key(row['tee_lat'], row['tee_lon'])] = 100.0 + i % 7
+        cache[point_key(row['basket_lat'], row['basket_lon'])] = 95.0 + i % 5
+    return cache
+
+
+@pytest.mark.parametrize("n", [36, 10_000], ids=lambda n: f"{n}rows")
+def test_compute_geometry(benchmark, n):
+    rows = make_geometry_rows(n)
+    elevations = elevation_cache(rows)
+    payloads = benchmark(compute_geometry, rows, elevations)
+    assert len(payloads) == n and payloads[0]['elevation_change_feet'] is not None
+
+
+def test_vincenty_inverse_100k(benchmark):
+    rows = make_geometry_rows(100_000)
+    args = [[r[k] for r in rows] for k in ("tee_lat", "tee_lon", "basket_lat", "basket_lon")]
+    distance, bearing = benchmark(inverse, *args)
+    assert len(distance) == len(rows)
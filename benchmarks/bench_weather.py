@@ -0,0 +1,32 @@
+import pytest
+
+from weather import get_wind_direction, parse_current, wind_table
+
+# Per-rerun weather work: compass conversion, the Open-Meteo payload transform and
+# the per-hole wind lookup table built with the course index.
+
+PAYLOAD = {
+    "current": {
+        "time": "2025-06-01T14:00", "interval": 900, "temperature_2m": 78.4,
+        "apparent_temperature": 80.1, "wind_speed_10m": 9.6, "wind_direction_10m": 247.0,
+        "wind_gusts_10m": 17.2
+    }
+}
+
+
+@pytest.mark.threshold(0.30)
+def test_get_wind_direction(benchmark):
+    degrees = [d * 0.5 for d in range(720)]
+    result = benchmark(lambda: [get_wind_direction(d) for d in degrees])
+    assert result[0] == "N" and result[180] == "E"
+
+
+@pytest.mark.threshold(0.30)
+def test_parse_current(benchmark):
+    result = benchmark(parse_current, PAYLOAD)
+    assert result["wind_dir"] == "WSW"
+
+
+def test_wind_table(benchmark):
+    result = benchmark(wind_table, 135.0)
+    assert len(result) == 16
@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+from datetime import datetime, timezone
+
+# Compare a pytest-benchmark JSON run against benchmarks/baseline.json.
+# (pytest and pytest-benchmark: pip install -r requirements-dev.txt)
+# A benchmark regresses when its median is slower than the baseline median by more
+# than its threshold (@pytest.mark.threshold in the bench file, else DEFAULT_THRESHOLD).
+#
+#   pytest benchmarks --benchmark-json=run.json
+#   python benchmarks/compare.py run.json            # exit 1 on any regression
+#   python benchmarks/compare.py run.json --update   # accept run.json as the new baseline
+#
+# Several runs (run1.json run2.json ...) are combined by taking each benchmark's median
+# across them, which keeps one unusually fast or slow run from setting the baseline.
+#
+# Medians are only comparable on the machine that produced the baseline (recorded
+# under "machine" in baseline.json); regenerate it with --update on the reference
+# machine after an intentional change. Without a baseline, the run becomes one.
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.25    # 25% slower median
+
+
+def load_run(path):
+    with open(path) as f:
+        run = json.load(f)
+    machine = run.get('machine_info', {})
+    return {
+        "machine": {
+            "cpu": machine.get('cpu', {}).get('brand_raw'),
+            "python": machine.get('python_version'),
+            "system": f"{machine.get('system')} {machine.get('release')}"
+        },
+        "benchmarks": {
+            b['fullname']: {
+                "median": b['stats']['median'],
+                "threshold": b.get('extra_info', {}).get('threshold', DEFAULT_THRESHOLD)
+            }
+            for b in run['benchmarks']
+        }
+    }
+
+
+def combine_runs(runs):
+    """One run from several: each benchmark's median of the runs' medians."""
+    combined = dict(runs[0], benchmarks={})
+    for name, first in runs[0]['benchmarks'].items():
+        medians = [r['benchmarks'][name]['median'] for r in runs if name in r['benchmarks']]
+        combined['benchmarks'][name] = dict(first, median=statistics.median(medians))
+    return combined
+
+
+def write_baseline(run, path):
+    baseline = dict(run, generated_at=datetime.now(timezone.utc).isoformat())
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(run, baseline):
+    """Rows of (name, baseline_median, run_median, change, threshold, status)."""
+    rows = []
+    for name, current in sorted(run['benchmarks'].items()):
+        base = baseline['benchmarks'].get(name)
+        if base is None:
+            rows.append((name, None, current['median'], None, current['threshold'], "new"))
+            continue
+        change = current['median'] / base['median'] - 1
+        status = "regressed" if change > current['threshold'] else "ok"
+        rows.append((name, base['median'], current['median'], change, current['threshold'], status))
+    for name in sorted(set(baseline['benchmarks']) - set(run['benchmarks'])):
+        rows.append((name, baseline['benchmarks'][name]['median'], None, None, None, "missing"))
+    return rows
+
+
+def fmt_ms(seconds):
+    return f"{seconds * 1000:10.3f} ms" if seconds is not None else " " * 13
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check a pytest-benchmark run against the stored baseline.")
+    parser.add_argument("runs", nargs="+", metavar="run", help="JSON written by pytest --benchmark-json (one or more).")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update", action="store_true", help="Replace the baseline with this run.")
+    args = parser.parse_args()
+
+    run = combine_runs([load_run(path) for path in args.runs])
+    if args.update:
+        write_baseline(run, args.baseline)
+        print(f"💾 Baseline updated: {len(run['benchmarks'])} benchmarks -> {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        # First run on a fresh checkout: this run becomes the baseline
+        write_baseline(run, args.baseline)
+        print(f"⚠️ No baseline at {args.baseline}; recorded this run ({len(run['benchmarks'])} benchmarks) as the baseline. "
+              f"Nothing was compared.")
+        sys.exit(0)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    if baseline.get('machine') != run['machine']:
+        print(f"⚠️ Baseline machine {baseline.get('machine')} differs from this run's {run['machine']}; "
+              f"timings are not directly comparable.")
+
+    icons = {"ok": "✅", "regressed": "❌", "new": "🆕", "missing": "⚠️"}
+    rows = compare(run, baseline)
+    for name, base, current, change, threshold, status in rows:
+        detail = f"{change:+7.1%} (limit +{threshold:.0%})" if change is not None else status
+        print(f"{icons[status]} {name:<70} {fmt_ms(base)} -> {fmt_ms(current)}  {detail}")
+
+    regressions = [r for r in rows if r[5] == "regressed"]
+    if regressions:
+        print(f"❌ {len(regressions)} of {len(rows)} benchmarks regressed past their threshold.")
+        sys.exit(1)
+    print(f"✅ No regressions ({len(rows)} benchmarks).")
@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+# Shared setup for the micro-benchmarks (see synthetic.py for the generated inputs).
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, "scripts"))
+
+from synthetic import make_discs, make_rounds  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _record_threshold(request):
+    """Copy @pytest.mark.threshold into the benchmark's extra_info for compare.py."""
+    marker = request.node.get_closest_marker("threshold")
+    if marker and "benchmark" in request.fixturenames:
+        request.getfixturevalue("benchmark").extra_info["threshold"] = marker.args[0]
+
+
+@pytest.fixture(scope="session")
+def bag():
+    return make_discs(25)
+
+
+@pytest.fixture(scope="session")
+def rounds_page():
+    return make_rounds(25)
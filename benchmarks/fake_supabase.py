@@ -0,0 +1,358 @@
+import copy
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from analysis import hole_stats_from_notes, disc_stats_from_notes
+
+# In-process stand-in for Supabase, used by the load test.
+# Implements the slice of the PostgREST builder / auth API that tracker.py,
+# history_export.py and note_queue.py use, over plain dicts. Row-level security
+# is modelled by tagging rounds and notes with the inserting user and filtering
+# reads by it, so concurrent sessions only see their own data (as in production).
+# Every request sleeps `latency` seconds outside the lock to stand in for the
+# network round trip.
+
+LAYOUTS = ["Shorts (Round 1)", "Longs (Round 2)"]
+DISC_TYPES = ["Putter", "Approach", "Midrange", "Fairway Driver", "Distance Driver"]
+OWNED_TABLES = {"rounds", "practice_notes"}
+
+# (table, embedded resource) -> (local column, remote column, one row?)
+EMBEDS = {
+    ("rounds", "practice_notes"): ("id", "round_id", False),
+    ("practice_notes", "rounds"): ("round_id", "id", True),
+}
+
+KEYSET_RE = re.compile(r'created_at\.(gt|lt)\."([^"]+)",and\(created_at\.eq\."[^"]+",id\.(?:gt|lt)\.(.+)\)')
+EMBED_RE = re.compile(r'(\w+)\(')
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class Response:
+    def __init__(self, data):
+        self.data = data
+        self.count = None
+
+
+class FakeDB:
+    """Tables, users and RPCs shared by every fake client in the process."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.tables = {}
+        self.users = {}           # refresh token -> user id
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def sleep(self):
+        with self.lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def add_user(self):
+        """Register a user and return a refresh token that logs them in."""
+        user_id = str(uuid.uuid4())
+        token = f"refresh-{user_id}"
+        with self.lock:
+            self.users[token] = user_id
+        return token
+
+    # --- VIEWS (analysis_stats.sql) ---
+    def view(self, name, notes):
+        if name == "practice_hole_stats":
+            return hole_stats_from_notes(notes)
+        return disc_stats_from_notes(notes)
+
+
+def seed(db):
+    """Course data for both layouts plus a small bag; no rounds or notes."""
+    axioms = [{"short_name": f"Axiom {n}", "title": f"Axiom {n} title", "corollary": "Execute."} for n in "I II III IV V".split()]
+    db.tables["course_version"] = [{"id": 1, "version": 1}]
+    db.tables["course_metadata"] = [
+        {"hole_number": h, "layout": layout, "protocol_notes": "", "par": 4 if h in (4, 12) else 3,
+         "suggested_disc": "Envy", "Attack_Hole": "Yes" if h % 3 == 0 else "No", "shot_shape": "Flat",
+         "execution_notes": "Center of the fairway", "mindset_axioms": axioms[h % len(axioms)]}
+        for layout in LAYOUTS for h in range(1, 19)
+    ]
+    db.tables["hole_geometry"] = [
+        {"id": i, "hole_number": h, "layout": layout, "tee_lat": 38.2510 + h * 1e-4, "tee_lon": -77.5480,
+         "basket_lat": 38.2512 + h * 1e-4, "basket_lon": -77.5470, "distance_feet": 280.0 + h * 5,
+         "elevation_change_feet": -3.0, "bearing_deg": (h * 20) % 360, "verified": True}
+        for i, (layout, h) in enumerate((layout, h) for layout in LAYOUTS for h in range(1, 19))
+    ]
+    db.tables["discs"] = [
+        {"id": i, "name": f"Disc {i}", "plastic": "Star", "speed": 2 + i, "glide": 4, "turn": -1, "fade": 1,
+         "disc_type": DISC_TYPES[i % len(DISC_TYPES)]}
+        for i in range(12)
+    ]
+    db.tables["rounds"] = []
+    db.tables["practice_notes"] = []
+    return db
+
+
+class Query:
+    """Chainable builder; execute() applies the recorded operation under the DB lock."""
+
+    def __init__(self, db, table, user_id):
+        self.db = db
+        self.table = table
+        self.user_id = user_id
+        self.columns = "*"
+        self.filters = []
+        self.orders = []
+        self.row_limit = None
+        self.op = "select"
+        self.payload = None
+        self.upsert_key = None
+        self._negate = False
+
+    @property
+    def not_(self):
+        self._negate = True
+        return self
+
+    def _filter(self, fn):
+        negate, self._negate = self._negate, False
+        self.filters.append((lambda r: not fn(r)) if negate else fn)
+        return self
+
+    def select(self, columns="*", **kwargs):
+        self.columns = columns
+        return self
+
+    def eq(self, column, value):
+        return self._filter(lambda r: r.get(column) == value)
+
+    def neq(self, column, value):
+        return self._filter(lambda r: r.get(column) != value)
+
+    def gt(self, column, value):
+        return self._filter(lambda r: r.get(column) is not None and r.get(column) > value)
+
+    def lt(self, column, value):
+        return self._filter(lambda r: r.get(column) is not None and r.get(column) < value)
+
+    def in_(self, column, values):
+        return self._filter(lambda r: r.get(column) in values)
+
+    def is_(self, column, value):
+        return self._filter(lambda r: r.get(column) is None)
+
+    def or_(self, expression):
+        # Only the keyset condition built by history_export.iter_pages is supported
+        match = KEYSET_RE.fullmatch(expression)
+        if not match:
+            raise NotImplementedError(f"or_ filter not supported by the fake: {expression}")
+        op, created_at, row_id = match.groups()
+        cursor = (created_at, str(row_id))
+        if op == "gt":
+            return self._filter(lambda r: (r['created_at'], str(r['id'])) > cursor)
+        return self._filter(lambda r: (r['created_at'], str(r['id'])) < cursor)
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self.row_limit = count
+        return self
+
+    def insert(self, payload):
+        self.op, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict=None, ignore_duplicates=False, **kwargs):
+        self.op, self.payload, self.upsert_key = "insert", payload, on_conflict
+        return self
+
+    def update(self, payload):
+        self.op, self.payload = "update", payload
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    def execute(self):
+        self.db.sleep()
+        with self.db.lock:
+            return Response(copy.deepcopy(self._apply()))
+
+    # --- EXECUTION ---
+    def _visible(self, table):
+        rows = self.db.tables.setdefault(table, [])
+        if table in OWNED_TABLES:
+            return [r for r in rows if r.get('user_id') == self.user_id]
+        return rows
+
+    def _apply(self):
+        if self.table in ("practice_hole_stats", "practice_disc_stats"):
+            rows = self.db.view(self.table, self._visible("practice_notes"))
+        else:
+            rows = self._visible(self.table)
+
+        if self.op == "insert":
+            return self._insert()
+
+        matched = [r for r in rows if all(f(r) for f in self.filters)]
+        if self.op == "update":
+            for row in matched:
+                row.update(self.payload)
+            return matched
+        if self.op == "delete":
+            ids = {id(r) for r in matched}
+            self.db.tables[self.table] = [r for r in self.db.tables[self.table] if id(r) not in ids]
+            return matched
+
+        for column, desc in reversed(self.orders):
+            matched.sort(key=lambda r: (r.get(column) is None, str(r.get(column))), reverse=desc)
+        if self.row_limit is not None:
+            matched = matched[:self.row_limit]
+        return [self._embed(r) for r in matched]
+
+    def _insert(self):
+        table = self.db.tables.setdefault(self.table, [])
+        rows = self.payload if isinstance(self.payload, list) else [self.payload]
+        existing = {r.get(self.upsert_key) for r in table} if self.upsert_key else set()
+        inserted = []
+        for row in rows:
+            if self.upsert_key and row.get(self.upsert_key) in existing:
+                continue
+            row = dict(row)
+            row.setdefault('id', str(uuid.uuid4()))
+            row.setdefault('created_at', now_iso())
+            if self.table in OWNED_TABLES:
+                row['user_id'] = self.user_id
+            table.append(row)
+            inserted.append(row)
+        return inserted
+
+    def _embed(self, row):
+        resources = [name for name in EMBED_RE.findall(self.columns) if (self.table, name) in EMBEDS]
+        if not resources:
+            return row
+        row = dict(row)
+        for name in resources:
+            local, remote, one = EMBEDS[(self.table, name)]
+            related = [r for r in self._visible(name) if r.get(remote) == row.get(local)]
+            row[name] = (related[0] if related else None) if one else related
+        return row
+
+
+class FakeClient:
+    """table()/rpc() for one user, matching supabase_pool.UserClient."""
+
+    def __init__(self, db, user_id=None):
+        self.db = db
+        self.user_id = user_id
+
+    def table(self, name):
+        return Query(self.db, name, self.user_id)
+
+    from_ = table
+
+    def rpc(self, fn, params=None):
+        rpc = getattr(self, f"_rpc_{fn}")
+        client = self
+
+        class Call:
+            def execute(self):
+                client.db.sleep()
+                with client.db.lock:
+                    return Response(copy.deepcopy(rpc(params or {})))
+        return Call()
+
+    def _rows(self, table):
+        rows = self.db.tables.get(table, [])
+        if table in OWNED_TABLES:
+            return [r for r in rows if r.get('user_id') == self.user_id]
+        return rows
+
+    # --- RPCS (resume_session.sql, hole_bundle.sql) ---
+    def _rpc_resume_session(self, params):
+        rounds = self._rows("rounds")
+        round_cookie = params.get('p_round_id')
+        if round_cookie:
+            for r in rounds:
+                if str(r['id']) == round_cookie:
+                    return {"round": r, "source": "cookie", "cookie_found": True,
+                            "ended": bool(r.get('ended_at')), "resumable": False, "next_hole": None}
+        if not rounds:
+            return {"round": None, "source": None, "cookie_found": not round_cookie,
+                    "ended": False, "resumable": False, "next_hole": None}
+        latest = max(rounds, key=lambda r: r['created_at'])
+        recent = datetime.now(timezone.utc) - datetime.fromisoformat(latest['created_at']) < timedelta(hours=3)
+        holes = [n['hole_number'] for n in self._rows("practice_notes") if n.get('round_id') == latest['id']]
+        return {"round": latest, "source": "recent", "cookie_found": not round_cookie,
+                "ended": bool(latest.get('ended_at')), "resumable": recent and not latest.get('ended_at'),
+                "next_hole": min(max(holes) + 1, 18) if holes and recent else None}
+
+    def _rpc_hole_bundle(self, params):
+        layout, hole, round_id = params['p_layout'], params['p_hole_number'], params.get('p_round_id')
+        protocol = next((r for r in self._rows("course_metadata") if r['layout'] == layout and r['hole_number'] == hole), None)
+        notes = [n for n in self._rows("practice_notes") if n.get('layout') == layout and n.get('hole_number') == hole]
+        geometry = next((g for g in self._rows("hole_geometry") if g['layout'] == layout and g['hole_number'] == hole), None)
+        round_notes = [n for n in notes if round_id and n.get('round_id') == round_id]
+        return {
+            "protocol": protocol,
+            "last_note": max(notes, key=lambda n: n['created_at']) if notes else None,
+            "geometry": geometry,
+            "round_notes": sorted(round_notes, key=lambda n: n['created_at'])
+        }
+
+
+class FakeAuth:
+    """Session refresh / sign-in against FakeDB.users; tokens never expire."""
+
+    def __init__(self, db):
+        self.db = db
+        self.admin = SimpleNamespace(sign_out=lambda jwt: None)
+
+    def _session(self, user_id):
+        user = SimpleNamespace(id=user_id)
+        session = SimpleNamespace(
+            user=user,
+            access_token=f"access-{user_id}",
+            refresh_token=f"refresh-{user_id}",
+            expires_at=time.time() + 3600
+        )
+        return SimpleNamespace(user=user, session=session)
+
+    def refresh_session(self, refresh_token):
+        self.db.sleep()
+        user_id = self.db.users.get(refresh_token)
+        if not user_id:
+            raise ValueError("Invalid Refresh Token")
+        return self._session(user_id)
+
+    def sign_in_with_password(self, credentials):
+        self.db.sleep()
+        raise ValueError("Password sign-in is not supported by the fake; log in via the refresh-token cookie")
+
+
+class FakePool:
+    """Drop-in for supabase_pool.SupabasePool backed by one FakeDB."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def client(self, access_token=None):
+        user_id = access_token[len("access-"):] if access_token else None
+        return FakeClient(self.db, user_id)
+
+    def auth(self):
+        return FakeAuth(self.db)
+
+    def stats(self):
+        return {"requests": self.db.requests, "connections_opened": 0, "reused": self.db.requests,
+                "reuse_rate": 1.0 if self.db.requests else 0.0, "errors": 0, "avg_ms": self.db.latency * 1000}
+
+    def close(self):
+        pass
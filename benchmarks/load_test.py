@@ -0,0 +1,330 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Load test: N concurrent AppTest sessions driving tracker.py against the in-process
+# fake Supabase (fake_supabase.py), one worker process per concurrent session.
+# Each session logs in from a refresh-token cookie, starts a round, logs 18 holes with
+# Save & Next, opens Analysis and runs the bulk export. Reports rerun latency
+# percentiles, Supabase requests per script run (from the app's own instrumentation)
+# and RSS, and writes the numbers as JSON for tracking over time.
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+TRACKER_PATH = os.path.join(REPO_ROOT, "tracker.py")
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+DEFAULT_SESSIONS = 10
+DEFAULT_LATENCY_MS = 20       # Simulated Supabase round trip
+DEFAULT_TIMEOUT = 60          # Seconds per AppTest run
+RSS_SAMPLE_INTERVAL = 0.2
+HOLES = 18
+
+# What WeatherService.get() returns: the parse_current() fields plus age_seconds
+WEATHER_SNAPSHOT = {
+    "temp": 68, "feels_like": 66, "wind_speed": 9, "wind_gust": 15, "wind_dir": "NW",
+    "age_seconds": 120
+}
+
+
+def rss_mb():
+    """Resident set size of this process in MB (Linux /proc, else peak RSS)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class RssSampler(threading.Thread):
+    """Track peak RSS while the sessions run."""
+
+    def __init__(self):
+        super().__init__(name="rss-sampler", daemon=True)
+        self.peak = rss_mb()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(RSS_SAMPLE_INTERVAL):
+            self.peak = max(self.peak, rss_mb())
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.peak = max(self.peak, rss_mb())
+
+
+class CookieJar:
+    """Stand-in for stx.CookieManager: cookies live in the session's own session_state."""
+
+    def __init__(self, key=None):
+        import streamlit as st
+        self._state = st.session_state
+
+    def _jar(self):
+        if "bench_cookies" not in self._state:
+            self._state["bench_cookies"] = {}
+        return self._state["bench_cookies"]
+
+    def get(self, cookie):
+        return self._jar().get(cookie)
+
+    def get_all(self, key=None):
+        return dict(self._jar())
+
+    def set(self, cookie, val, key=None, **kwargs):
+        self._jar()[cookie] = val
+
+    def delete(self, cookie, key=None):
+        self._jar().pop(cookie, None)
+
+
+def install_fakes(db):
+    """Point tracker.py at the fake backend: Supabase pool, weather feed and cookies."""
+    import extra_streamlit_components
+    import supabase_pool
+    import weather
+    from fake_supabase import FakePool
+
+    os.environ.setdefault("SUPABASE_URL", "http://fake-supabase.local")
+    os.environ.setdefault("SUPABASE_KEY", "fake-anon-key")
+    supabase_pool.SupabasePool = lambda url, key, **kwargs: FakePool(db)
+    weather.WeatherService.start = lambda self: None
+    weather.WeatherService.get = lambda self, wait=0: dict(WEATHER_SNAPSHOT)
+    extra_streamlit_components.CookieManager = CookieJar
+
+
+def percentiles(values):
+    if not values:
+        return {"count": 0}
+    ms = np.array(values) * 1000
+    return {
+        "count": len(values),
+        "mean": round(float(ms.mean()), 1),
+        "p50": round(float(np.percentile(ms, 50)), 1),
+        "p95": round(float(np.percentile(ms, 95)), 1),
+        "p99": round(float(np.percentile(ms, 99)), 1),
+        "max": round(float(ms.max()), 1)
+    }
+
+
+class SessionError(Exception):
+    pass
+
+
+def run_session(index, refresh_token, timeout, seed):
+    """Drive one scripted session; returns per-step timings and request counts."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + index)
+    at = AppTest.from_file(TRACKER_PATH, default_timeout=timeout)
+    at.session_state["bench_cookies"] = {"mks_refresh_token": refresh_token}
+    steps = []
+
+    def calls_so_far():
+        if "supabase_calls" not in at.session_state:
+            return 0, 0
+        stats = at.session_state["supabase_calls"].summary()
+        return stats['calls'], stats['reruns']
+
+    def step(name, action):
+        calls_before, runs_before = calls_so_far()
+        started = time.perf_counter()
+        action()
+        elapsed = time.perf_counter() - started
+        if at.exception:
+            raise SessionError(f"{name}: {at.exception[0].value}")
+        calls_after, runs_after = calls_so_far()
+        steps.append({"step": name, "seconds": elapsed, "requests": calls_after - calls_before, "script_runs": runs_after - runs_before})
+
+    def button(label):
+        matches = [b for b in at.button if b.label == label]
+        if not matches:
+            raise SessionError(f"button not found: {label}")
+        return matches[0]
+
+    step("login", at.run)
+    if not at.session_state["logged_in"]:
+        raise SessionError("cookie login failed")
+
+    step("start_round", lambda: button("Start Round").click().run())
+    for hole in range(1, HOLES + 1):
+        at.session_state["current_score_input"] = rng.randint(2, 5)
+        if at.text_area:
+            at.text_area[0].set_value(f"Load test hole {hole}")
+        step("save_next", lambda: button("✅ Save & Next").click().run())
+
+    # AppTest doesn't send the tab selection back, so it is set before every run on that tab
+    at.session_state["main_tab"] = "📊 Analysis"
+    step("analysis", at.run)
+    at.session_state["main_tab"] = "📂 History & Export"
+    step("export", at.run)
+    at.session_state["main_tab"] = "📂 History & Export"
+    step("bulk_export", lambda: button("Generate Bulk Export").click().run())
+
+    total_calls, total_runs = calls_so_far()
+    return {"session": index, "steps": steps, "requests": total_calls, "script_runs": total_runs}
+
+
+# --- WORKER PROCESSES ---
+# AppTest installs a process-global mock Runtime for each run, so two sessions can't run
+# at once in one process. Each concurrent session gets its own worker process instead;
+# process-wide caches (st.cache_resource, the course index) are therefore per worker.
+_worker = {}
+
+
+def init_worker(latency_ms, timeout, seed, warmup, queue_dir):
+    """Per-process setup: fake backend, its own note queue file, then unmeasured warm-up sessions."""
+    from fake_supabase import FakeDB, seed as seed_db
+
+    os.environ["MKS_QUEUE_PATH"] = os.path.join(queue_dir, f"queue-{os.getpid()}.sqlite3")
+    db = seed_db(FakeDB(latency=latency_ms / 1000))
+    install_fakes(db)
+    _worker.update(db=db, timeout=timeout, seed=seed)
+
+    # Imports, caches and the note queue are warm afterwards, so measured sessions
+    # (and their RSS growth) describe steady state, not a cold server
+    for i in range(warmup):
+        run_session(-1 - i, db.add_user(), timeout, seed)
+
+
+def run_measured_session(index):
+    """One measured session in this worker; never raises, failures are reported."""
+    db = _worker['db']
+    requests_before = db.requests
+    rss_before = rss_mb()
+    sampler = RssSampler()
+    sampler.start()
+    started = time.time()
+    try:
+        result = run_session(index, db.add_user(), _worker['timeout'], _worker['seed'])
+    except Exception as e:
+        result = {"session": index, "error": f"{type(e).__name__}: {e}", "traceback": traceback.format_exc(limit=3)}
+    finally:
+        sampler.stop()
+    result.update(
+        started=started,
+        finished=time.time(),
+        backend_requests=db.requests - requests_before,
+        rss_before=rss_before,
+        rss_peak=sampler.peak
+    )
+    return result
+
+
+def run_load_test(sessions, concurrency, latency_ms, timeout, seed, warmup=1):
+    queue_dir = tempfile.mkdtemp(prefix="mks-load-")
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=concurrency, mp_context=context, initializer=init_worker,
+                             initargs=(latency_ms, timeout, seed, warmup, queue_dir)) as executor:
+        outcomes = list(executor.map(run_measured_session, range(sessions)))
+
+    results = [r for r in outcomes if 'error' not in r]
+    failures = [{k: r[k] for k in ("session", "error", "traceback")} for r in outcomes if 'error' in r]
+    wall = max(r['finished'] for r in outcomes) - min(r['started'] for r in outcomes) if outcomes else 0.0
+
+    all_steps = [s for r in results for s in r['steps']]
+    by_step = {}
+    for s in all_steps:
+        by_step.setdefault(s['step'], []).append(s)
+
+    total_requests = sum(r['requests'] for r in results)
+    total_runs = sum(r['script_runs'] for r in results)
+    growth = [r['rss_peak'] - r['rss_before'] for r in outcomes]
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "sessions": sessions,
+            "concurrency": concurrency,
+            "latency_ms": latency_ms,
+            "holes_per_session": HOLES,
+            "seed": seed,
+            "warmup_sessions": warmup,
+            "python": platform.python_version()
+        },
+        "wall_seconds": round(wall, 2),
+        "completed_sessions": len(results),
+        "failed_sessions": failures,
+        "latency_ms": percentiles([s['seconds'] for s in all_steps]),
+        "steps": {
+            name: dict(percentiles([s['seconds'] for s in steps]),
+                       requests_per_step=round(sum(s['requests'] for s in steps) / len(steps), 2))
+            for name, steps in by_step.items()
+        },
+        "requests": {
+            "total": total_requests,
+            "script_runs": total_runs,
+            "per_script_run": round(total_requests / total_runs, 2) if total_runs else None,
+            "backend_total": sum(r['backend_requests'] for r in outcomes)
+        },
+        "rss_mb": {
+            "worker_baseline": round(min(r['rss_before'] for r in outcomes), 1) if outcomes else None,
+            "worker_peak": round(max(r['rss_peak'] for r in outcomes), 1) if outcomes else None,
+            "per_session": round(sum(growth) / len(growth), 2) if growth else None,
+            "per_session_max": round(max(growth), 2) if growth else None
+        }
+    }
+
+
+def print_summary(report):
+    config = report['config']
+    print(f"🏌️ {report['completed_sessions']}/{config['sessions']} sessions "
+          f"(concurrency {config['concurrency']}, {config['latency_ms']} ms simulated latency) in {report['wall_seconds']}s")
+    lat = report['latency_ms']
+    if lat['count']:
+        print(f"⏱️ Reruns: p50 {lat['p50']} ms | p95 {lat['p95']} ms | p99 {lat['p99']} ms | max {lat['max']} ms ({lat['count']} interactions)")
+    for name, s in report['steps'].items():
+        print(f"   > {name:<12} p50 {s['p50']:>8} ms | p95 {s['p95']:>8} ms | {s['requests_per_step']} requests")
+    req = report['requests']
+    print(f"📡 Requests: {req['total']} over {req['script_runs']} script runs ({req['per_script_run']} per run), "
+          f"{req['backend_total']} at the backend incl. background flushes")
+    rss = report['rss_mb']
+    print(f"🧠 RSS: {rss['per_session']} MB growth per session (max {rss['per_session_max']}), "
+          f"workers {rss['worker_baseline']} MB warm -> {rss['worker_peak']} MB peak")
+    for failure in report['failed_sessions']:
+        print(f"❌ Session {failure['session']}: {failure['error']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive concurrent scripted tracker.py sessions against an in-process fake Supabase.")
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS, help="Number of scripted sessions.")
+    parser.add_argument("--concurrency", type=int, help="Sessions running at once (default: all of them).")
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_LATENCY_MS, help="Simulated round trip per Supabase request.")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Seconds allowed per script run.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured sessions to run first.")
+    parser.add_argument("--output", help="Write the JSON report to this file ('-' for stdout).")
+    args = parser.parse_args()
+
+    # Workers must find their functions under an importable name: AppTest replaces __main__
+    from load_test import run_load_test, print_summary
+
+    report = run_load_test(args.sessions, args.concurrency or args.sessions, args.latency_ms, args.timeout, args.seed, args.warmup)
+    print_summary(report)
+
+    if args.output == "-":
+        print(json.dumps(report, indent=2))
+    elif args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+
+    sys.exit(1 if report['failed_sessions'] else 0)
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+# Synthetic inputs for the micro-benchmarks: generated from a fixed seed, so the
+# suite runs offline and every run sees the same data.
+
+SEED = 20240601
+LAYOUTS = ["Shorts (Round 1)", "Longs (Round 2)"]
+DISC_TYPES = ["Putter", "Approach", "Midrange", "Fairway Driver", "Distance Driver"]
+COMPASS = ["N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE", "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"]
+LORIELLA = (38.2544, -77.5443)
+
+
+def make_discs(n, seed=SEED):
+    rng = np.random.default_rng(seed)
+    return [
+        {"id": i, "name": f"Disc {i}", "plastic": str(rng.choice(["Star", "Champion", "DX", "ESP"])),
+         "speed": float(rng.integers(2, 14)), "glide": float(rng.integers(1, 7)),
+         "turn": float(rng.integers(-4, 2)), "fade": float(rng.integers(0, 5)),
+         "disc_type": DISC_TYPES[i % len(DISC_TYPES)]}
+        for i in range(n)
+    ]
+
+
+def make_notes_frame(n, seed=SEED):
+    """Synthetic practice_notes as a DataFrame (columns as exported, ~5% missing strokes/discs)."""
+    rng = np.random.default_rng(seed)
+    strokes = rng.integers(2, 7, n).astype("float64")
+    strokes[rng.random(n) < 0.05] = np.nan
+    discs = np.array([f"Disc {i}" for i in range(25)], dtype=object)[rng.integers(0, 25, n)]
+    discs[rng.random(n) < 0.05] = None
+    return pd.DataFrame({
+        "layout": np.array(LAYOUTS, dtype=object)[rng.integers(0, 2, n)],
+        "hole_number": rng.integers(1, 19, n),
+        "strokes": strokes,
+        "disc_used": discs,
+        "result_rating": rng.integers(1, 6, n).astype("float64"),
+    })
+
+
+def make_rounds(n_rounds, holes=18, seed=SEED):
+    """Rounds with embedded practice_notes, shaped like the bulk export's page rows."""
+    rng = np.random.default_rng(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rounds = []
+    for r in range(n_rounds):
+        created = start + timedelta(days=r)
+        layout = LAYOUTS[r % 2]
+        notes = [
+            {"id": r * holes + h, "round_id": f"round-{r}", "hole_number": h, "layout": layout,
+             "disc_used": f"Disc {int(rng.integers(0, 25))}", "strokes": int(rng.integers(2, 7)),
+             "result_rating": int(rng.integers(1, 6)), "notes": "Hyzer to the gap, parked",
+             "temperature": int(rng.integers(40, 95)), "wind_speed": int(rng.integers(0, 25)),
+             "wind_gust": int(rng.integers(0, 35)), "wind_direction": COMPASS[int(rng.integers(0, 16))],
+             "headwind_mph": float(rng.normal(0, 6)), "crosswind_mph": float(rng.normal(0, 6)),
+             "created_at": (created + timedelta(minutes=8 * h)).isoformat()}
+            for h in range(1, holes + 1)
+        ]
+        rounds.append({"id": f"round-{r}", "name": f"{created:%m-%d-%y}-{layout.split(' ')[0]}", "layout": layout,
+                       "selected_discs": [f"Disc {i}" for i in range(12)], "created_at": created.isoformat(),
+                       "ended_at": (created + timedelta(hours=3)).isoformat(), "practice_notes": notes})
+    return rounds
+
+
+def make_geometry_rows(n, seed=SEED):
+    """hole_geometry rows scattered around Loriella Park, with a matching elevation cache."""
+    rng = np.random.default_rng(seed)
+    tee_lat = LORIELLA[0] + rng.uniform(-0.01, 0.01, n)
+    tee_lon = LORIELLA[1] + rng.uniform(-0.01, 0.01, n)
+    basket_lat = tee_lat + rng.uniform(-0.002, 0.002, n)
+    basket_lon = tee_lon + rng.uniform(-0.002, 0.002, n)
+    rows = [
+        {"id": i, "hole_number": i % 18 + 1, "layout": LAYOUTS[i % 2], "geometry_version": 1,
+         "tee_lat": float(tee_lat[i]), "tee_lon": float(tee_lon[i]),
+         "basket_lat": float(basket_lat[i]), "basket_lon": float(basket_lon[i])}
+        for i in range(n)
+    ]
+    return rows
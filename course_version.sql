@@ -0,0 +1,39 @@
+-- Version marker for the static course tables.
+-- The app caches course_metadata + mindset_axioms process-wide and only reloads
+-- them when this number changes, so any edit to those tables must bump it.
+CREATE TABLE IF NOT EXISTS course_version (
+    id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1), -- Single row
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+INSERT INTO course_version (id, version) VALUES (1, 1)
+ON CONFLICT (id) DO NOTHING;
+
+-- Bump once per statement (a bulk re-seed counts as one change)
+CREATE OR REPLACE FUNCTION bump_course_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    UPDATE course_version SET version = version + 1, updated_at = NOW() WHERE id = 1;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS course_metadata_bump_version ON course_metadata;
+CREATE TRIGGER course_metadata_bump_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON course_metadata
+FOR EACH STATEMENT EXECUTE FUNCTION bump_course_version();
+
+DROP TRIGGER IF EXISTS mindset_axioms_bump_version ON mindset_axioms;
+CREATE TRIGGER mindset_axioms_bump_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON mindset_axioms
+FOR EACH STATEMENT EXECUTE FUNCTION bump_course_version();
+
+-- Enable RLS (read-only for the app)
+ALTER TABLE course_version ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Allow auth read" ON course_version;
+CREATE POLICY "Allow auth read" ON course_version FOR SELECT TO authenticated USING (true);
@@ -28,7 +28,7 @@ INSERT INTO discs (name, plastic, weight, notes, speed, glide, turn, fade, disc_
 ('Leopard3', 'Star', '173.5 g', NULL, 7, 5, -2, 1, 'Fairway Driver'),
 ('Firebird', 'Champion', '173.5 g', 'Slightly beat in.', 9, 3, 0, 4, 'Fairway Driver'),
 ('Thunderbird', 'Champion', '173 g', 'Updated weight.', 9, 5, 0, 2, 'Fairway Driver'),
-('TL3', NULL, '173.5 g', 'New disc, haven\'t thrown yet.', 8, 4, -1, 1, 'Fairway Driver'),
+('TL3', NULL, '173.5 g', 'New disc, haven''t thrown yet.', 8, 4, -1, 1, 'Fairway Driver'),
 ('Buzzz', 'ESP FLX', '177 g', 'Borrowed disc, but counting it for the tournament.', 5, 4, -1, 1, 'Midrange'),
 ('Heat', 'ESP', '169 g', 'Updated weight.', 9, 6, -3, 1, 'Fairway Driver'),
 ('Trail', 'Neutron', '170 g', NULL, 10, 5, -1, 1, 'Distance Driver'),
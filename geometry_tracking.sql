@@ -0,0 +1,60 @@
+-- Change tracking for hole_geometry.
+-- Every coordinate change bumps geometry_version and clears the computed columns;
+-- scripts/process_geometry.py writes back processed_version = the version it computed
+-- from. A row is dirty until the two match, so the worker only touches changed holes.
+ALTER TABLE hole_geometry
+ADD COLUMN IF NOT EXISTS geometry_version BIGINT NOT NULL DEFAULT 1,
+ADD COLUMN IF NOT EXISTS processed_version BIGINT;
+
+-- Rows processed before tracking existed count as clean
+UPDATE hole_geometry
+SET processed_version = geometry_version
+WHERE processed_version IS NULL
+  AND distance_feet IS NOT NULL
+  AND bearing_deg IS NOT NULL;
+
+ALTER TABLE hole_geometry
+ADD COLUMN IF NOT EXISTS geometry_dirty BOOLEAN
+GENERATED ALWAYS AS (processed_version IS DISTINCT FROM geometry_version) STORED;
+
+CREATE INDEX IF NOT EXISTS hole_geometry_dirty_idx ON hole_geometry (id) WHERE geometry_dirty;
+
+CREATE OR REPLACE FUNCTION hole_geometry_track_changes()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        IF (NEW.tee_lat, NEW.tee_lon, NEW.basket_lat, NEW.basket_lon)
+           IS DISTINCT FROM (OLD.tee_lat, OLD.tee_lon, OLD.basket_lat, OLD.basket_lon) THEN
+            -- Moved tee/basket: the stored distance is stale
+            NEW.geometry_version := OLD.geometry_version + 1;
+            NEW.distance_feet := NULL;
+            NEW.elevation_change_feet := NULL;
+            NEW.bearing_deg := NULL;
+        ELSE
+            NEW.geometry_version := OLD.geometry_version;
+            IF NEW.processed_version < NEW.geometry_version THEN
+                -- Result computed from coordinates that have since moved: discard it
+                NEW.processed_version := OLD.processed_version;
+                NEW.distance_feet := OLD.distance_feet;
+                NEW.elevation_change_feet := OLD.elevation_change_feet;
+                NEW.bearing_deg := OLD.bearing_deg;
+            END IF;
+        END IF;
+    END IF;
+
+    -- Wake a waiting `process_geometry.py --watch` (delivered on commit)
+    IF NEW.processed_version IS DISTINCT FROM NEW.geometry_version
+       AND NEW.tee_lat IS NOT NULL AND NEW.basket_lat IS NOT NULL THEN
+        PERFORM pg_notify('hole_geometry_dirty', NEW.id::text);
+    END IF;
+
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS hole_geometry_track_changes ON hole_geometry;
+CREATE TRIGGER hole_geometry_track_changes
+BEFORE INSERT OR UPDATE ON hole_geometry
+FOR EACH ROW EXECUTE FUNCTION hole_geometry_track_changes();
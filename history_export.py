@@ -0,0 +1,178 @@
+import gzip
+import io
+import json
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Export helpers for the History & Export tab.
+# Tables are paged with a keyset on (created_at, id) and written incrementally
+# (gzip NDJSON for rounds, Parquet row groups for shots), so memory stays bounded
+# by the page size no matter how much history there is.
+
+EXPORT_PAGE_SIZE = 25       # Rounds per request (each embeds its practice_notes)
+SHOT_PAGE_SIZE = 1000       # Notes per request / Parquet row group (Supabase max-rows default)
+PREVIEW_LINES = 20          # Lines of JSON rendered on screen
+
+SHOT_COLUMNS = "id, round_id, hole_number, layout, disc_used, strokes, result_rating, notes, temperature, wind_speed, wind_gust, wind_direction, headwind_mph, crosswind_mph, created_at, rounds(name, created_at, ended_at)"
+
+# Low-cardinality text is dictionary-encoded (categoricals in pandas)
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+TIMESTAMP = pa.timestamp("us", tz="UTC")
+
+SHOT_SCHEMA = pa.schema([
+    ("note_id", pa.int64()),
+    ("round_id", pa.string()),
+    ("round_name", pa.string()),
+    ("round_started_at", TIMESTAMP),
+    ("round_ended_at", TIMESTAMP),
+    ("created_at", TIMESTAMP),
+    ("layout", CATEGORY),
+    ("hole_number", pa.int16()),
+    ("par", pa.int16()),
+    ("attack_hole", pa.bool_()),
+    ("suggested_disc", CATEGORY),
+    ("disc_used", CATEGORY),
+    ("strokes", pa.int16()),
+    ("result_rating", pa.int8()),
+    ("notes", pa.string()),
+    ("temperature", pa.int16()),
+    ("wind_speed", pa.int16()),
+    ("wind_gust", pa.int16()),
+    ("wind_direction", CATEGORY),
+    ("headwind_mph", pa.float32()),
+    ("crosswind_mph", pa.float32()),
+])
+
+
+def iter_pages(client, table, columns, page_size, desc=False):
+    """Yield pages of rows ordered by (created_at, id).
+
+    Keyset pagination: each page continues strictly after the last
+    (created_at, id) seen, so pages stay stable while new rows are added.
+    """
+    op = "lt" if desc else "gt"
+    cursor = None
+    while True:
+        query = client.table(table)\
+            .select(columns)\
+            .order("created_at", desc=desc)\
+            .order("id", desc=desc)\
+            .limit(page_size)
+        if cursor:
+            created_at, row_id = cursor
+            query = query.or_(f'created_at.{op}."{created_at}",and(created_at.eq."{created_at}",id.{op}.{row_id})')
+
+        page = query.execute().data or []
+        if page:
+            yield page
+
+        if len(page) < page_size:
+            return
+        cursor = (page[-1]['created_at'], page[-1]['id'])
+
+
+def iter_rounds(client, page_size=EXPORT_PAGE_SIZE, columns="*, practice_notes(*)"):
+    """Yield rounds newest-first, one page per request."""
+    for page in iter_pages(client, "rounds", columns, page_size, desc=True):
+        yield from page
+
+
+def write_ndjson_gz(records, fileobj):
+    """Write records as gzip-compressed NDJSON; returns the record count."""
+    count = 0
+    with gzip.GzipFile(fileobj=fileobj, mode="wb") as gz:
+        for record in records:
+            gz.write(json.dumps(record, default=str, separators=(",", ":")).encode("utf-8"))
+            gz.write(b"\n")
+            count += 1
+    return count
+
+
+def export_rounds_ndjson_gz(client, page_size=EXPORT_PAGE_SIZE):
+    """Export every round (with its notes) as gzip NDJSON bytes.
+
+    Returns (payload, round_count). Only one page of rounds is decoded at a
+    time; the only thing that grows with history is the compressed output.
+    """
+    buffer = io.BytesIO()
+    count = write_ndjson_gz(iter_rounds(client, page_size), buffer)
+    return buffer.getvalue(), count
+
+
+def preview_text(text, max_lines=PREVIEW_LINES):
+    """Trim text to its first max_lines lines, noting how much was cut."""
+    lines = text.splitlines()
+    if len(lines) <= max_lines:
+        return text
+    hidden = len(lines) - max_lines
+    return "\n".join(lines[:max_lines] + [f"... ({hidden} more lines in download)"])
+
+
+def _parse_ts(value):
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def shots_to_table(notes, course_holes):
+    """Convert a page of practice_notes (with embedded rounds) into an Arrow table.
+
+    course_holes maps (layout, hole_number) -> course_metadata row and supplies
+    par, attack flag and suggested disc without another query.
+    """
+    columns = {field.name: [] for field in SHOT_SCHEMA}
+    for note in notes:
+        round_info = note.get('rounds') or {}
+        hole = course_holes.get((note.get('layout'), note.get('hole_number'))) or {}
+        attack = hole.get('Attack_Hole')
+
+        columns["note_id"].append(note.get('id'))
+        columns["round_id"].append(note.get('round_id'))
+        columns["round_name"].append(round_info.get('name'))
+        columns["round_started_at"].append(_parse_ts(round_info.get('created_at')))
+        columns["round_ended_at"].append(_parse_ts(round_info.get('ended_at')))
+        columns["created_at"].append(_parse_ts(note.get('created_at')))
+        columns["layout"].append(note.get('layout'))
+        columns["hole_number"].append(note.get('hole_number'))
+        columns["par"].append(hole.get('par'))
+        columns["attack_hole"].append(attack == "Yes" if attack is not None else None)
+        columns["suggested_disc"].append(hole.get('suggested_disc'))
+        columns["disc_used"].append(note.get('disc_used'))
+        columns["strokes"].append(note.get('strokes'))
+        columns["result_rating"].append(note.get('result_rating'))
+        columns["notes"].append(note.get('notes'))
+        columns["temperature"].append(note.get('temperature'))
+        columns["wind_speed"].append(note.get('wind_speed'))
+        columns["wind_gust"].append(note.get('wind_gust'))
+        columns["wind_direction"].append(note.get('wind_direction'))
+        columns["headwind_mph"].append(note.get('headwind_mph'))
+        columns["crosswind_mph"].append(note.get('crosswind_mph'))
+
+    return pa.Table.from_arrays(
+        [pa.array(columns[field.name], type=field.type) for field in SHOT_SCHEMA],
+        schema=SHOT_SCHEMA
+    )
+
+
+def write_shots_parquet(pages, course_holes, fileobj):
+    """Write pages of notes as Parquet, one row group per page; returns the row count."""
+    rows = 0
+    with pq.ParquetWriter(fileobj, SHOT_SCHEMA, compression="zstd") as writer:
+        for page in pages:
+            table = shots_to_table(page, course_holes)
+            writer.write_table(table, row_group_size=len(page))
+            rows += table.num_rows
+    return rows
+
+
+def export_shots_parquet(client, course_holes, page_size=SHOT_PAGE_SIZE):
+    """Export every practice note joined with its round and hole protocol.
+
+    Returns (payload, row_count).
+    """
+    buffer = io.BytesIO()
+    pages = iter_pages(client, "practice_notes", SHOT_COLUMNS, page_size)
+    rows = write_shots_parquet(pages, course_holes, buffer)
+    return buffer.getvalue(), rows
@@ -0,0 +1,49 @@
+-- Everything the app needs to render one hole, in one round trip.
+-- Replaces the per-hole course_metadata/mindset_axioms join, the "Last Practice
+-- Result" lookup and Mapper Mode's hole_geometry select. Runs as the caller (RLS applies).
+--
+-- Returns:
+--   protocol     course_metadata row with mindset_axioms embedded (same shape as the app's course index), or null
+--   last_note    latest practice_notes row for the hole on this layout, or null
+--   geometry     hole_geometry row, or null
+--   round_notes  this round's notes for the hole, oldest first ([] without a round)
+CREATE OR REPLACE FUNCTION hole_bundle(p_layout TEXT, p_hole_number INTEGER, p_round_id UUID DEFAULT NULL)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+    SELECT jsonb_build_object(
+        'protocol', (
+            SELECT to_jsonb(cm) || jsonb_build_object(
+                'mindset_axioms', (
+                    SELECT jsonb_build_object('short_name', ma.short_name, 'title', ma.title, 'corollary', ma.corollary)
+                    FROM mindset_axioms ma
+                    WHERE ma.id = cm.mindset_axiom_id
+                )
+            )
+            FROM course_metadata cm
+            WHERE cm.layout = p_layout AND cm.hole_number = p_hole_number
+        ),
+        'last_note', (
+            SELECT to_jsonb(pn)
+            FROM practice_notes pn
+            WHERE pn.layout = p_layout AND pn.hole_number = p_hole_number
+            ORDER BY pn.created_at DESC
+            LIMIT 1
+        ),
+        'geometry', (
+            SELECT to_jsonb(hg)
+            FROM hole_geometry hg
+            WHERE hg.layout = p_layout AND hg.hole_number = p_hole_number
+        ),
+        'round_notes', COALESCE((
+            SELECT jsonb_agg(to_jsonb(pn) ORDER BY pn.created_at)
+            FROM practice_notes pn
+            WHERE pn.round_id = p_round_id AND pn.hole_number = p_hole_number
+        ), '[]'::jsonb)
+    );
+$$;
+
+GRANT EXECUTE ON FUNCTION hole_bundle(TEXT, INTEGER, UUID) TO authenticated;
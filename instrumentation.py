@@ -0,0 +1,197 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Per-call instrumentation for Supabase traffic.
+# InstrumentedClient wraps a client's table()/rpc() builders: every execute() is timed
+# and recorded with its filters, response size and any error (even when the caller
+# swallows it). Calls are grouped per script rerun (RerunCalls) and summed per browser
+# session (SessionCalls). Set MKS_CALL_LOG to a path to also append each call as JSONL.
+
+CALL_LOG_PATH = os.environ.get("MKS_CALL_LOG")
+_log_lock = threading.Lock()
+
+MAX_ARG_CHARS = 40
+
+
+def _format_arg(value):
+    if isinstance(value, list):
+        return f"[{len(value)} rows]"
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{k}={_format_arg(v)}" for k, v in value.items()) + "}"
+    text = str(value)
+    return text if len(text) <= MAX_ARG_CHARS else text[:MAX_ARG_CHARS - 1] + "…"
+
+
+def format_step(name, args, kwargs):
+    """`eq(hole_number, 7)`-style description of one builder call."""
+    parts = [_format_arg(a) for a in args] + [f"{k}={_format_arg(v)}" for k, v in kwargs.items()]
+    return f"{name}({', '.join(parts)})"
+
+
+class SessionCalls:
+    """Running totals for one browser session (kept in st.session_state)."""
+
+    def __init__(self):
+        self.session_id = uuid.uuid4().hex[:8]
+        self.reruns = 0
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.bytes = 0
+        self.by_target = Counter()
+        self._lock = threading.Lock()
+
+    def new_rerun(self):
+        with self._lock:
+            self.reruns += 1
+            return RerunCalls(self, self.reruns)
+
+    def add(self, call):
+        with self._lock:
+            self.calls += 1
+            self.errors += 1 if call['error'] else 0
+            self.seconds += call['ms'] / 1000
+            self.bytes += call['bytes']
+            self.by_target[f"{call['kind']}:{call['target']}"] += 1
+
+    def summary(self):
+        with self._lock:
+            return {
+                "reruns": self.reruns,
+                "calls": self.calls,
+                "calls_per_rerun": self.calls / self.reruns if self.reruns else 0.0,
+                "errors": self.errors,
+                "ms": self.seconds * 1000,
+                "bytes": self.bytes
+            }
+
+
+class RerunCalls:
+    """Calls made during one script run, including threads it started."""
+
+    def __init__(self, session, rerun):
+        self.session = session
+        self.rerun = rerun
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def record(self, kind, target, detail, seconds, nbytes=0, error=None):
+        call = {
+            "session": self.session.session_id,
+            "rerun": self.rerun,
+            "at": datetime.now(timezone.utc).isoformat(),
+            "thread": threading.current_thread().name,
+            "kind": kind,
+            "target": target,
+            "detail": detail,
+            "ms": round(seconds * 1000, 1),
+            "bytes": nbytes,
+            "error": error
+        }
+        with self._lock:
+            self.calls.append(call)
+        self.session.add(call)
+
+        if CALL_LOG_PATH:
+            with _log_lock, open(CALL_LOG_PATH, "a") as f:
+                f.write(json.dumps(call) + "\n")
+        return call
+
+    @contextmanager
+    def timing(self, kind, target, detail=""):
+        """Record a block that isn't a PostgREST builder (e.g. auth calls)."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.record(kind, target, detail, time.perf_counter() - started, error=str(e))
+            raise
+        self.record(kind, target, detail, time.perf_counter() - started)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.calls)
+
+    def summary(self):
+        calls = self.snapshot()
+        return {
+            "calls": len(calls),
+            "errors": sum(1 for c in calls if c['error']),
+            "ms": sum(c['ms'] for c in calls),
+            "bytes": sum(c['bytes'] for c in calls)
+        }
+
+    def repeated(self):
+        """Identical calls made more than once in this rerun (N+1s, double fetches)."""
+        counts = Counter((c['kind'], c['target'], c['detail']) for c in self.snapshot())
+        return [(kind, target, detail, n) for (kind, target, detail), n in counts.items() if n > 1]
+
+
+class _Builder:
+    """Proxy for a PostgREST request builder that remembers each call and times execute()."""
+
+    def __init__(self, builder, recorder, kind, target, steps=(), response_bytes=None):
+        self._builder = builder
+        self._recorder = recorder
+        self._kind = kind
+        self._target = target
+        self._steps = steps
+        self._response_bytes = response_bytes
+
+    def _wrap(self, result, step):
+        return _Builder(result, self._recorder, self._kind, self._target, self._steps + (step,), self._response_bytes)
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            # e.g. `.not_`, a property returning the builder
+            return self._wrap(attr, name) if hasattr(attr, "execute") else attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if hasattr(result, "execute"):
+                return self._wrap(result, format_step(name, args, kwargs))
+            return result
+        return call
+
+    def execute(self):
+        detail = ".".join(self._steps)
+        started = time.perf_counter()
+        try:
+            res = self._builder.execute()
+        except Exception as e:
+            self._recorder.record(self._kind, self._target, detail, time.perf_counter() - started, error=str(e))
+            raise
+        elapsed = time.perf_counter() - started
+        # Size as received, from the HTTP layer (no re-serialising the rows)
+        nbytes = self._response_bytes() if self._response_bytes else 0
+        self._recorder.record(self._kind, self._target, detail, elapsed, nbytes)
+        return res
+
+
+class InstrumentedClient:
+    """Same table()/rpc() surface as the wrapped client, with every request recorded."""
+
+    def __init__(self, client, recorder):
+        self._client = client
+        self.recorder = recorder
+        # Clients without it (e.g. test fakes) record 0 bytes
+        self._response_bytes = getattr(client, "last_response_bytes", None)
+
+    def table(self, name):
+        return _Builder(self._client.table(name), self.recorder, "table", name, response_bytes=self._response_bytes)
+
+    from_ = table
+
+    def rpc(self, fn, params=None):
+        steps = (format_step("params", (), params or {}),)
+        return _Builder(self._client.rpc(fn, params or {}), self.recorder, "rpc", fn, steps, self._response_bytes)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
@@ -8,13 +8,21 @@ SET suggested_disc = NULL
 WHERE suggested_disc = '' OR suggested_disc IS NULL;
 
 -- 1. Ensure disc names are unique (Required for Foreign Key)
--- (If you already ran this part successfully, you can skip it or ignore the 'already exists' error)
-ALTER TABLE discs ADD CONSTRAINT discs_name_key UNIQUE (name);
-
 -- 2. Add Foreign Key Constraint
-ALTER TABLE course_metadata 
-ADD CONSTRAINT fk_suggested_disc
-FOREIGN KEY (suggested_disc) 
-REFERENCES discs (name)
-ON DELETE SET NULL
-ON UPDATE CASCADE;
+-- Both are skipped when the constraint already exists, so the file is safe to re-run.
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'discs_name_key' AND conrelid = 'discs'::regclass) THEN
+        ALTER TABLE discs ADD CONSTRAINT discs_name_key UNIQUE (name);
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'fk_suggested_disc' AND conrelid = 'course_metadata'::regclass) THEN
+        ALTER TABLE course_metadata
+        ADD CONSTRAINT fk_suggested_disc
+        FOREIGN KEY (suggested_disc)
+        REFERENCES discs (name)
+        ON DELETE SET NULL
+        ON UPDATE CASCADE;
+    END IF;
+END;
+$$;
@@ -0,0 +1,292 @@
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+
+# Local write-ahead queue for practice_notes.
+# "Save & Next" only writes to SQLite; a background thread pushes queued notes to
+# Supabase in batches. Each note carries a client_id (see add_note_client_id.sql)
+# so a batch that is retried after a dropped response never inserts duplicates.
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_PATH = os.environ.get(
+    "MKS_QUEUE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".mks_queue.sqlite3")
+)
+
+BATCH_SIZE = 50          # Rows per multi-row insert
+FLUSH_INTERVAL = 5       # Seconds between idle flush passes
+MAX_BACKOFF = 300        # Cap for retry delay (seconds)
+KEEP_FLUSHED_DAYS = 7    # Flushed rows are kept this long for the sync counter
+DISCARD_WAIT = 35        # Max seconds discard_round waits for an in-flight batch (> HTTP timeout)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS note_queue (
+    client_id TEXT PRIMARY KEY,
+    user_id TEXT,
+    round_id TEXT,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending', -- pending | sending (claimed by the flusher) | flushed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    queued_at REAL NOT NULL,
+    flushed_at REAL
+);
+CREATE INDEX IF NOT EXISTS note_queue_due ON note_queue (status, next_attempt_at);
+"""
+
+
+def backoff_delay(attempts):
+    """Exponential backoff with jitter: ~2s, 4s, 8s ... capped at MAX_BACKOFF."""
+    return min(MAX_BACKOFF, 2 ** attempts) * (0.5 + random.random())
+
+
+class NoteQueue:
+    """SQLite journal of practice notes with a background flusher.
+
+    client_factory(access_token) must return a Supabase client that sends
+    requests as that user. Tokens are registered per user from the app via
+    register_session() and are only kept in memory; notes from a user with no
+    registered token stay pending until that user opens the app again.
+    """
+
+    def __init__(self, path, client_factory, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.client_factory = client_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        # Signalled whenever the flusher finishes a batch (discard_round waits on it)
+        self._settled = threading.Condition(self._lock)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._tokens = {}
+        self._clients = {}
+
+        # One shared connection guarded by _lock; autocommit so every enqueue is its own durable write
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(SCHEMA)
+        # Batches cut short by a crash/restart go back in the queue (the upsert is idempotent)
+        self._conn.execute("UPDATE note_queue SET status = 'pending' WHERE status = 'sending'")
+
+    # --- APP SIDE ---
+    def register_session(self, user_id, access_token):
+        """Remember the latest access token for a user so their notes can be flushed."""
+        if not user_id or not access_token:
+            return
+        with self._lock:
+            changed = self._tokens.get(user_id) != access_token
+            self._tokens[user_id] = access_token
+        if changed:
+            # A fresh token may unblock notes that failed with an expired one
+            self._conn_execute("UPDATE note_queue SET next_attempt_at = 0 WHERE status = 'pending' AND user_id = ?", (user_id,))
+            self._wake.set()
+
+    def enqueue(self, note, user_id):
+        """Persist a note locally and return its client_id. Never touches the network."""
+        client_id = str(uuid.uuid4())
+        row = dict(note, client_id=client_id)
+        self._conn_execute(
+            "INSERT INTO note_queue (client_id, user_id, round_id, payload, queued_at) VALUES (?, ?, ?, ?, ?)",
+            (client_id, user_id, row.get('round_id'), json.dumps(row, default=str), time.time())
+        )
+        self._wake.set()
+        return client_id
+
+    def discard_round(self, round_id, timeout=DISCARD_WAIT):
+        """Drop queued notes for a cancelled round so they are never uploaded.
+
+        If a batch of this round is uploading right now, waits for it to land (or
+        fail) first, so the caller's server-side delete of the round runs after it.
+        """
+        if round_id is None:
+            return 0
+        round_id = str(round_id)
+        delete = "DELETE FROM note_queue WHERE status = 'pending' AND round_id = ?"
+        with self._lock:
+            removed = self._conn.execute(delete, (round_id,)).rowcount
+            self._settled.wait_for(lambda: not self._in_flight(round_id), timeout)
+            # A failed in-flight batch was put back as pending
+            return removed + self._conn.execute(delete, (round_id,)).rowcount
+
+    def pending_notes(self, user_id):
+        """Payloads (with client_id) of a user's notes that haven't uploaded yet, oldest first."""
+        rows = self._conn_query(
+            "SELECT payload FROM note_queue WHERE status IN ('pending', 'sending') AND user_id = ? ORDER BY queued_at",
+            (user_id,)
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def counts(self, user_id=None):
+        """Return {"pending", "flushed", "failing"} counts, optionally for one user."""
+        query = """
+            SELECT
+                SUM(status IN ('pending', 'sending')),
+                SUM(status = 'flushed'),
+                SUM(status IN ('pending', 'sending') AND attempts > 0)
+            FROM note_queue
+        """
+        params = ()
+        if user_id is not None:
+            query += " WHERE user_id = ?"
+            params = (user_id,)
+        pending, flushed, failing = self._conn_query(query, params)[0]
+        return {"pending": pending or 0, "flushed": flushed or 0, "failing": failing or 0}
+
+    # --- FLUSHER ---
+    def start(self):
+        """Start the background flusher (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="mks-note-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def flush_once(self):
+        """Push every due pending note; returns the number of rows flushed."""
+        rows = self._claim_due()
+        try:
+            return self._send(rows)
+        finally:
+            # Anything an unexpected error left claimed goes back in the queue
+            self._release([row[0] for row in rows])
+
+    def _send(self, rows):
+        # Group by user and round: each batch is sent with that user's token, and a
+        # round deleted meanwhile (FK error) only holds back its own notes
+        by_round = {}
+        for client_id, user_id, round_id, payload, attempts in rows:
+            by_round.setdefault((user_id, round_id), []).append((client_id, json.loads(payload), attempts))
+
+        flushed = 0
+        for (user_id, _), items in by_round.items():
+            client = self._client_for(user_id)
+            if client is None:
+                # No token yet: check again on the next pass
+                self._defer([i[0] for i in items], [i[2] for i in items], "No active session for user", retry=False)
+                continue
+
+            for start in range(0, len(items), self.batch_size):
+                batch = items[start:start + self.batch_size]
+                ids = [i[0] for i in batch]
+                try:
+                    client.table("practice_notes")\
+                        .upsert([i[1] for i in batch], on_conflict="client_id", ignore_duplicates=True)\
+                        .execute()
+                except Exception as e:
+                    self._defer(ids, [i[2] for i in batch], str(e))
+                    continue
+
+                placeholders = ",".join("?" * len(ids))
+                with self._settled:
+                    self._conn.execute(
+                        f"UPDATE note_queue SET status = 'flushed', flushed_at = ?, last_error = NULL WHERE client_id IN ({placeholders})",
+                        (time.time(), *ids)
+                    )
+                    self._settled.notify_all()
+                flushed += len(ids)
+
+        return flushed
+
+    def prune(self, keep_days=KEEP_FLUSHED_DAYS):
+        cutoff = time.time() - keep_days * 86400
+        self._conn_execute("DELETE FROM note_queue WHERE status = 'flushed' AND flushed_at < ?", (cutoff,))
+
+    def _run(self):
+        last_prune = 0
+        while not self._stop.is_set():
+            try:
+                self.flush_once()
+                if time.time() - last_prune > 3600:
+                    self.prune()
+                    last_prune = time.time()
+            except Exception:
+                logger.warning("Note flush failed", exc_info=True)
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+
+    def _client_for(self, user_id):
+        with self._lock:
+            token = self._tokens.get(user_id)
+            if not token:
+                return None
+            cached = self._clients.get(user_id)
+            if cached and cached[0] == token:
+                return cached[1]
+        client = self.client_factory(token)
+        with self._lock:
+            self._clients[user_id] = (token, client)
+        return client
+
+    def _claim_due(self):
+        """Select due pending notes and mark them 'sending' in one step under the lock.
+
+        discard_round can't delete a claimed row out from under an upload; it waits instead.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT client_id, user_id, round_id, payload, attempts FROM note_queue
+                WHERE status = 'pending' AND next_attempt_at <= ?
+                ORDER BY queued_at
+                """,
+                (time.time(),)
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE note_queue SET status = 'sending' WHERE client_id = ?",
+                [(row[0],) for row in rows]
+            )
+        return rows
+
+    def _release(self, client_ids):
+        with self._settled:
+            self._conn.executemany(
+                "UPDATE note_queue SET status = 'pending' WHERE status = 'sending' AND client_id = ?",
+                [(client_id,) for client_id in client_ids]
+            )
+            self._settled.notify_all()
+
+    def _in_flight(self, round_id):
+        # Caller holds the lock
+        return self._conn.execute(
+            "SELECT 1 FROM note_queue WHERE status = 'sending' AND round_id = ? LIMIT 1", (round_id,)
+        ).fetchone() is not None
+
+    def _defer(self, client_ids, attempts, error, retry=True):
+        """Put claimed notes back as pending, due again after a backoff."""
+        now = time.time()
+        with self._settled:
+            for client_id, tries in zip(client_ids, attempts):
+                next_tries = tries + 1 if retry else tries
+                delay = backoff_delay(next_tries) if retry else self.flush_interval
+                self._conn.execute(
+                    "UPDATE note_queue SET status = 'pending', attempts = ?, next_attempt_at = ?, last_error = ? WHERE client_id = ?",
+                    (next_tries, now + delay, error[:500], client_id)
+                )
+            self._settled.notify_all()
+
+    def _conn_execute(self, query, params=()):
+        """Run a write under the lock and return the affected row count."""
+        with self._lock:
+            return self._conn.execute(query, params).rowcount
+
+    def _conn_query(self, query, params=()):
+        """Run a read under the lock and return all rows."""
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
@@ -0,0 +1,182 @@
+-- Incrementally maintained rollup of practice_notes.
+-- Running counts/sums per (layout, hole, disc, user), kept current by statement-level
+-- triggers (one aggregate upsert per statement, so the bulk delete in "Cancel Round"
+-- costs one pass over the deleted rows). Readers never aggregate over raw notes.
+
+-- 1. Attribute notes to a user (new rows get the caller's id; old rows inherit the round owner)
+ALTER TABLE practice_notes
+ADD COLUMN IF NOT EXISTS user_id UUID DEFAULT auth.uid();
+
+UPDATE practice_notes n
+SET user_id = r.user_id
+FROM rounds r
+WHERE n.round_id = r.id AND n.user_id IS NULL;
+
+-- 2. Rollup table
+CREATE TABLE IF NOT EXISTS practice_stats (
+    layout VARCHAR(50) NOT NULL,
+    hole_number INTEGER NOT NULL,
+    disc_used VARCHAR(100),
+    user_id UUID,
+    entries BIGINT NOT NULL DEFAULT 0,
+    stroke_count BIGINT NOT NULL DEFAULT 0,
+    stroke_total BIGINT NOT NULL DEFAULT 0,
+    rating_count BIGINT NOT NULL DEFAULT 0,
+    rating_total BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    -- disc_used/user_id may be NULL; treat NULL as one bucket
+    CONSTRAINT practice_stats_key UNIQUE NULLS NOT DISTINCT (layout, hole_number, disc_used, user_id)
+);
+
+ALTER TABLE practice_stats ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Allow auth read" ON practice_stats;
+CREATE POLICY "Allow auth read" ON practice_stats FOR SELECT TO authenticated USING (true);
+
+-- 3. Triggers
+CREATE OR REPLACE FUNCTION practice_stats_apply()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    -- Updates that leave every rolled-up column as it was (e.g. the weather backfill)
+    -- don't change the totals: skip them
+    -- (nested: old_rows only exists for UPDATE/DELETE)
+    IF TG_OP = 'UPDATE' THEN
+        IF NOT EXISTS (
+            SELECT layout, hole_number, disc_used, user_id, strokes, result_rating FROM old_rows
+            EXCEPT ALL
+            SELECT layout, hole_number, disc_used, user_id, strokes, result_rating FROM new_rows
+        ) THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+
+    -- Subtract removed rows (DELETE, and the old side of UPDATE)
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        INSERT INTO practice_stats AS s
+            (layout, hole_number, disc_used, user_id, entries, stroke_count, stroke_total, rating_count, rating_total)
+        SELECT layout, hole_number, disc_used, user_id,
+               -COUNT(*), -COUNT(strokes), -COALESCE(SUM(strokes), 0),
+               -COUNT(result_rating), -COALESCE(SUM(result_rating), 0)
+        FROM old_rows
+        GROUP BY layout, hole_number, disc_used, user_id
+        ON CONFLICT ON CONSTRAINT practice_stats_key DO UPDATE SET
+            entries = s.entries + EXCLUDED.entries,
+            stroke_count = s.stroke_count + EXCLUDED.stroke_count,
+            stroke_total = s.stroke_total + EXCLUDED.stroke_total,
+            rating_count = s.rating_count + EXCLUDED.rating_count,
+            rating_total = s.rating_total + EXCLUDED.rating_total,
+            updated_at = NOW();
+    END IF;
+
+    -- Add new rows (INSERT, and the new side of UPDATE)
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO practice_stats AS s
+            (layout, hole_number, disc_used, user_id, entries, stroke_count, stroke_total, rating_count, rating_total)
+        SELECT layout, hole_number, disc_used, user_id,
+               COUNT(*), COUNT(strokes), COALESCE(SUM(strokes), 0),
+               COUNT(result_rating), COALESCE(SUM(result_rating), 0)
+        FROM new_rows
+        GROUP BY layout, hole_number, disc_used, user_id
+        ON CONFLICT ON CONSTRAINT practice_stats_key DO UPDATE SET
+            entries = s.entries + EXCLUDED.entries,
+            stroke_count = s.stroke_count + EXCLUDED.stroke_count,
+            stroke_total = s.stroke_total + EXCLUDED.stroke_total,
+            rating_count = s.rating_count + EXCLUDED.rating_count,
+            rating_total = s.rating_total + EXCLUDED.rating_total,
+            updated_at = NOW();
+    END IF;
+
+    -- Buckets whose last note was removed (only the keys this statement touched)
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        DELETE FROM practice_stats s
+        USING (SELECT DISTINCT layout, hole_number, disc_used, user_id FROM old_rows) o
+        WHERE s.entries <= 0
+          AND s.layout = o.layout
+          AND s.hole_number = o.hole_number
+          AND s.disc_used IS NOT DISTINCT FROM o.disc_used
+          AND s.user_id IS NOT DISTINCT FROM o.user_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION practice_stats_truncate()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    TRUNCATE practice_stats;
+    RETURN NULL;
+END;
+$$;
+
+-- Transition tables allow only one event per trigger
+DROP TRIGGER IF EXISTS practice_stats_insert ON practice_notes;
+CREATE TRIGGER practice_stats_insert
+AFTER INSERT ON practice_notes
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION practice_stats_apply();
+
+DROP TRIGGER IF EXISTS practice_stats_update ON practice_notes;
+CREATE TRIGGER practice_stats_update
+AFTER UPDATE ON practice_notes
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION practice_stats_apply();
+
+DROP TRIGGER IF EXISTS practice_stats_delete ON practice_notes;
+CREATE TRIGGER practice_stats_delete
+AFTER DELETE ON practice_notes
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION practice_stats_apply();
+
+DROP TRIGGER IF EXISTS practice_stats_truncate ON practice_notes;
+CREATE TRIGGER practice_stats_truncate
+AFTER TRUNCATE ON practice_notes
+FOR EACH STATEMENT EXECUTE FUNCTION practice_stats_truncate();
+
+-- 4. Backfill from existing notes (safe to re-run)
+TRUNCATE practice_stats;
+INSERT INTO practice_stats
+    (layout, hole_number, disc_used, user_id, entries, stroke_count, stroke_total, rating_count, rating_total)
+SELECT layout, hole_number, disc_used, user_id,
+       COUNT(*), COUNT(strokes), COALESCE(SUM(strokes), 0),
+       COUNT(result_rating), COALESCE(SUM(result_rating), 0)
+FROM practice_notes
+GROUP BY layout, hole_number, disc_used, user_id;
+
+-- 5. Point the Analysis views (analysis_stats.sql) at the rollup
+DROP VIEW IF EXISTS practice_hole_stats;
+CREATE VIEW practice_hole_stats
+WITH (security_invoker = true) AS
+SELECT
+    layout,
+    hole_number,
+    SUM(entries)::BIGINT AS entries,
+    SUM(stroke_count)::BIGINT AS stroke_count,
+    SUM(stroke_total)::BIGINT AS stroke_total,
+    (SUM(stroke_total)::DOUBLE PRECISION / NULLIF(SUM(stroke_count), 0)) AS avg_strokes
+FROM practice_stats
+GROUP BY layout, hole_number;
+
+DROP VIEW IF EXISTS practice_disc_stats;
+CREATE VIEW practice_disc_stats
+WITH (security_invoker = true) AS
+SELECT
+    layout,
+    disc_used,
+    SUM(entries)::BIGINT AS entries,
+    SUM(rating_count)::BIGINT AS rating_count,
+    SUM(rating_total)::BIGINT AS rating_total,
+    (SUM(rating_total)::DOUBLE PRECISION / NULLIF(SUM(rating_count), 0)) AS avg_rating
+FROM practice_stats
+WHERE disc_used IS NOT NULL
+GROUP BY layout, disc_used;
+
+GRANT SELECT ON practice_hole_stats TO authenticated;
+GRANT SELECT ON practice_disc_stats TO authenticated;
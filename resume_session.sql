@@ -0,0 +1,81 @@
+-- One round trip for the app's startup round restore.
+-- Replaces: rounds by mks_round_id cookie -> most recent round (Smart Resume)
+-- -> max(hole_number) of its notes. Runs as the caller, so RLS still applies.
+--
+-- Returns:
+--   round         the restored round (cookie round, else the user's latest), or null
+--   source        'cookie' | 'recent' | null
+--   cookie_found  false when a cookie id was given but that round no longer exists
+--   ended         round has ended_at set
+--   resumable     latest round started < 3 hours ago and not ended (Smart Resume)
+--   next_hole     hole after the last one logged in the latest round (max 18) when that
+--                 round started < 3 hours ago (ended or not), else null
+CREATE OR REPLACE FUNCTION resume_session(p_user_id UUID, p_round_id TEXT DEFAULT NULL)
+RETURNS JSONB
+LANGUAGE plpgsql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+DECLARE
+    v_round_id UUID;
+    v_round rounds%ROWTYPE;
+    v_next_hole INTEGER;
+BEGIN
+    -- Cookie values are untrusted text: a malformed id is just "not found"
+    IF p_round_id IS NOT NULL AND p_round_id <> '' THEN
+        BEGIN
+            v_round_id := p_round_id::UUID;
+        EXCEPTION WHEN invalid_text_representation THEN
+            v_round_id := NULL;
+        END;
+
+        SELECT * INTO v_round FROM rounds WHERE id = v_round_id;
+        IF FOUND THEN
+            RETURN jsonb_build_object(
+                'round', to_jsonb(v_round),
+                'source', 'cookie',
+                'cookie_found', TRUE,
+                'ended', v_round.ended_at IS NOT NULL,
+                'resumable', FALSE,
+                'next_hole', NULL
+            );
+        END IF;
+    END IF;
+
+    SELECT * INTO v_round
+    FROM rounds
+    WHERE user_id = p_user_id
+    ORDER BY created_at DESC
+    LIMIT 1;
+
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object(
+            'round', NULL,
+            'source', NULL,
+            'cookie_found', p_round_id IS NULL OR p_round_id = '',
+            'ended', FALSE,
+            'resumable', FALSE,
+            'next_hole', NULL
+        );
+    END IF;
+
+    -- Auto-jump only within the Smart Resume window; an old round keeps hole 1
+    IF v_round.created_at > NOW() - INTERVAL '3 hours' THEN
+        SELECT LEAST(MAX(hole_number) + 1, 18) INTO v_next_hole
+        FROM practice_notes
+        WHERE round_id = v_round.id;
+    END IF;
+
+    RETURN jsonb_build_object(
+        'round', to_jsonb(v_round),
+        'source', 'recent',
+        'cookie_found', p_round_id IS NULL OR p_round_id = '',
+        'ended', v_round.ended_at IS NOT NULL,
+        'resumable', v_round.ended_at IS NULL AND v_round.created_at > NOW() - INTERVAL '3 hours',
+        'next_hole', v_next_hole
+    );
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION resume_session(UUID, TEXT) TO authenticated;
@@ -1,5 +1,8 @@
+import argparse
+import hashlib
 import os
 import sys
+import time
 import psycopg2
 from dotenv import load_dotenv
 from urllib.parse import urlparse
@@ -7,8 +10,55 @@ from urllib.parse import urlparse
 # Load environment variables
 load_dotenv()
 
-def get_db_connection():
-    """Constructs the database connection string and connects."""
+# Every migration, in apply order. Append new files here; never reorder or edit
+# one that has been applied (its checksum is recorded in schema_migrations).
+MIGRATIONS = [
+    "schema.sql",
+    "schema_catch_up.sql",        # rounds + course_metadata columns added by hand before migrations existed
+    "discs.sql",
+    "link_discs.sql",
+    "geometry.sql",
+    "add_weather_columns.sql",
+    "add_ended_at.sql",
+    "course_version.sql",
+    "add_note_client_id.sql",
+    "analysis_stats.sql",
+    "practice_stats.sql",         # replaces the analysis_stats.sql views
+    "add_wind_gust_column.sql",
+    "add_wind_components.sql",    # needs bump_course_version() from course_version.sql
+    "geometry_tracking.sql",      # needs hole_geometry.bearing_deg
+    "resume_session.sql",
+    "hole_bundle.sql",
+    "add_query_indexes.sql",
+    "backfill_note_weather.sql",
+]
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATION_LOCK_ID = 726354  # pg_advisory_xact_lock key; one runner at a time
+
+LEDGER_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    filename TEXT PRIMARY KEY,
+    checksum TEXT NOT NULL,
+    applied_at TIMESTAMPTZ DEFAULT NOW(),
+    duration_ms INTEGER
+);
+-- Not for the API: RLS on with no policies
+ALTER TABLE schema_migrations ENABLE ROW LEVEL SECURITY;
+"""
+
+def get_db_connection(database_url=None):
+    """Constructs the database connection string and connects.
+
+    `database_url` (e.g. a local Postgres) takes precedence over the Supabase project in .env.
+    """
+    if database_url:
+        try:
+            return psycopg2.connect(database_url)
+        except Exception as e:
+            print(f"Connection failed: {e}")
+            sys.exit(1)
+
     supabase_url = os.environ.get("SUPABASE_URL")
     db_password = os.environ.get("SUPABASE_DB_PASSWORD")
 
@@ -19,14 +69,14 @@ def get_db_connection():
     # Extract project ID from URL (https://[project-ref].supabase.co)
     parsed_url = urlparse(supabase_url)
     project_ref = parsed_url.hostname.split('.')[0]
-    
+
     # Construct standard Supabase connection string
     # Host: db.[project-ref].supabase.co
     # User: postgres
     # Port: 5432
     # Db: postgres
     host = f"db.{project_ref}.supabase.co"
-    
+
     try:
         conn = psycopg2.connect(
             host=host,
@@ -40,25 +90,25 @@ def get_db_connection():
         print(f"Connection failed: {e}")
         sys.exit(1)
 
-def run_sql_file(filename):
+def run_sql_file(filename, database_url=None):
     """Reads and executes a SQL file."""
     if not os.path.exists(filename):
         print(f"Error: File {filename} not found.")
         sys.exit(1)
 
     print(f"Connecting to database...")
-    conn = get_db_connection()
+    conn = get_db_connection(database_url)
     cur = conn.cursor()
 
     try:
         with open(filename, 'r') as f:
             sql = f.read()
-        
+
         print(f"Executing {filename}...")
         cur.execute(sql)
         conn.commit()
         print("Success! SQL executed.")
-        
+
     except Exception as e:
         conn.rollback()
         print(f"Execution failed: {e}")
@@ -66,13 +116,160 @@ def run_sql_file(filename):
         cur.close()
         conn.close()
 
+# --- MIGRATIONS ---
+
+def read_migration(filename):
+    """(sql, sha256 checksum) of a listed migration file."""
+    with open(os.path.join(MIGRATIONS_DIR, filename), 'rb') as f:
+        data = f.read()
+    return data.decode('utf-8'), hashlib.sha256(data).hexdigest()
+
+def applied_migrations(cur):
+    """{filename: checksum} from the ledger (empty before the first run)."""
+    cur.execute("SELECT to_regclass('public.schema_migrations') IS NOT NULL")
+    if not cur.fetchone()[0]:
+        return {}
+    cur.execute("SELECT filename, checksum FROM schema_migrations")
+    return dict(cur.fetchall())
+
+def plan_migrations(applied):
+    """Split MIGRATIONS into (pending, changed) against the ledger.
+
+    `changed` are applied files whose contents no longer match their recorded checksum.
+    """
+    pending, changed = [], []
+    for filename in MIGRATIONS:
+        sql, checksum = read_migration(filename)
+        if filename not in applied:
+            pending.append((filename, sql, checksum))
+        elif applied[filename] != checksum:
+            changed.append(filename)
+    return pending, changed
+
+def migrate(conn, dry_run=False, baseline_through=None):
+    """Apply every pending migration in one transaction, recording each in schema_migrations.
+
+    dry_run:          apply and time everything, then roll back.
+    baseline_through: a file in MIGRATIONS. Pending files up to and including it are
+                      recorded as applied without running them (a database set up by
+                      hand before the ledger existed); the files after it still run.
+    Returns True on success.
+    """
+    baselined = set(MIGRATIONS[:MIGRATIONS.index(baseline_through) + 1]) if baseline_through else set()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+        applied = applied_migrations(cur)
+        pending, changed = plan_migrations(applied)
+
+        for filename in changed:
+            print(f"Error: {filename} was edited after it was applied (checksum mismatch).")
+        for filename in sorted(set(applied) - set(MIGRATIONS)):
+            print(f"Warning: {filename} is in schema_migrations but not in MIGRATIONS.")
+        if changed:
+            print("Add a new migration instead of editing an applied one.")
+            conn.rollback()
+            return False
+
+        if not pending:
+            print(f"Up to date ({len(applied)} migrations applied).")
+            conn.rollback()
+            return True
+
+        cur.execute(LEDGER_SQL)
+        total_start = time.perf_counter()
+        for filename, sql, checksum in pending:
+            baseline = filename in baselined
+            start = time.perf_counter()
+            if not baseline:
+                try:
+                    cur.execute(sql)
+                except Exception as e:
+                    print(f"  {filename:<28} FAILED: {str(e).strip()}")
+                    print("Rolled back; no migrations were applied.")
+                    conn.rollback()
+                    return False
+            duration_ms = round((time.perf_counter() - start) * 1000)
+            cur.execute(
+                "INSERT INTO schema_migrations (filename, checksum, duration_ms) VALUES (%s, %s, %s)",
+                (filename, checksum, None if baseline else duration_ms)
+            )
+            print(f"  {filename:<28} {'baselined' if baseline else f'{duration_ms:>6} ms'}")
+        total_ms = (time.perf_counter() - total_start) * 1000
+
+        skipped = sum(1 for filename, _, _ in pending if filename in baselined)
+        summary = f"{len(pending) - skipped} migration(s) ran in {total_ms:.0f} ms, {skipped} baselined"
+        if dry_run:
+            conn.rollback()
+            print(f"Dry run: {summary}; rolled back.")
+        else:
+            conn.commit()
+            print(f"Success! {summary}.")
+        return True
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+def print_status(conn):
+    """List each migration as applied / pending / changed."""
+    cur = conn.cursor()
+    try:
+        applied = applied_migrations(cur)
+        pending, changed = plan_migrations(applied)
+        pending = {filename for filename, _, _ in pending}
+        if applied:
+            cur.execute("SELECT filename, applied_at, duration_ms FROM schema_migrations")
+            details = {filename: (applied_at, duration_ms) for filename, applied_at, duration_ms in cur.fetchall()}
+        else:
+            details = {}
+    finally:
+        conn.rollback()
+        cur.close()
+
+    for filename in MIGRATIONS:
+        if filename in pending:
+            print(f"  [pending] {filename}")
+        else:
+            applied_at, duration_ms = details[filename]
+            state = "changed" if filename in changed else "applied"
+            timing = f", {duration_ms} ms" if duration_ms is not None else ""
+            print(f"  [{state}] {filename} ({applied_at:%Y-%m-%d %H:%M}{timing})")
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python run_sql.py <file.sql>")
+    parser = argparse.ArgumentParser(
+        description="Apply pending migrations (see MIGRATIONS), or run a single SQL file.",
+        epilog="With no arguments, only tests the connection."
+    )
+    parser.add_argument("file", nargs="?", help="Run one SQL file as-is (not recorded in schema_migrations).")
+    parser.add_argument("--migrate", action="store_true", help="Apply all pending migrations in one transaction.")
+    parser.add_argument("--dry-run", action="store_true", help="With --migrate: run and time pending migrations, then roll back.")
+    parser.add_argument("--baseline-through", metavar="FILE", choices=MIGRATIONS,
+                        help="With --migrate: record pending migrations up to and including FILE as applied "
+                             "without running them (applied by hand before the ledger existed); later ones still run.")
+    parser.add_argument("--status", action="store_true", help="Show applied/pending migrations.")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"),
+                        help="Postgres URL (default $DATABASE_URL); otherwise the Supabase project from .env.")
+    args = parser.parse_args()
+
+    if args.file:
+        run_sql_file(args.file, args.database_url)
+    elif args.migrate or args.status:
+        if (args.dry_run or args.baseline_through) and not args.migrate:
+            parser.error("--dry-run and --baseline-through go with --migrate")
+        conn = get_db_connection(args.database_url)
+        try:
+            if args.status:
+                print_status(conn)
+            elif not migrate(conn, dry_run=args.dry_run, baseline_through=args.baseline_through):
+                sys.exit(1)
+        finally:
+            conn.close()
+    else:
+        print("Usage: python run_sql.py <file.sql> | --migrate [--dry-run] [--baseline-through FILE] | --status")
         # Verification mode if no args
         print("No file provided. Testing connection only...")
-        conn = get_db_connection()
+        conn = get_db_connection(args.database_url)
         print("Connection successful!")
         conn.close()
-    else:
-        run_sql_file(sys.argv[1])
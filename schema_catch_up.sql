@@ -0,0 +1,43 @@
+-- Catch-up for objects the live database has but no migration created.
+-- rounds, practice_notes.round_id and the protocol columns on course_metadata were
+-- added by hand in the Supabase dashboard; this makes a fresh database match.
+-- Idempotent, so it is also safe on a database that already has them.
+
+-- 1. Rounds (sessions of play)
+CREATE TABLE IF NOT EXISTS rounds (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    name TEXT,
+    layout VARCHAR(50),
+    selected_discs TEXT[],
+    user_id UUID DEFAULT auth.uid(),
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE rounds ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Allow owner all" ON rounds;
+CREATE POLICY "Allow owner all" ON rounds FOR ALL TO authenticated
+USING (user_id = auth.uid())
+WITH CHECK (user_id = auth.uid());
+
+ALTER TABLE practice_notes
+ADD COLUMN IF NOT EXISTS round_id UUID REFERENCES rounds(id);
+
+-- 2. Protocol columns read by the app's course index
+ALTER TABLE course_metadata
+ADD COLUMN IF NOT EXISTS par INTEGER,
+ADD COLUMN IF NOT EXISTS suggested_disc VARCHAR(255),  -- FK -> discs.name (link_discs.sql)
+ADD COLUMN IF NOT EXISTS shot_shape TEXT,
+ADD COLUMN IF NOT EXISTS execution_notes TEXT,
+ADD COLUMN IF NOT EXISTS "Attack_Hole" TEXT;           -- 'Yes' / 'No'
+
+-- schema.sql named the axiom link axiom_id; the app embeds it as mindset_axiom_id
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = 'course_metadata' AND column_name = 'axiom_id'
+    ) THEN
+        ALTER TABLE course_metadata RENAME COLUMN axiom_id TO mindset_axiom_id;
+    END IF;
+END;
+$$;
@@ -0,0 +1,144 @@
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+import pytz
+import requests
+from supabase import create_client
+from dotenv import load_dotenv
+
+# Allow importing weather.py from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from weather import ARCHIVE_URL, archive_params, parse_hourly, nearest_hour
+
+# Load env from parent dir if needed, or current
+load_dotenv()
+
+LOCAL_TZ = pytz.timezone('America/New_York')
+WEATHER_FIELDS = ["temperature", "wind_speed", "wind_gust", "wind_direction"]
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".weather_cache")
+PAGE_SIZE = 1000     # Notes per select (Supabase max-rows default)
+UPDATE_CHUNK = 500   # Notes per backfill_note_weather call
+
+
+def get_client():
+    url = os.environ.get("SUPABASE_URL")
+    key = os.environ.get("SUPABASE_SERVICE_KEY")
+    if not url or not key:
+        print("Error: Missing SUPABASE_URL or SUPABASE_SERVICE_KEY")
+        sys.exit(1)
+    return create_client(url, key)
+
+
+def fetch_notes_missing_weather(supabase, page_size=PAGE_SIZE):
+    """id, created_at and weather of every practice_note with a NULL weather column, paged by id."""
+    missing = ",".join(f"{field}.is.null" for field in WEATHER_FIELDS)
+    columns = ", ".join(["id", "created_at"] + WEATHER_FIELDS)
+    notes = []
+    last_id = None
+    while True:
+        query = supabase.table("practice_notes").select(columns).or_(missing).order("id").limit(page_size)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        page = query.execute().data or []
+        notes.extend(page)
+        if len(page) < page_size:
+            return notes
+        last_id = page[-1]['id']
+
+
+def local_time(created_at):
+    """Note timestamp -> naive America/New_York datetime (the archive's local hours)."""
+    dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = pytz.utc.localize(dt)
+    return dt.astimezone(LOCAL_TZ).replace(tzinfo=None)
+
+
+def get_day_series(day, archive_url, cache_dir, http):
+    """Hourly series for one local day: from the cache, else one archive request."""
+    cache_path = os.path.join(cache_dir, f"{day}.json")
+    if os.path.exists(cache_path):
+        with open(cache_path) as f:
+            return parse_hourly(json.load(f)), True
+
+    resp = http.get(archive_url, params=archive_params(day), timeout=(3.05, 15))
+    resp.raise_for_status()
+    data = resp.json()
+
+    series = parse_hourly(data)
+    if series:
+        # Only cache days that actually have readings (recent days may still be empty)
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_path, "w") as f:
+            json.dump(data, f)
+    return series, False
+
+
+def fill_note(note, weather):
+    """Write-back row for a note: its id plus the weather fields it is missing."""
+    update = {"id": note['id']}
+    for field in WEATHER_FIELDS:
+        if note.get(field) is None:
+            update[field] = weather[field]
+    return update
+
+
+def backfill_weather(supabase, archive_url=ARCHIVE_URL, cache_dir=DEFAULT_CACHE_DIR, dry_run=False):
+    print("🔍 Scanning for notes without weather...")
+    notes = fetch_notes_missing_weather(supabase)
+    if not notes:
+        print("✅ No notes missing weather.")
+        return 0
+
+    # Group by local day: one archive request per day, not per note
+    by_day = {}
+    for note in notes:
+        when = local_time(note['created_at'])
+        by_day.setdefault(when.date().isoformat(), []).append((when, note))
+
+    print(f"🔄 {len(notes)} notes across {len(by_day)} days...")
+
+    http = requests.Session()
+    updates = []
+    for day in sorted(by_day):
+        try:
+            series, cached = get_day_series(day, archive_url, cache_dir, http)
+        except Exception as e:
+            print(f"❌ {day}: archive request failed: {e}")
+            continue
+
+        if not series:
+            print(f"   > {day}: no hourly data yet, skipped")
+            continue
+
+        for when, note in by_day[day]:
+            updates.append(fill_note(note, nearest_hour(series, when)))
+        print(f"   > {day}: {len(by_day[day])} notes{' (cached)' if cached else ''}")
+
+    if dry_run:
+        print(f"🧪 Dry run: {len(updates)} notes would be updated.")
+        return len(updates)
+
+    # Bulk update of the weather columns only (backfill_note_weather.sql); values
+    # filled in since the scan are kept
+    updated = 0
+    for start in range(0, len(updates), UPDATE_CHUNK):
+        res = supabase.rpc("backfill_note_weather", {"p_rows": updates[start:start + UPDATE_CHUNK]}).execute()
+        updated += res.data or 0
+
+    print(f"✅ Updated {updated} notes.")
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill missing weather on practice_notes from the Open-Meteo hourly archive.")
+    parser.add_argument("--archive-url", default=os.environ.get("OPEN_METEO_ARCHIVE_URL", ARCHIVE_URL),
+                        help="Archive endpoint (point at a local stub for testing).")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Where daily hourly series are cached.")
+    parser.add_argument("--dry-run", action="store_true", help="Fetch and match weather without writing.")
+    args = parser.parse_args()
+
+    backfill_weather(get_client(), args.archive_url, args.cache_dir, args.dry_run)
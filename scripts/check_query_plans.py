@@ -0,0 +1,197 @@
+import argparse
+import os
+import sys
+import time
+
+import psycopg2
+from dotenv import load_dotenv
+
+# Fails (exit 1) when one of the app's practice_notes / rounds reads would be
+# planned as a sequential scan on a large history.
+#
+# Point it at a local/dev Postgres with the migrations applied
+# (`python run_sql.py --migrate --database-url ...`). Synthetic rounds and notes are inserted, analyzed and explained inside
+# one transaction that is rolled back, so nothing is left behind.
+#
+#   python scripts/check_query_plans.py --database-url postgresql://localhost/mks
+
+load_dotenv()
+
+DEFAULT_USERS = 20
+DEFAULT_ROUNDS = 10_000     # x 18 holes of notes
+LAYOUTS = ["Shorts (Round 1)", "Longs (Round 2)"]
+SEED_PREFIX = "qp-check-"
+
+# (name, parameter types, SQL as the app/PostgREST/RPC bodies issue it)
+QUERIES = [
+    ("hole_bundle last_note", ["text", "integer"], """
+        SELECT * FROM practice_notes
+        WHERE layout = $1 AND hole_number = $2
+        ORDER BY created_at DESC
+        LIMIT 1
+    """),
+    ("hole_bundle round_notes", ["uuid", "integer"], """
+        SELECT * FROM practice_notes
+        WHERE round_id = $1 AND hole_number = $2
+        ORDER BY created_at
+    """),
+    ("resume_session latest round", ["uuid"], """
+        SELECT * FROM rounds
+        WHERE user_id = $1
+        ORDER BY created_at DESC
+        LIMIT 1
+    """),
+    ("resume_session next hole", ["uuid"], """
+        SELECT LEAST(MAX(hole_number) + 1, 18) FROM practice_notes
+        WHERE round_id = $1
+    """),
+    ("export round list", [], """
+        SELECT * FROM rounds
+        ORDER BY created_at DESC
+        LIMIT 20
+    """),
+    ("export round notes", ["uuid"], """
+        SELECT * FROM practice_notes
+        WHERE round_id = $1
+    """),
+    ("bulk export rounds page", ["timestamptz", "uuid"], """
+        SELECT * FROM rounds
+        WHERE created_at < $1 OR (created_at = $1 AND id < $2)
+        ORDER BY created_at DESC, id DESC
+        LIMIT 25
+    """),
+    ("shot export notes page", ["timestamptz", "integer"], """
+        SELECT * FROM practice_notes
+        WHERE created_at > $1 OR (created_at = $1 AND id > $2)
+        ORDER BY created_at, id
+        LIMIT 500
+    """),
+]
+
+# plpgsql/sql function bodies switch to a generic plan after a few calls, so both are checked
+PLAN_MODES = ["force_custom_plan", "force_generic_plan"]
+
+
+def seed_history(cur, n_users, n_rounds):
+    """Insert n_rounds rounds spread over n_users users, each with one note per hole."""
+    cur.execute("""
+        WITH users AS (
+            SELECT array_agg(gen_random_uuid()) AS ids FROM generate_series(1, %(users)s)
+        )
+        INSERT INTO rounds (name, layout, selected_discs, user_id, created_at, ended_at)
+        SELECT %(prefix)s || g,
+               (%(layouts)s::text[])[1 + g %% 2],
+               ARRAY['Aviar', 'Buzzz', 'Teebird'],
+               users.ids[1 + g %% %(users)s],
+               NOW() - g * INTERVAL '3 hours',
+               NOW() - g * INTERVAL '3 hours' + INTERVAL '2 hours'
+        FROM users, generate_series(1, %(rounds)s) g
+    """, {"users": n_users, "rounds": n_rounds, "prefix": SEED_PREFIX, "layouts": LAYOUTS})
+
+    cur.execute("""
+        INSERT INTO practice_notes
+            (round_id, user_id, hole_number, layout, disc_used, strokes, result_rating, created_at)
+        SELECT r.id, r.user_id, h, r.layout,
+               r.selected_discs[1 + h %% 3], 2 + h %% 3, 1 + h %% 5,
+               r.created_at + h * INTERVAL '5 minutes'
+        FROM rounds r, generate_series(1, 18) h
+        WHERE r.name LIKE %(pattern)s
+    """, {"pattern": f"{SEED_PREFIX}%"})
+
+    cur.execute("ANALYZE rounds")
+    cur.execute("ANALYZE practice_notes")
+
+
+def sample_params(cur):
+    """Parameter values for each query, taken from the seeded history."""
+    cur.execute("""
+        SELECT id, user_id, layout, created_at FROM rounds
+        WHERE name LIKE %s
+        ORDER BY created_at DESC
+        LIMIT 1
+    """, (f"{SEED_PREFIX}%",))
+    round_id, user_id, layout, created_at = cur.fetchone()
+
+    cur.execute("SELECT created_at, id FROM practice_notes WHERE round_id = %s ORDER BY hole_number LIMIT 1", (round_id,))
+    note_created_at, note_id = cur.fetchone()
+
+    return {
+        "hole_bundle last_note": (layout, 7),
+        "hole_bundle round_notes": (round_id, 7),
+        "resume_session latest round": (user_id,),
+        "resume_session next hole": (round_id,),
+        "export round list": (),
+        "export round notes": (round_id,),
+        "bulk export rounds page": (created_at, round_id),
+        "shot export notes page": (note_created_at, note_id),
+    }
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+def explain(cur, sql, types, params, mode):
+    """Plan nodes for one query under the given plan_cache_mode."""
+    cur.execute(f"SET LOCAL plan_cache_mode = {mode}")
+    signature = f"({', '.join(types)})" if types else ""
+    cur.execute(f"PREPARE qp_check{signature} AS {sql}")
+    try:
+        args = f"({', '.join(['%s'] * len(params))})" if params else ""
+        cur.execute(f"EXPLAIN (FORMAT JSON) EXECUTE qp_check{args}", params)
+        return list(plan_nodes(cur.fetchone()[0][0]['Plan']))
+    finally:
+        cur.execute("DEALLOCATE qp_check")
+
+
+def describe(nodes):
+    scans = [f"{n['Node Type']} using {n['Index Name']}" if 'Index Name' in n else f"{n['Node Type']} on {n['Relation Name']}"
+             for n in nodes if 'Index Name' in n or 'Relation Name' in n]
+    return ", ".join(scans) or nodes[0]['Node Type']
+
+
+def check_query_plans(database_url, n_users=DEFAULT_USERS, n_rounds=DEFAULT_ROUNDS):
+    """Explain every app query against a seeded history; returns the failing (query, mode) pairs."""
+    conn = psycopg2.connect(database_url)
+    failures = []
+    try:
+        with conn.cursor() as cur:
+            print(f"🌱 Seeding {n_rounds} rounds / {n_rounds * 18} notes for {n_users} users...")
+            start = time.perf_counter()
+            seed_history(cur, n_users, n_rounds)
+            print(f"   done in {time.perf_counter() - start:.1f}s")
+
+            params = sample_params(cur)
+            for name, types, sql in QUERIES:
+                for mode in PLAN_MODES:
+                    nodes = explain(cur, sql, types, params[name], mode)
+                    label = f"{name} [{mode.split('_')[1]}]"
+                    if any(n['Node Type'] == 'Seq Scan' for n in nodes):
+                        failures.append((name, mode))
+                        print(f"❌ {label}: {describe(nodes)}")
+                    else:
+                        print(f"✅ {label}: {describe(nodes)}")
+    finally:
+        conn.rollback()
+        conn.close()
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail if any app query on practice_notes/rounds plans a sequential scan.")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"),
+                        help="Local/dev Postgres with the migrations applied (default $DATABASE_URL).")
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS)
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="Synthetic rounds to seed (18 notes each).")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url (or DATABASE_URL) is required")
+
+    failures = check_query_plans(args.database_url, args.users, args.rounds)
+    if failures:
+        print(f"❌ {len(failures)} plan(s) fell back to a sequential scan.")
+        sys.exit(1)
+    print("✅ Every query uses an index.")
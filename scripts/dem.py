@@ -0,0 +1,93 @@
+import json
+import os
+
+import numpy as np
+
+# Offline elevation from a DEM tile covering Loriella Park.
+#
+# Supported tiles:
+#   - NumPy grid: `<name>.npy` (2-D, row 0 = north edge, elevations in feet) plus a
+#     sidecar `<name>.json` with {"west", "north", "pixel_width", "pixel_height"}
+#     in degrees (optional "nodata"). The grid is memory-mapped, never read whole.
+#   - GeoTIFF (EPSG:4326): needs `rasterio` (not in requirements.txt); the band is
+#     read once and its georeference taken from the file.
+#
+# Samples are pixel-centre based and bilinear; points outside the tile (or touching
+# nodata) come back as NaN so callers can fall back to the USGS web service.
+
+METERS_TO_FEET = 3.280839895
+
+
+class DemTile:
+    def __init__(self, grid, west, north, pixel_width, pixel_height, nodata=None):
+        self.grid = grid
+        self.west = west
+        self.north = north
+        self.pixel_width = pixel_width
+        self.pixel_height = pixel_height
+        self.nodata = nodata
+
+    @classmethod
+    def load(cls, path):
+        """Open a `.npy` (+ sidecar `.json`) or GeoTIFF tile."""
+        root, ext = os.path.splitext(path)
+        if ext.lower() == ".npy":
+            with open(f"{root}.json") as f:
+                meta = json.load(f)
+            grid = np.load(path, mmap_mode="r")
+            return cls(grid, meta["west"], meta["north"], meta["pixel_width"],
+                       meta["pixel_height"], meta.get("nodata"))
+
+        if ext.lower() in (".tif", ".tiff"):
+            try:
+                import rasterio
+            except ImportError:
+                raise ImportError("GeoTIFF tiles need rasterio (pip install rasterio), or convert the tile to .npy.")
+            with rasterio.open(path) as src:
+                grid = src.read(1)
+                transform = src.transform
+                nodata = src.nodata
+                # USGS 1/3 arc-second DEMs are in meters
+                units = (src.units[0] if src.units else None) or "metre"
+            if units.lower() in ("metre", "meter", "m", "metres", "meters"):
+                grid = grid * METERS_TO_FEET
+                nodata = nodata * METERS_TO_FEET if nodata is not None else None
+            return cls(grid, transform.c, transform.f, transform.a, -transform.e, nodata)
+
+        raise ValueError(f"Unsupported DEM format: {path}")
+
+    def sample(self, lats, lons):
+        """Bilinear elevation (feet) for arrays of points; NaN outside the tile."""
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        rows_n, cols_n = self.grid.shape
+
+        # Fractional pixel coordinates relative to pixel centres
+        x = (lons - self.west) / self.pixel_width - 0.5
+        y = (self.north - lats) / self.pixel_height - 0.5
+
+        inside = (x >= 0) & (y >= 0) & (x <= cols_n - 1) & (y <= rows_n - 1)
+        x = np.where(inside, x, 0.0)
+        y = np.where(inside, y, 0.0)
+
+        c0 = np.minimum(np.floor(x).astype(np.intp), max(cols_n - 2, 0))
+        r0 = np.minimum(np.floor(y).astype(np.intp), max(rows_n - 2, 0))
+        c1 = np.minimum(c0 + 1, cols_n - 1)
+        r1 = np.minimum(r0 + 1, rows_n - 1)
+        fx = x - c0
+        fy = y - r0
+
+        # Fancy indexing touches only the needed pages of a memory-mapped grid
+        z00 = np.asarray(self.grid[r0, c0], dtype=np.float64)
+        z01 = np.asarray(self.grid[r0, c1], dtype=np.float64)
+        z10 = np.asarray(self.grid[r1, c0], dtype=np.float64)
+        z11 = np.asarray(self.grid[r1, c1], dtype=np.float64)
+
+        result = (z00 * (1 - fx) * (1 - fy) + z01 * fx * (1 - fy)
+                  + z10 * (1 - fx) * fy + z11 * fx * fy)
+
+        invalid = ~inside
+        if self.nodata is not None:
+            invalid |= np.isclose(z00, self.nodata) | np.isclose(z01, self.nodata) \
+                | np.isclose(z10, self.nodata) | np.isclose(z11, self.nodata)
+        return np.where(invalid, np.nan, result)
@@ -0,0 +1,135 @@
+import argparse
+import sys
+
+import numpy as np
+
+# Batch geometry kernel for hole_geometry.
+# Vincenty's inverse formula on the WGS-84 ellipsoid, vectorized over arrays of
+# tee/basket points: sub-millimetre agreement with geopy's Karney geodesic for
+# anything short of near-antipodal points (irrelevant on a golf course).
+
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = (1 - WGS84_F) * WGS84_A
+
+METERS_TO_FEET = 3.280839895
+MAX_ITERATIONS = 200
+CONVERGENCE = 1e-12
+
+
+def inverse(lat1, lon1, lat2, lon2):
+    """Distance (m) and initial bearing (deg, 0 = north, clockwise) between point arrays."""
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(
+        *(np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    )
+    a, b, f = WGS84_A, WGS84_B, WGS84_F
+
+    L = lon2 - lon1
+    U1 = np.arctan((1 - f) * np.tan(lat1))
+    U2 = np.arctan((1 - f) * np.tan(lat2))
+    sinU1, cosU1 = np.sin(U1), np.cos(U1)
+    sinU2, cosU2 = np.sin(U2), np.cos(U2)
+
+    lam = L.copy()
+    for _ in range(MAX_ITERATIONS):
+        sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+        sin_sigma = np.hypot(cosU2 * sin_lam, cosU1 * sinU2 - sinU1 * cosU2 * cos_lam)
+        cos_sigma = sinU1 * sinU2 + cosU1 * cosU2 * cos_lam
+        sigma = np.arctan2(sin_sigma, cos_sigma)
+
+        coincident = sin_sigma == 0
+        sin_alpha = np.where(coincident, 0.0, cosU1 * cosU2 * sin_lam / np.where(coincident, 1.0, sin_sigma))
+        cos2_alpha = 1 - sin_alpha ** 2
+        equatorial = cos2_alpha == 0
+        cos_2sigma_m = np.where(
+            equatorial, 0.0,
+            cos_sigma - 2 * sinU1 * sinU2 / np.where(equatorial, 1.0, cos2_alpha)
+        )
+        C = f / 16 * cos2_alpha * (4 + f * (4 - 3 * cos2_alpha))
+        lam_prev = lam
+        lam = L + (1 - C) * f * sin_alpha * (
+            sigma + C * sin_sigma * (cos_2sigma_m + C * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2))
+        )
+        if np.all(np.abs(lam - lam_prev) < CONVERGENCE):
+            break
+
+    u2 = cos2_alpha * (a ** 2 - b ** 2) / b ** 2
+    A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+    B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+    delta_sigma = B * sin_sigma * (cos_2sigma_m + B / 4 * (
+        cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)
+        - B / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sigma_m ** 2)
+    ))
+    distance = b * A * (sigma - delta_sigma)
+
+    sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+    bearing = np.degrees(np.arctan2(cosU2 * sin_lam, cosU1 * sinU2 - sinU1 * cosU2 * cos_lam)) % 360
+    return distance, bearing
+
+
+def hole_geometry_batch(tee_lat, tee_lon, basket_lat, basket_lon, tee_elev=None, basket_elev=None):
+    """Distance (ft), throwing bearing (deg) and elevation change (ft) for every hole at once.
+
+    Elevation change is basket - tee (negative = downhill); NaN where either
+    elevation is missing.
+    """
+    distance_m, bearing = inverse(tee_lat, tee_lon, basket_lat, basket_lon)
+
+    if tee_elev is None or basket_elev is None:
+        elevation_change = np.full(distance_m.shape, np.nan)
+    else:
+        elevation_change = np.asarray(basket_elev, dtype=np.float64) - np.asarray(tee_elev, dtype=np.float64)
+
+    return {
+        "distance_feet": distance_m * METERS_TO_FEET,
+        "bearing_deg": bearing,
+        "elevation_change_feet": elevation_change
+    }
+
+
+def validate_against_geopy(n=2000, seed=0, center=(38.2544, -77.5443), spread=0.05, long_range_share=0.5):
+    """Compare the kernel with geopy on random point pairs.
+
+    Includes course-scale pairs around `center` plus long-range pairs
+    (`long_range_share` of the `n`).
+    Returns (max distance error in mm, max bearing error in degrees).
+    """
+    from geopy.distance import geodesic
+    from geographiclib.geodesic import Geodesic
+
+    rng = np.random.default_rng(seed)
+    half = n - round(n * long_range_share)
+    lat1 = np.concatenate([center[0] + rng.uniform(-spread, spread, half), rng.uniform(-80, 80, n - half)])
+    lon1 = np.concatenate([center[1] + rng.uniform(-spread, spread, half), rng.uniform(-180, 180, n - half)])
+    lat2 = np.concatenate([center[0] + rng.uniform(-spread, spread, half), rng.uniform(-80, 80, n - half)])
+    lon2 = np.concatenate([center[1] + rng.uniform(-spread, spread, half), rng.uniform(-180, 180, n - half)])
+
+    distance, bearing = inverse(lat1, lon1, lat2, lon2)
+
+    max_dist_err = 0.0
+    max_bearing_err = 0.0
+    for i in range(n):
+        expected = geodesic((lat1[i], lon1[i]), (lat2[i], lon2[i])).meters
+        expected_bearing = Geodesic.WGS84.Inverse(lat1[i], lon1[i], lat2[i], lon2[i])['azi1'] % 360
+        # Skip near-antipodal pairs, where Vincenty is known not to converge
+        if expected > 19_000_000:
+            continue
+        max_dist_err = max(max_dist_err, abs(distance[i] - expected) * 1000)
+        diff = abs(bearing[i] - expected_bearing) % 360
+        max_bearing_err = max(max_bearing_err, min(diff, 360 - diff))
+
+    return max_dist_err, max_bearing_err
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate the vectorized geodesic kernel against geopy.")
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--tolerance-mm", type=float, default=1.0)
+    args = parser.parse_args()
+
+    dist_err, bearing_err = validate_against_geopy(args.samples)
+    print(f"Max distance error: {dist_err:.4f} mm | Max bearing error: {bearing_err:.2e}°")
+    if dist_err > args.tolerance_mm or bearing_err > 1e-6:
+        print("❌ Kernel disagrees with geopy beyond tolerance.")
+        sys.exit(1)
+    print("✅ Kernel matches geopy.")
@@ -1,28 +1,62 @@
+import argparse
+import json
 import os
+import select
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import psycopg2
+import psycopg2.extras
 import requests
 from supabase import create_client
-from geopy.distance import geodesic
 from dotenv import load_dotenv
 
+from geodesy import hole_geometry_batch
+
 # Load env from parent dir if needed, or current
 load_dotenv()
 
-# Setup Supabase
-SUPABASE_URL = os.environ.get("SUPABASE_URL")
-SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
+DEFAULT_CONCURRENCY = 8
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_POLL_INTERVAL = 60    # Seconds; the fallback when LISTEN isn't available
+DEBOUNCE_SECONDS = 2
+NOTIFY_CHANNEL = "hole_geometry_dirty"
+DEFAULT_DEM_PATH = os.environ.get("MKS_DEM_PATH")
+# Elevations are cached by rounded coordinates: 5 decimals is ~1 m, and shared
+# tees/baskets across layouts resolve to the same key.
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".elevation_cache.json")
+CACHE_PRECISION = 5
+
+_local = threading.local()
+
+
+def get_client():
+    """Setup Supabase (service key: this script writes past RLS)."""
+    supabase_url = os.environ.get("SUPABASE_URL")
+    supabase_key = os.environ.get("SUPABASE_SERVICE_KEY")
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    print("Error: Missing SUPABASE_URL or SUPABASE_SERVICE_KEY")
-    sys.exit(1)
+    if not supabase_url or not supabase_key:
+        print("Error: Missing SUPABASE_URL or SUPABASE_SERVICE_KEY")
+        sys.exit(1)
+
+    return create_client(supabase_url, supabase_key)
+
+
+def _http():
+    # One keep-alive session per worker thread
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 def get_elevation(lat, lon):
     """Fetch elevation in feet from USGS EPQS API."""
     try:
         url = f"https://epqs.nationalmap.gov/v1/json?x={lon}&y={lat}&wkid=4326&units=Feet&includeDate=false"
-        resp = requests.get(url, timeout=10)
+        resp = _http().get(url, timeout=10)
         data = resp.json()
         if 'value' in data:
              return float(data['value'])
@@ -31,58 +65,317 @@ def get_elevation(lat, lon):
         print(f"Error fetching elevation for {lat}, {lon}: {e}")
         return None
 
-def process_geometry():
-    print("🔍 Scanning for unprocessed geometry...")
-    
-    # Fetch rows where distance is NULL but we have coords
-    # Note: 'is' operator checks for NULL in postgrest
-    res = supabase.table("hole_geometry")\
+
+def point_key(lat, lon):
+    return f"{round(lat, CACHE_PRECISION)},{round(lon, CACHE_PRECISION)}"
+
+
+def load_cache(path=CACHE_PATH):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def save_cache(cache, path=CACHE_PATH):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def fetch_elevations(points, cache, concurrency=DEFAULT_CONCURRENCY):
+    """Resolve elevations for (lat, lon) points, fanning cache misses out over a thread pool.
+
+    Updates `cache` in place (failed lookups are not cached) and returns the
+    number of HTTP lookups made.
+    """
+    misses = {}
+    for lat, lon in points:
+        key = point_key(lat, lon)
+        if key not in cache:
+            misses[key] = (lat, lon)
+
+    if not misses:
+        return 0
+
+    keys = list(misses)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        results = pool.map(lambda key: get_elevation(*misses[key]), keys)
+        for key, elevation in zip(keys, results):
+            if elevation is not None:
+                cache[key] = elevation
+
+    return len(keys)
+
+
+def dem_elevations(points, dem_path):
+    """Sample every point from a local DEM tile in one vectorized call.
+
+    Returns {point_key: elevation}; points the tile can't answer are left out.
+    """
+    from dem import DemTile
+
+    tile = DemTile.load(dem_path)
+    lats = [p[0] for p in points]
+    lons = [p[1] for p in points]
+    values = tile.sample(lats, lons)
+
+    elevations = {}
+    for (lat, lon), value in zip(points, values):
+        if value == value:  # Skip NaN (outside tile / nodata)
+            elevations[point_key(lat, lon)] = float(value)
+    return elevations
+
+
+def compute_geometry(rows, elevations):
+    """Distance / bearing / elevation delta for a batch of hole_geometry rows, in one kernel call.
+
+    Returns the upsert payloads (keys + computed columns only, so coordinates
+    edited in the meantime are never overwritten).
+    """
+    if not rows:
+        return []
+
+    # Elevations (already fetched); NaN where a lookup failed
+    def elevation(lat, lon):
+        value = elevations.get(point_key(lat, lon))
+        return np.nan if value is None else value
+
+    tee_elev = [elevation(r['tee_lat'], r['tee_lon']) for r in rows]
+    basket_elev = [elevation(r['basket_lat'], r['basket_lon']) for r in rows]
+
+    # Elevation change is Basket - Tee: Basket (100) < Tee (120) gives -20 (downhill)
+    geometry = hole_geometry_batch(
+        [r['tee_lat'] for r in rows], [r['tee_lon'] for r in rows],
+        [r['basket_lat'] for r in rows], [r['basket_lon'] for r in rows],
+        tee_elev, basket_elev
+    )
+
+    payloads = []
+    for i, row in enumerate(rows):
+        elev_delta = geometry["elevation_change_feet"][i]
+        payloads.append({
+            "id": row['id'],
+            "hole_number": row['hole_number'],
+            "layout": row['layout'],
+            "distance_feet": round(float(geometry["distance_feet"][i]), 1),
+            "bearing_deg": round(float(geometry["bearing_deg"][i]), 2),
+            "elevation_change_feet": round(float(elev_delta), 1) if not np.isnan(elev_delta) else None
+        })
+    return payloads
+
+
+def fetch_dirty(db, limit=DEFAULT_BATCH_SIZE, after_id=None):
+    """Mapped rows whose coordinates changed since they were last processed (see geometry_tracking.sql).
+
+    `db` is a Supabase client or an autocommit psycopg2 connection (--direct). Rows come in id
+    order; pass the last id seen as `after_id` to get the next page.
+    """
+    if isinstance(db, psycopg2.extensions.connection):
+        with db.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            cur.execute(
+                """SELECT * FROM hole_geometry
+                   WHERE geometry_dirty AND tee_lat IS NOT NULL AND basket_lat IS NOT NULL
+                     AND (%s::uuid IS NULL OR id > %s::uuid)
+                   ORDER BY id LIMIT %s""",
+                (after_id, after_id, limit))
+            return [dict(row) for row in cur.fetchall()]
+
+    query = db.table("hole_geometry")\
         .select("*")\
+        .eq("geometry_dirty", True)\
         .not_.is_("tee_lat", "null")\
-        .not_.is_("basket_lat", "null")\
-        .is_("distance_feet", "null")\
-        .execute()
-        
-    rows = res.data
-    if not rows:
-        print("✅ No unprocessed records found.")
+        .not_.is_("basket_lat", "null")
+    if after_id is not None:
+        query = query.gt("id", after_id)
+    res = query.order("id").limit(limit).execute()
+    return res.data or []
+
+
+def write_geometry(db, payloads):
+    """Write computed columns back; the tracking trigger drops results for rows that moved meanwhile."""
+    if isinstance(db, psycopg2.extensions.connection):
+        with db.cursor() as cur:
+            psycopg2.extras.execute_values(cur, """
+                UPDATE hole_geometry g SET
+                    distance_feet = v.distance_feet,
+                    bearing_deg = v.bearing_deg,
+                    elevation_change_feet = v.elevation_change_feet,
+                    processed_version = v.processed_version
+                FROM (VALUES %s) AS v (id, distance_feet, bearing_deg, elevation_change_feet, processed_version)
+                WHERE g.id = v.id""",
+                [(p['id'], p['distance_feet'], p['bearing_deg'], p['elevation_change_feet'], p['processed_version'])
+                 for p in payloads],
+                template="(%s::uuid, %s::float8, %s::float8, %s::float8, %s::bigint)",
+                page_size=len(payloads))
         return
 
-    print(f"🔄 Processing {len(rows)} records...")
-    
-    for row in rows:
+    db.table("hole_geometry").upsert(payloads).execute()
+
+
+def process_batch(db, rows, concurrency=DEFAULT_CONCURRENCY, cache_path=CACHE_PATH, elevation_source="usgs", dem_path=DEFAULT_DEM_PATH):
+    """Compute and write back one batch of dirty rows; returns the number written."""
+    timings = {}
+    started = time.perf_counter()
+
+    # 1. Elevations for every tee/basket: DEM tile first (if selected), then USGS (concurrent, cached)
+    points = [(r['tee_lat'], r['tee_lon']) for r in rows] + [(r['basket_lat'], r['basket_lon']) for r in rows]
+    elevations = {}
+    if elevation_source == "dem":
+        elevations = dem_elevations(points, dem_path)
+        print(f"   DEM: {len(elevations)} points from {dem_path}")
+
+    cache = load_cache(cache_path)
+    fallback_points = [p for p in points if point_key(*p) not in elevations]
+    lookups = fetch_elevations(fallback_points, cache, concurrency)
+    if lookups:
+        save_cache(cache, cache_path)
+    elevations = {**cache, **elevations}
+    timings["elevation"] = time.perf_counter() - started
+
+    # 2. Geometry for every row in one vectorized pass
+    step = time.perf_counter()
+    payloads = compute_geometry(rows, elevations)
+    for payload, row in zip(payloads, rows):
+        # Tag the result with the coordinates' version; the trigger drops it if they have moved since
+        payload["processed_version"] = row['geometry_version']
+        print(f"   > Hole {payload['hole_number']} ({payload['layout']}): {payload['distance_feet']:.1f} ft @ {payload['bearing_deg']:.0f}° | Δ {payload['elevation_change_feet']} ft")
+    timings["compute"] = time.perf_counter() - step
+
+    # 3. One batched upsert for all rows
+    step = time.perf_counter()
+    if payloads:
+        write_geometry(db, payloads)
+    timings["write"] = time.perf_counter() - step
+
+    unique_points = len({point_key(*p) for p in points})
+    print(f"   ⏱️ {len(payloads)} rows in {time.perf_counter() - started:.2f}s "
+          f"(elevation {timings['elevation']:.2f}s | compute {timings['compute']:.2f}s | write {timings['write']:.2f}s)")
+    print(f"   Elevation ({elevation_source}): {unique_points} unique points, "
+          f"{lookups} USGS lookups (concurrency {concurrency})")
+    return len(payloads)
+
+
+def process_geometry(db, batch_size=DEFAULT_BATCH_SIZE, **options):
+    """Process every dirty row, batch by batch; returns the number of rows written.
+
+    One pass walks the dirty rows in id order and visits each at most once: a row
+    still dirty after its write-back (moved mid-batch, so the trigger rejected the
+    result) is picked up on the next pass rather than re-fetched in this one.
+    """
+    print("🔍 Scanning for changed geometry...")
+    total = 0
+    after_id = None
+    while True:
+        rows = fetch_dirty(db, batch_size, after_id)
+        if not rows:
+            break
+        print(f"🔄 Processing {len(rows)} records...")
+        total += process_batch(db, rows, **options)
+        if len(rows) < batch_size:
+            break
+        after_id = rows[-1]['id']
+
+    if total:
+        print(f"✅ Processed {total} records.")
+    else:
+        print("✅ No changed records found.")
+    return total
+
+
+def open_database(database_url):
+    """Direct Postgres connection for reading and writing hole_geometry (--direct)."""
+    conn = psycopg2.connect(database_url)
+    conn.autocommit = True
+    return conn
+
+
+# --- WATCH MODE ---
+def open_listener(database_url):
+    """Direct Postgres connection LISTENing for hole_geometry_dirty notifications."""
+    conn = psycopg2.connect(database_url)
+    conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    with conn.cursor() as cur:
+        cur.execute(f"LISTEN {NOTIFY_CHANNEL};")
+    return conn
+
+
+def wait_for_changes(listener, timeout):
+    """Block until a notification arrives (or `timeout` seconds pass). Returns True if woken."""
+    if listener is None:
+        time.sleep(timeout)
+        return False
+    if select.select([listener], [], [], timeout) == ([], [], []):
+        return False
+    listener.poll()
+    listener.notifies.clear()
+    return True
+
+
+def watch_geometry(db, database_url=None, poll_interval=DEFAULT_POLL_INTERVAL, batch_size=DEFAULT_BATCH_SIZE, **options):
+    """Long-running worker: process dirty rows as they appear.
+
+    With a database URL it sleeps on LISTEN/NOTIFY and the poll interval is only a
+    safety net; without one it polls.
+    """
+    listener = None
+    while True:
+        if database_url and listener is None:
+            try:
+                listener = open_listener(database_url)
+                print(f"👂 Listening on {NOTIFY_CHANNEL} (fallback poll every {poll_interval}s)")
+            except psycopg2.Error as e:
+                print(f"⚠️ LISTEN unavailable, polling every {poll_interval}s: {e}")
+
         try:
-            hole_str = f"Hole {row['hole_number']} ({row['layout']})"
-            tee = (row['tee_lat'], row['tee_lon'])
-            basket = (row['basket_lat'], row['basket_lon'])
-            
-            # 1. Calculate Distance
-            # geodesic returns km by default, .feet for feet
-            dist_feet = geodesic(tee, basket).feet
-            
-            # 2. Fetch Elevations
-            elev_tee = get_elevation(tee[0], tee[1])
-            elev_basket = get_elevation(basket[0], basket[1])
-            
-            elev_delta = None
-            if elev_tee is not None and elev_basket is not None:
-                # Positive delta means uphill? 
-                # Usually elevation change is Basket - Tee. 
-                # If Basket (100) < Tee (120), result is -20 (Downhill).
-                elev_delta = elev_basket - elev_tee
-            
-            print(f"   > {hole_str}: {dist_feet:.1f} ft | Δ {elev_delta} ft")
-            
-            # 3. Update DB
-            update_payload = {
-                "distance_feet": round(dist_feet, 1),
-                "elevation_change_feet": round(elev_delta, 1) if elev_delta is not None else None
-            }
-            
-            supabase.table("hole_geometry").update(update_payload).eq("id", row['id']).execute()
-            
+            process_geometry(db, batch_size, **options)
         except Exception as e:
-            print(f"❌ Failed to process {row.get('id')}: {e}")
+            print(f"❌ Batch failed, retrying on the next wake-up: {e}")
+
+        try:
+            if wait_for_changes(listener, poll_interval):
+                # Mapping sets the tee and then the basket: let the burst settle
+                time.sleep(DEBOUNCE_SECONDS)
+                if listener is not None:
+                    listener.poll()
+                    listener.notifies.clear()
+        except (psycopg2.Error, OSError) as e:
+            print(f"⚠️ Listener dropped, reconnecting: {e}")
+            listener = None
+
 
 if __name__ == "__main__":
-    process_geometry()
+    parser = argparse.ArgumentParser(description="Compute distance, bearing and elevation change for mapped holes whose coordinates changed.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Parallel USGS elevation requests.")
+    parser.add_argument("--cache", default=CACHE_PATH, help="Elevation cache file.")
+    parser.add_argument("--elevation", choices=["usgs", "dem"], default="usgs",
+                        help="Elevation source; 'dem' samples a local tile and falls back to USGS for misses.")
+    parser.add_argument("--dem", default=DEFAULT_DEM_PATH,
+                        help="DEM tile (.npy with sidecar .json, or GeoTIFF). Defaults to $MKS_DEM_PATH.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per fetch/upsert.")
+    parser.add_argument("--watch", action="store_true", help="Keep running and process rows as they change.")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"),
+                        help="Postgres URL for LISTEN/NOTIFY in --watch mode (default $DATABASE_URL); polls without it.")
+    parser.add_argument("--direct", action="store_true",
+                        help="Read and write hole_geometry over --database-url (e.g. a local Postgres) instead of Supabase REST.")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help="Seconds between polls in --watch mode.")
+    args = parser.parse_args()
+
+    if args.elevation == "dem" and not args.dem:
+        parser.error("--elevation dem needs --dem PATH (or MKS_DEM_PATH)")
+    if args.direct and not args.database_url:
+        parser.error("--direct needs --database-url (or DATABASE_URL)")
+
+    options = dict(concurrency=args.concurrency, cache_path=args.cache,
+                   elevation_source=args.elevation, dem_path=args.dem)
+    db = open_database(args.database_url) if args.direct else get_client()
+    if args.watch:
+        try:
+            watch_geometry(db, args.database_url, args.poll_interval, args.batch_size, **options)
+        except KeyboardInterrupt:
+            print("\n👋 Stopped.")
+    else:
+        process_geometry(db, args.batch_size, **options)
@@ -0,0 +1,138 @@
+import threading
+import time
+
+import httpx
+from postgrest import SyncPostgrestClient
+from supabase import create_client, ClientOptions
+
+# One keep-alive HTTP connection pool per process for all PostgREST traffic.
+# create_client() builds fresh httpx clients (new TCP + TLS handshakes) every time it is
+# called; here each user gets a lightweight PostgREST client that carries their own
+# Authorization header but sends requests over the shared pool. httpx.Client is
+# thread-safe, and auth headers are passed per request, never stored on the pool.
+#
+# Auth calls (sign-in, refresh, sign-out) are rare and stateful, so they use a
+# throwaway supabase client that never persists or auto-refreshes a session.
+
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE = 10
+KEEPALIVE_EXPIRY = 60             # Seconds an idle connection stays open
+TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+
+class UserClient:
+    """The table()/rpc() surface of a supabase client, sending requests as one user over the pool."""
+
+    def __init__(self, pool, access_token=None):
+        self.access_token = access_token
+        self._pool = pool
+        self.postgrest = SyncPostgrestClient(
+            pool.rest_url,
+            headers={
+                "apikey": pool.key,
+                "Authorization": f"Bearer {access_token or pool.key}",
+                "Accept": "application/json",
+                "Content-Type": "application/json"
+            },
+            http_client=pool.http
+        )
+
+    def table(self, name):
+        return self.postgrest.from_(name)
+
+    from_ = table
+
+    def rpc(self, fn, params=None):
+        return self.postgrest.rpc(fn, params or {})
+
+    def last_response_bytes(self):
+        """Bytes received for the last response on this thread (see SupabasePool.last_response_bytes)."""
+        return self._pool.last_response_bytes()
+
+
+class SupabasePool:
+    """Process-wide HTTP pool plus a factory for per-user clients."""
+
+    def __init__(self, url, key, max_connections=MAX_CONNECTIONS, max_keepalive=MAX_KEEPALIVE, timeout=TIMEOUT):
+        self.url = url.rstrip("/")
+        self.key = key
+        self.rest_url = f"{self.url}/rest/v1"
+
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._connections = 0
+        self._errors = 0
+        self._total_seconds = 0.0
+        # Last response per thread; httpx runs event hooks on the calling thread
+        self._local = threading.local()
+
+        self.http = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=KEEPALIVE_EXPIRY
+            ),
+            timeout=timeout,
+            follow_redirects=True,
+            event_hooks={"request": [self._on_request], "response": [self._on_response]}
+        )
+
+    def client(self, access_token=None):
+        """PostgREST client for one user (anon key when no token). Cheap: no network, no new connections."""
+        return UserClient(self, access_token)
+
+    def auth(self):
+        """Throwaway auth client for sign-in / refresh / sign-out."""
+        return create_client(self.url, self.key, ClientOptions(
+            auto_refresh_token=False,
+            persist_session=False
+        )).auth
+
+    def stats(self):
+        """Request and connection-reuse counters since the pool was created (avg_ms is time to response headers)."""
+        with self._stats_lock:
+            requests_made = self._requests
+            opened = self._connections
+            errors = self._errors
+            total = self._total_seconds
+        reused = max(requests_made - opened, 0)
+        return {
+            "requests": requests_made,
+            "connections_opened": opened,
+            "reused": reused,
+            "reuse_rate": reused / requests_made if requests_made else 0.0,
+            "errors": errors,
+            "avg_ms": total / requests_made * 1000 if requests_made else 0.0
+        }
+
+    def last_response_bytes(self):
+        """Bytes received on the wire (compressed) for this thread's last response, or 0.
+
+        Read after execute(): the body has been downloaded by then.
+        """
+        response = getattr(self._local, "response", None)
+        return response.num_bytes_downloaded if response is not None else 0
+
+    def close(self):
+        self.http.close()
+
+    # --- STATS HOOKS ---
+    def _trace(self, event_name, info):
+        # httpcore reports every new TCP connection; everything else rode an idle one
+        if event_name == "connection.connect_tcp.complete":
+            with self._stats_lock:
+                self._connections += 1
+
+    def _on_request(self, request):
+        request.extensions["trace"] = self._trace
+        request.extensions["mks_started"] = time.perf_counter()
+        self._local.response = None
+
+    def _on_response(self, response):
+        elapsed = time.perf_counter() - response.request.extensions.get("mks_started", time.perf_counter())
+        self._local.response = response
+        with self._stats_lock:
+            self._requests += 1
+            self._total_seconds += elapsed
+            if response.status_code >= 400:
+                self._errors += 1
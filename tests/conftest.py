@@ -0,0 +1,82 @@
+import contextlib
+import io
+import os
+import sys
+
+import psycopg2
+import pytest
+from psycopg2.extensions import make_dsn, parse_dsn
+
+# Shared setup for the tests. Database tests run against a throwaway database on the
+# Postgres server in $TEST_DATABASE_URL (needs CREATE DATABASE) and are skipped without it:
+#
+#   TEST_DATABASE_URL=postgresql://postgres@localhost/postgres pytest tests
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, "scripts"))
+
+import run_sql  # noqa: E402
+
+# The parts of a Supabase database the migrations expect (plain Postgres has none of them)
+SUPABASE_SHIM_SQL = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN CREATE ROLE anon; END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN CREATE ROLE authenticated; END IF;
+END;
+$$;
+CREATE SCHEMA IF NOT EXISTS auth;
+CREATE TABLE IF NOT EXISTS auth.users (id UUID PRIMARY KEY);
+CREATE OR REPLACE FUNCTION auth.uid() RETURNS UUID
+LANGUAGE sql STABLE
+AS $$ SELECT NULLIF(current_setting('request.jwt.claim.sub', true), '')::UUID $$;
+"""
+
+# Everything a test may write; emptied before each database test
+# (practice_stats is emptied by the practice_notes TRUNCATE trigger)
+DATA_TABLES = "practice_notes, rounds, hole_geometry"
+
+
+@pytest.fixture(scope="session")
+def database_url():
+    """URL of a fresh database with every migration applied (dropped after the run)."""
+    admin_url = os.environ.get("TEST_DATABASE_URL")
+    if not admin_url:
+        pytest.skip("TEST_DATABASE_URL not set")
+
+    name = f"mks_test_{os.getpid()}"
+    admin = psycopg2.connect(admin_url)
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute(f"DROP DATABASE IF EXISTS {name}")
+        cur.execute(f"CREATE DATABASE {name}")
+
+    url = make_dsn(**dict(parse_dsn(admin_url), dbname=name))
+    conn = psycopg2.connect(url)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(SUPABASE_SHIM_SQL)
+        conn.commit()
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert run_sql.migrate(conn)
+    finally:
+        conn.close()
+
+    yield url
+
+    with admin.cursor() as cur:
+        cur.execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+    admin.close()
+
+
+@pytest.fixture
+def db(database_url):
+    """Autocommit connection to the test database, with the data tables emptied."""
+    conn = psycopg2.connect(database_url)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute(f"TRUNCATE {DATA_TABLES} RESTART IDENTITY CASCADE")
+    yield conn
+    conn.close()
@@ -0,0 +1,201 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import backfill_weather
+from weather import HOURLY_FIELDS
+
+# End to end: backfill_weather() against a local Open-Meteo archive stub and an
+# in-memory practice_notes table.
+
+EMPTY_DAY = "2024-06-03"    # The stub has no readings yet for this day
+
+
+def hourly_payload(day):
+    """One day of readings where every value encodes its hour (temperature == hour)."""
+    if day == EMPTY_DAY:
+        return {"hourly": {"time": [], **{field: [] for field in HOURLY_FIELDS.split(",")}}}
+    hours = range(24)
+    return {"hourly": {
+        "time": [f"{day}T{h:02d}:00" for h in hours],
+        "temperature_2m": [float(h) for h in hours],
+        "wind_speed_10m": [h + 0.4 for h in hours],
+        "wind_gusts_10m": [h + 5.0 for h in hours],
+        "wind_direction_10m": [h * 15.0 for h in hours],
+    }}
+
+
+@pytest.fixture
+def archive():
+    """Archive stub on a free local port; `requests` lists the days asked for."""
+    requested = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            day = query['start_date'][0]
+            assert query['end_date'] == [day]
+            requested.append(day)
+            body = json.dumps(hourly_payload(day)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield SimpleNamespace(url=f"http://127.0.0.1:{server.server_port}/v1/archive", requests=requested)
+    server.shutdown()
+    server.server_close()
+
+
+class FakeNotes:
+    """practice_notes behind the two calls the backfill makes: the paged select and the RPC."""
+
+    def __init__(self, rows):
+        self.rows = {row['id']: dict(row) for row in rows}
+        self.selected = []
+        self.rpc_rows = []
+
+    def table(self, name):
+        assert name == "practice_notes"
+        return _Select(self)
+
+    def rpc(self, name, params):
+        assert name == "backfill_note_weather"
+        self.rpc_rows.extend(params['p_rows'])
+        count = 0
+        for update in params['p_rows']:
+            row = self.rows[update['id']]
+            if any(row[f] is None for f in backfill_weather.WEATHER_FIELDS):
+                count += 1
+            for field in backfill_weather.WEATHER_FIELDS:
+                if row[field] is None:
+                    row[field] = update.get(field)
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=count))
+
+
+class _Select:
+    def __init__(self, notes):
+        self.notes = notes
+        self.after = None
+        self.page_size = None
+
+    def select(self, columns):
+        self.columns = [c.strip() for c in columns.split(",")]
+        self.notes.selected.append(self.columns)
+        return self
+
+    def or_(self, filters):
+        assert filters == ",".join(f"{f}.is.null" for f in backfill_weather.WEATHER_FIELDS)
+        return self
+
+    def order(self, column):
+        assert column == "id"
+        return self
+
+    def limit(self, n):
+        self.page_size = n
+        return self
+
+    def gt(self, column, value):
+        self.after = value
+        return self
+
+    def execute(self):
+        rows = [r for _, r in sorted(self.notes.rows.items())
+                if any(r[f] is None for f in backfill_weather.WEATHER_FIELDS)
+                and (self.after is None or r['id'] > self.after)]
+        page = [{c: r[c] for c in self.columns} for r in rows[:self.page_size]]
+        return SimpleNamespace(data=page)
+
+
+def note(note_id, created_at, **weather):
+    row = {"id": note_id, "created_at": created_at, "notes": f"note {note_id}", "strokes": 3}
+    row.update({field: weather.get(field) for field in backfill_weather.WEATHER_FIELDS})
+    return row
+
+
+def test_backfill_fills_missing_weather_from_nearest_hour(archive, tmp_path, monkeypatch):
+    monkeypatch.setattr(backfill_weather, "PAGE_SIZE", 2)   # Exercise keyset paging
+    notes = FakeNotes([
+        note(1, "2024-06-01T14:20:00+00:00"),                    # 10:20 EDT -> 10:00
+        note(2, "2024-06-01T14:40:00Z"),                         # 10:40 EDT -> 11:00
+        note(3, "2024-06-01T23:50:00+00:00", temperature=99),    # 19:50 EDT -> 20:00, keeps its temperature
+        note(4, "2024-06-01T15:00:00+00:00", temperature=70, wind_speed=5, wind_gust=9, wind_direction="N"),
+        note(5, "2024-06-02T04:10:00+00:00"),                    # 00:10 EDT on the 2nd
+        note(6, "2024-06-03T16:00:00+00:00"),                    # Day without readings: skipped
+    ])
+
+    updated = backfill_weather.backfill_weather(notes, archive.url, str(tmp_path))
+
+    assert updated == 4
+    assert sorted(archive.requests) == ["2024-06-01", "2024-06-02", EMPTY_DAY]
+
+    # Only id/created_at/weather are read, and only id + missing weather written back
+    assert all(cols == ["id", "created_at"] + backfill_weather.WEATHER_FIELDS for cols in notes.selected)
+    assert {r['id'] for r in notes.rpc_rows} == {1, 2, 3, 5}
+    assert set(next(r for r in notes.rpc_rows if r['id'] == 3)) == {"id", "wind_speed", "wind_gust", "wind_direction"}
+
+    rows = notes.rows
+    assert (rows[1]['temperature'], rows[1]['wind_speed'], rows[1]['wind_gust'], rows[1]['wind_direction']) == (10, 10, 15, "SSE")
+    assert rows[2]['temperature'] == 11
+    assert (rows[3]['temperature'], rows[3]['wind_speed']) == (99, 20)
+    assert rows[4]['temperature'] == 70
+    assert rows[5]['temperature'] == 0
+    assert rows[6]['temperature'] is None
+    assert rows[1]['notes'] == "note 1"
+
+    # Days with readings are cached; the empty day is asked for again next time
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["2024-06-01.json", "2024-06-02.json"]
+
+
+def test_backfill_reuses_cached_days(archive, tmp_path):
+    backfill_weather.backfill_weather(FakeNotes([note(1, "2024-06-01T14:20:00+00:00")]), archive.url, str(tmp_path))
+    assert archive.requests == ["2024-06-01"]
+
+    notes = FakeNotes([note(2, "2024-06-01T20:05:00+00:00")])    # 16:05 EDT, same day
+    assert backfill_weather.backfill_weather(notes, archive.url, str(tmp_path)) == 1
+    assert archive.requests == ["2024-06-01"]
+    assert notes.rows[2]['temperature'] == 16
+
+
+def test_dry_run_writes_nothing(archive, tmp_path):
+    notes = FakeNotes([note(1, "2024-06-01T14:20:00+00:00")])
+    assert backfill_weather.backfill_weather(notes, archive.url, str(tmp_path), dry_run=True) == 1
+    assert notes.rpc_rows == []
+    assert notes.rows[1]['temperature'] is None
+
+
+def test_backfill_note_weather_rpc_fills_only_nulls(db):
+    """The write-back function itself: NULL weather only, and no rollup churn."""
+    with db.cursor() as cur:
+        cur.execute("""
+            INSERT INTO practice_notes (hole_number, layout, disc_used, strokes, notes, temperature, wind_direction)
+            VALUES (1, 'Shorts (Round 1)', 'Zone', 3, 'a', NULL, NULL),
+                   (2, 'Shorts (Round 1)', 'Zone', 4, 'b', 88, NULL),
+                   (3, 'Shorts (Round 1)', 'Zone', 2, 'c', 70, 'N')
+        """)
+        cur.execute("UPDATE practice_notes SET wind_speed = 5, wind_gust = 8 WHERE id = 3")
+        cur.execute("SELECT updated_at FROM practice_stats")
+        stats_before = cur.fetchall()
+
+        rows = [{"id": i, "temperature": 60, "wind_speed": 10, "wind_gust": 15, "wind_direction": "SW"} for i in (1, 2, 3)]
+        cur.execute("SELECT backfill_note_weather(%s::jsonb)", (json.dumps(rows),))
+        assert cur.fetchone()[0] == 2
+
+        cur.execute("SELECT id, temperature, wind_speed, wind_direction, notes FROM practice_notes ORDER BY id")
+        assert cur.fetchall() == [(1, 60, 10, "SW", "a"), (2, 88, 10, "SW", "b"), (3, 70, 5, "N", "c")]
+
+        # Weather-only updates skip the practice_stats trigger work
+        cur.execute("SELECT updated_at FROM practice_stats")
+        assert cur.fetchall() == stats_before
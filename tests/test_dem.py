@@ -0,0 +1,101 @@
+import json
+import math
+
+import numpy as np
+import pytest
+
+import process_geometry
+from dem import DemTile
+
+# scripts/dem.py on a synthetic 3x4 tile (.npy + sidecar), and the USGS fallback
+# process_geometry uses for points the tile can't answer.
+
+WEST, NORTH, PIXEL = -77.55, 38.26, 0.001
+NODATA = -9999.0
+
+
+@pytest.fixture
+def tile_path(tmp_path):
+    grid = np.array([
+        [100.0, 120.0, 102.0, 103.0],
+        [110.0, 111.0, 112.0, 113.0],
+        [NODATA, 121.0, 122.0, 123.0],
+    ])
+    path = tmp_path / "tile.npy"
+    np.save(path, grid)
+    (tmp_path / "tile.json").write_text(json.dumps(
+        {"west": WEST, "north": NORTH, "pixel_width": PIXEL, "pixel_height": PIXEL, "nodata": NODATA}))
+    return str(path)
+
+
+def point(row, col):
+    """(lat, lon) at fractional pixel-centre coordinates."""
+    return NORTH - (row + 0.5) * PIXEL, WEST + (col + 0.5) * PIXEL
+
+
+def sample(tile, *points):
+    return tile.sample([p[0] for p in points], [p[1] for p in points])
+
+
+def test_loads_npy_with_sidecar(tile_path):
+    tile = DemTile.load(tile_path)
+    assert tile.grid.shape == (3, 4)
+    assert (tile.west, tile.north, tile.nodata) == (WEST, NORTH, NODATA)
+    assert sample(tile, point(1, 2))[0] == pytest.approx(112.0)    # Pixel centre: the cell itself
+
+
+def test_bilinear_between_pixel_centres(tile_path):
+    tile = DemTile.load(tile_path)
+    # Row 0.5, column 1.25: 120*.75*.5 + 102*.25*.5 + 111*.75*.5 + 112*.25*.5
+    assert sample(tile, point(0.5, 1.25))[0] == pytest.approx(113.375)
+
+
+def test_nodata_and_out_of_bounds_are_nan(tile_path):
+    tile = DemTile.load(tile_path)
+    values = sample(tile,
+                    point(1.5, 0.5),     # Touches the nodata cell
+                    point(1.5, 1.5),     # Next door, clear of it
+                    point(-1, 1),        # North of the tile
+                    point(1, 4.2))       # East of the last pixel centre
+    assert math.isnan(values[0])
+    assert values[1] == pytest.approx((111 + 112 + 121 + 122) / 4)
+    assert math.isnan(values[2]) and math.isnan(values[3])
+
+
+class FakeGeometry:
+    """hole_geometry behind the one write process_batch makes."""
+
+    def __init__(self):
+        self.upserted = []
+
+    def table(self, name):
+        assert name == "hole_geometry"
+        return self
+
+    def upsert(self, payloads):
+        self.upserted.extend(payloads)
+        return self
+
+    def execute(self):
+        pass
+
+
+def test_points_off_the_tile_fall_back_to_usgs(tile_path, tmp_path, monkeypatch):
+    tee, basket = point(0, 0), point(-3, 0)     # Basket is off the tile
+    looked_up = []
+
+    def usgs(lat, lon):
+        looked_up.append((lat, lon))
+        return 95.0
+
+    monkeypatch.setattr(process_geometry, "get_elevation", usgs)
+    row = {"id": "h1", "hole_number": 1, "layout": "Shorts (Round 1)", "geometry_version": 2,
+           "tee_lat": tee[0], "tee_lon": tee[1], "basket_lat": basket[0], "basket_lon": basket[1]}
+    db = FakeGeometry()
+
+    process_geometry.process_batch(db, [row], cache_path=str(tmp_path / "cache.json"),
+                                   elevation_source="dem", dem_path=tile_path)
+
+    assert looked_up == [basket]
+    assert db.upserted[0]['elevation_change_feet'] == pytest.approx(95.0 - 100.0)
+    assert db.upserted[0]['processed_version'] == 2
@@ -0,0 +1,25 @@
+import pytest
+
+import geodesy
+
+# The vectorized Vincenty kernel against geopy's Karney geodesic (same check as
+# `python scripts/geodesy.py`).
+
+pytest.importorskip("geopy")
+
+MAX_DISTANCE_ERROR_MM = 1.0
+MAX_BEARING_ERROR_DEG = 1e-6
+
+
+@pytest.mark.parametrize("long_range_share", [0.0, 1.0], ids=["course-scale", "long-range"])
+def test_kernel_matches_geopy(long_range_share):
+    dist_err, bearing_err = geodesy.validate_against_geopy(500, long_range_share=long_range_share)
+    assert dist_err < MAX_DISTANCE_ERROR_MM
+    assert bearing_err < MAX_BEARING_ERROR_DEG
+
+
+def test_kernel_matches_geopy_away_from_the_course():
+    # Southern hemisphere, across the antimeridian
+    dist_err, bearing_err = geodesy.validate_against_geopy(200, seed=1, center=(-16.5, 179.98))
+    assert dist_err < MAX_DISTANCE_ERROR_MM
+    assert bearing_err < MAX_BEARING_ERROR_DEG
@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from note_queue import NoteQueue
+
+
+class FakeClient:
+    """Records upserted batches; rounds in `missing_rounds` fail like the round_id FK would."""
+
+    def __init__(self, missing_rounds=(), gate=None):
+        self.batches = []
+        self.missing_rounds = set(missing_rounds)
+        self.gate = gate            # (started, release) events to hold a batch in flight
+
+    def table(self, name):
+        assert name == "practice_notes"
+        return self
+
+    def upsert(self, rows, on_conflict=None, ignore_duplicates=False):
+        assert on_conflict == "client_id" and ignore_duplicates
+        self.rows = rows
+        return self
+
+    def execute(self):
+        if self.gate:
+            started, release = self.gate
+            started.set()
+            assert release.wait(5)
+        rounds = {row['round_id'] for row in self.rows}
+        assert len(rounds) == 1, "batches never mix rounds"
+        if rounds & self.missing_rounds:
+            raise RuntimeError('violates foreign key constraint "practice_notes_round_id_fkey"')
+        self.batches.append(self.rows)
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    def make(client):
+        queue = NoteQueue(str(tmp_path / "queue.sqlite3"), lambda token: client)
+        queue.register_session("u1", "token")
+        return queue
+    return make
+
+
+def status(queue):
+    return dict(queue._conn_query("SELECT round_id, group_concat(status) FROM note_queue GROUP BY round_id"))
+
+
+def test_deleted_round_only_holds_back_its_own_notes(make_queue):
+    client = FakeClient(missing_rounds={"gone"})
+    queue = make_queue(client)
+    for round_id in ("gone", "live", "gone", "live"):
+        queue.enqueue({"round_id": round_id, "hole_number": 1}, "u1")
+
+    assert queue.flush_once() == 2
+    assert status(queue) == {"gone": "pending,pending", "live": "flushed,flushed"}
+    assert queue.counts("u1") == {"pending": 2, "flushed": 2, "failing": 2}
+
+
+def test_discard_round_waits_for_an_in_flight_batch(make_queue):
+    started, release = threading.Event(), threading.Event()
+    client = FakeClient(gate=(started, release))
+    queue = make_queue(client)
+    queue.enqueue({"round_id": "r1", "hole_number": 1}, "u1")
+
+    flusher = threading.Thread(target=queue.flush_once)
+    flusher.start()
+    assert started.wait(5)
+
+    # The claimed note is still shown as pending and can't be deleted mid-upload
+    assert len(queue.pending_notes("u1")) == 1
+    queue.enqueue({"round_id": "r1", "hole_number": 2}, "u1")
+    discarded = []
+    discarder = threading.Thread(target=lambda: discarded.append(queue.discard_round("r1")))
+    discarder.start()
+    time.sleep(0.2)
+    assert discarder.is_alive(), "discard_round returned while its round was uploading"
+
+    release.set()
+    flusher.join(5)
+    discarder.join(5)
+    assert discarded == [1]                      # the note queued after the claim
+    assert status(queue) == {"r1": "flushed"}    # landed before the caller's server-side delete
+
+
+def test_unexpected_error_returns_claimed_notes(make_queue, tmp_path):
+    queue = NoteQueue(str(tmp_path / "other.sqlite3"), lambda token: 1 / 0)
+    queue.register_session("u1", "token")
+    queue.enqueue({"round_id": "r1", "hole_number": 1}, "u1")
+
+    with pytest.raises(ZeroDivisionError):
+        queue.flush_once()
+    assert status(queue) == {"r1": "pending"}
+    assert queue.discard_round("r1", timeout=0.1) == 1
@@ -0,0 +1,47 @@
+# practice_stats.sql: the rollup against the statement triggers on a real practice_notes table.
+
+USER_A = "00000000-0000-0000-0000-00000000000a"
+USER_B = "00000000-0000-0000-0000-00000000000b"
+LAYOUT = "Shorts (Round 1)"
+
+
+def stats(cur):
+    cur.execute("""
+        SELECT hole_number, disc_used, user_id::text, entries, stroke_total
+        FROM practice_stats ORDER BY hole_number, disc_used NULLS FIRST, user_id""")
+    return cur.fetchall()
+
+
+def add_notes(cur, *notes):
+    cur.executemany("""
+        INSERT INTO practice_notes (layout, hole_number, disc_used, user_id, strokes)
+        VALUES (%s, %s, %s, %s, %s)""", [(LAYOUT, *note) for note in notes])
+
+
+def test_rollup_follows_inserts_updates_and_deletes(db):
+    with db.cursor() as cur:
+        add_notes(cur, (1, "Zone", USER_A, 3), (1, "Zone", USER_A, 2), (1, None, USER_A, 4),
+                  (1, "Zone", USER_B, 3), (2, "Zone", None, 5))
+        assert stats(cur) == [
+            (1, None, USER_A, 1, 4), (1, "Zone", USER_A, 2, 5), (1, "Zone", USER_B, 1, 3),
+            (2, "Zone", None, 1, 5),
+        ]
+
+        # Moving a note to another disc empties its old bucket (NULL disc included)
+        cur.execute("UPDATE practice_notes SET disc_used = 'Zone' WHERE disc_used IS NULL")
+        assert stats(cur) == [(1, "Zone", USER_A, 3, 9), (1, "Zone", USER_B, 1, 3), (2, "Zone", None, 1, 5)]
+
+        # Deleting the last note in a bucket (NULL user) drops it; other buckets stay
+        cur.execute("DELETE FROM practice_notes WHERE user_id IS NULL")
+        cur.execute("DELETE FROM practice_notes WHERE user_id = %s AND strokes = 3", (USER_A,))
+        assert stats(cur) == [(1, "Zone", USER_A, 2, 6), (1, "Zone", USER_B, 1, 3)]
+
+
+def test_cleanup_only_touches_keys_in_the_statement(db):
+    with db.cursor() as cur:
+        add_notes(cur, (1, "Zone", USER_A, 3), (2, "Zone", USER_B, 4))
+        # An empty bucket left by someone else's statement is not this delete's business
+        cur.execute("UPDATE practice_stats SET entries = 0 WHERE user_id = %s", (USER_B,))
+
+        cur.execute("DELETE FROM practice_notes WHERE user_id = %s", (USER_A,))
+        assert stats(cur) == [(2, "Zone", USER_B, 0, 4)]
@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+import process_geometry
+
+# The worker against a real hole_geometry table (--direct), with elevations served
+# from a pre-filled cache so nothing reaches USGS.
+
+LAYOUT = "Shorts (Round 1)"
+TEE_FEET = 100.0
+BASKET_FEET = 90.0
+
+
+def hole(number):
+    """Tee and basket ~300 ft apart, each hole shifted north a little."""
+    lat = 42.36 + number * 0.001
+    return (number, LAYOUT, lat, -71.05, lat + 0.0008, -71.05)
+
+
+@pytest.fixture
+def holes(db, tmp_path, monkeypatch):
+    """Insert `n` mapped holes and cache their elevations; returns the cache path."""
+    cache_path = tmp_path / "elevation.json"
+
+    def insert(n):
+        rows = [hole(i) for i in range(1, n + 1)]
+        with db.cursor() as cur:
+            cur.executemany("""
+                INSERT INTO hole_geometry (hole_number, layout, tee_lat, tee_lon, basket_lat, basket_lon)
+                VALUES (%s, %s, %s, %s, %s, %s)""", rows)
+        cache = {}
+        for _, _, tee_lat, tee_lon, basket_lat, basket_lon in rows:
+            cache[process_geometry.point_key(tee_lat, tee_lon)] = TEE_FEET
+            cache[process_geometry.point_key(basket_lat, basket_lon)] = BASKET_FEET
+        cache_path.write_text(json.dumps(cache))
+        return str(cache_path)
+
+    monkeypatch.setattr(process_geometry, "get_elevation", lambda lat, lon: None)
+    return insert
+
+
+def geometry(db):
+    with db.cursor() as cur:
+        cur.execute("""
+            SELECT hole_number, geometry_dirty, distance_feet IS NOT NULL, elevation_change_feet
+            FROM hole_geometry ORDER BY hole_number""")
+        return cur.fetchall()
+
+
+def count_fetches(monkeypatch, after_fetch=None):
+    """Wrap fetch_dirty; `after_fetch(rows)` runs between the fetch and the write-back."""
+    calls = []
+    fetch_dirty = process_geometry.fetch_dirty
+
+    def wrapped(db, limit, after_id=None):
+        rows = fetch_dirty(db, limit, after_id)
+        calls.append(len(rows))
+        if after_fetch and rows:
+            after_fetch(db, rows)
+        return rows
+
+    monkeypatch.setattr(process_geometry, "fetch_dirty", wrapped)
+    return calls
+
+
+def move_basket(db, hole_ids):
+    with db.cursor() as cur:
+        cur.execute("UPDATE hole_geometry SET basket_lat = basket_lat + 0.0001 WHERE id = ANY(%s::uuid[])",
+                    (list(hole_ids),))
+
+
+def test_drains_every_dirty_row_in_batches(db, holes, monkeypatch):
+    cache_path = holes(5)
+    calls = count_fetches(monkeypatch)
+
+    assert process_geometry.process_geometry(db, batch_size=2, cache_path=cache_path) == 5
+
+    assert calls == [2, 2, 1]
+    assert geometry(db) == [(n, False, True, BASKET_FEET - TEE_FEET) for n in range(1, 6)]
+    # Clean rows are left alone next time
+    assert process_geometry.process_geometry(db, batch_size=2, cache_path=cache_path) == 0
+
+
+def test_result_for_a_hole_moved_mid_batch_is_rejected(db, holes, monkeypatch):
+    cache_path = holes(3)
+    moved = []
+
+    def move_hole_1(db, rows):
+        if not moved:
+            moved.append(next(r['id'] for r in rows if r['hole_number'] == 1))
+            move_basket(db, moved)
+
+    count_fetches(monkeypatch, move_hole_1)
+    process_geometry.process_geometry(db, batch_size=10, cache_path=cache_path)
+
+    # Hole 1's result was computed from the old basket: dropped, still dirty
+    assert geometry(db) == [(1, True, False, None), (2, False, True, -10.0), (3, False, True, -10.0)]
+
+    # The next pass picks it up; its new basket has no elevation, so only the change is unknown
+    assert process_geometry.process_geometry(db, batch_size=10, cache_path=cache_path) == 1
+    assert geometry(db)[0] == (1, False, True, None)
+
+
+def test_pass_ends_when_no_write_back_sticks(db, holes, monkeypatch):
+    cache_path = holes(4)
+    calls = count_fetches(monkeypatch, lambda db, rows: move_basket(db, [r['id'] for r in rows]))
+
+    # Every result is rejected: each row is fetched once, then the pass stops
+    assert process_geometry.process_geometry(db, batch_size=2, cache_path=cache_path) == 4
+    assert calls == [2, 2, 0]
+    assert [row[1] for row in geometry(db)] == [True] * 4
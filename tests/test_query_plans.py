@@ -0,0 +1,34 @@
+import contextlib
+import io
+
+import pytest
+
+from check_query_plans import check_query_plans
+
+# scripts/check_query_plans.py as a test: an index regression on practice_notes /
+# rounds fails pytest. The seeded history is rolled back by the check itself.
+
+ROUNDS = 2000   # x 18 notes: enough for the planner to prefer every index
+
+
+def run_check(database_url):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return check_query_plans(database_url, n_rounds=ROUNDS)
+
+
+def test_app_queries_use_indexes(db, database_url):
+    assert run_check(database_url) == []
+
+
+def test_a_dropped_index_is_reported(db, database_url):
+    with db.cursor() as cur:
+        cur.execute("SELECT pg_get_indexdef('practice_notes_round_hole_idx'::regclass)")
+        definition = cur.fetchone()[0]
+        cur.execute("DROP INDEX practice_notes_round_hole_idx")
+    try:
+        failures = run_check(database_url)
+    finally:
+        with db.cursor() as cur:
+            cur.execute(definition)
+
+    assert ("export round notes", "force_custom_plan") in failures
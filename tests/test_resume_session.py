@@ -0,0 +1,50 @@
+import json
+
+# resume_session.sql: the startup round restore, called as the app calls it.
+
+USER_ID = "00000000-0000-0000-0000-00000000000a"
+
+
+def start_round(cur, age, hole_numbers=()):
+    cur.execute("""
+        INSERT INTO rounds (name, layout, user_id, created_at)
+        VALUES ('Practice', 'Shorts (Round 1)', %s, NOW() - %s::interval) RETURNING id""", (USER_ID, age))
+    round_id = cur.fetchone()[0]
+    for hole in hole_numbers:
+        cur.execute("""
+            INSERT INTO practice_notes (round_id, layout, hole_number, user_id, strokes)
+            VALUES (%s, 'Shorts (Round 1)', %s, %s, 3)""", (round_id, hole, USER_ID))
+    return round_id
+
+
+def resume(cur, round_cookie=None):
+    cur.execute("SELECT resume_session(%s, %s)", (USER_ID, round_cookie))
+    result = cur.fetchone()[0]
+    return result if isinstance(result, dict) else json.loads(result)
+
+
+def test_recent_round_resumes_at_the_next_hole(db):
+    with db.cursor() as cur:
+        round_id = start_round(cur, "1 hour", hole_numbers=(1, 2, 5))
+        result = resume(cur)
+
+    assert result['round']['id'] == str(round_id)
+    assert (result['source'], result['resumable'], result['next_hole']) == ("recent", True, 6)
+
+
+def test_old_round_is_neither_resumed_nor_jumped_to(db):
+    with db.cursor() as cur:
+        start_round(cur, "4 days", hole_numbers=(1, 2, 5))
+        result = resume(cur)
+
+    assert result['source'] == "recent"
+    assert result['resumable'] is False
+    assert result['next_hole'] is None
+
+
+def test_stale_cookie_falls_back_to_the_latest_round(db):
+    with db.cursor() as cur:
+        start_round(cur, "30 minutes", hole_numbers=(18,))
+        result = resume(cur, "not-a-uuid")
+
+    assert (result['source'], result['cookie_found'], result['next_hole']) == ("recent", False, 18)
@@ -1,14 +1,23 @@
 import streamlit as st
-from supabase import create_client, Client, ClientOptions
+from supabase import Client
 from datetime import datetime
 import pandas as pd
 import time
-import requests
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import extra_streamlit_components as stx
 from dotenv import load_dotenv
 import pytz
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from streamlit_js_eval import get_geolocation
+from note_queue import NoteQueue, DEFAULT_QUEUE_PATH
+from supabase_pool import SupabasePool
+from instrumentation import InstrumentedClient, SessionCalls
+from analysis import summarize_hole_stats, rating_by_disc
+from bag import group_bag
+from weather import WeatherService, wind_table, plays_like
+from history_export import export_rounds_ndjson_gz, export_shots_parquet, preview_text
 
 load_dotenv()
 
@@ -49,6 +58,27 @@ footer {visibility: hidden;}
 # Timezone
 LOCAL_TZ = pytz.timezone('America/New_York')
 
+# --- SUPABASE CONNECTION POOL ---
+TOKEN_REFRESH_MARGIN = 60  # Seconds before expiry at which the access token is refreshed
+
+@st.cache_resource
+def get_supabase_pool(url, key):
+    """One keep-alive connection pool per process, shared by every session (see supabase_pool.py)."""
+    return SupabasePool(url, key)
+
+def user_client():
+    """Per-user client over the shared pool; the anon key until someone logs in. Every call is recorded in call_log."""
+    session = st.session_state.get("supabase_session")
+    return InstrumentedClient(pool.client(session.access_token if session else None), call_log)
+
+# --- SUPABASE CALL INSTRUMENTATION ---
+# Table/RPC/auth calls are timed per rerun and totalled per session (see instrumentation.py).
+# Shown in the sidebar debug panel with ?debug=1 or MKS_DEBUG=1; MKS_CALL_LOG=<path> also writes JSONL.
+DEBUG_PANEL = os.environ.get("MKS_DEBUG") == "1" or st.query_params.get("debug") == "1"
+if 'supabase_calls' not in st.session_state:
+    st.session_state.supabase_calls = SessionCalls()
+call_log = st.session_state.supabase_calls.new_rerun()
+
 # --- CONNECT TO SUPABASE ---
 try:
     # 1. Try local environment variables first
@@ -65,18 +95,22 @@ try:
     if not SUPABASE_URL or not SUPABASE_KEY:
         raise ValueError("Supabase credentials not found.")
 
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-    
-    # Restore session if it exists
+    pool = get_supabase_pool(SUPABASE_URL, SUPABASE_KEY)
+
+    # Restore session if it exists, refreshing the access token shortly before it expires
     if "supabase_session" in st.session_state:
-        try:
-            supabase.auth.set_session(
-                st.session_state.supabase_session.access_token, 
-                st.session_state.supabase_session.refresh_token
-            )
-        except Exception as e:
-            # Session might be expired
-            del st.session_state.supabase_session
+        session = st.session_state.supabase_session
+        if session.expires_at and session.expires_at - time.time() < TOKEN_REFRESH_MARGIN:
+            try:
+                with call_log.timing("auth", "refresh_session"):
+                    st.session_state.supabase_session = pool.auth().refresh_session(session.refresh_token).session
+            except Exception as e:
+                # Session might be expired
+                del st.session_state.supabase_session
+                st.session_state.logged_in = False
+
+    # No new connections or handshakes: just this user's auth header over the shared pool
+    supabase = user_client()
             
     OFFLINE_MODE = False
 except Exception as e:
@@ -111,96 +145,20 @@ if not st.session_state.logged_in:
     if auth_token:
         try:
              # Refresh Session
-             res = supabase.auth.refresh_session(auth_token)
+             with call_log.timing("auth", "refresh_session", "cookie"):
+                 res = pool.auth().refresh_session(auth_token)
              if res.user:
                  st.session_state.logged_in = True
                  st.session_state.supabase_session = res.session
+                 supabase = user_client()
                  st.success("Session Restored from Cookie! 🍪")
         except Exception as e:
             # Token invalid
             # cookie_manager.delete('mks_refresh_token') # Optional cleanup
             pass
 
-# 2. Round Restoration
-if not st.session_state.current_round:
-    round_cookie = cookie_manager.get('mks_round_id')
-    if round_cookie:
-        # Fetch round details
-        try:
-             # Need to ensure supabase is ready (it is, unless offline)
-             if not OFFLINE_MODE:
-                 res = supabase.table("rounds").select("*").eq("id", round_cookie).execute()
-                 if res.data:
-                     st.session_state.current_round = res.data[0]
-                     # Ensure we have selected_discs in session_state format
-                     if 'selected_discs' not in st.session_state.current_round:
-                          st.session_state.current_round['selected_discs'] = []
-                 else:
-                     # Round not found (maybe deleted?), clear cookie
-                     cookie_manager.delete('mks_round_id')
-        except: pass
-
-# 3. Smart Resume: Check for active rounds in the last 3 hours if none loaded
-if not st.session_state.current_round and st.session_state.logged_in and not OFFLINE_MODE:
-    try:
-        # Calculate time threshold (3 hours ago)
-        # created_at is likely UTC ISO string in Supabase
-        # We'll just fetch the most recent round and check its time in python to be safe with formats
-        
-        my_id = st.session_state.supabase_session.user.id
-        
-        # Fetch last round for this user
-        res = supabase.table("rounds").select("*").eq("user_id", my_id).order("created_at", desc=True).limit(1).execute()
-        
-        if res.data:
-            last_round = res.data[0]
-            created_at_str = last_round['created_at']
-            # Parse ISO
-            created_dt = datetime.fromisoformat(created_at_str.replace('Z', '+00:00'))
-            
-            # Current UTC
-            now_utc = datetime.now(pytz.utc)
-            
-            # Diff
-            diff = now_utc - created_dt
-            
-            if diff.total_seconds() < (3 * 3600): # 3 hours
-                # Check if round is ended (ended_at is NOT None)
-                if not last_round.get('ended_at'):
-                    st.session_state.current_round = last_round
-                    st.toast(f"Resumed Active Round: {last_round['name']}", icon="🔄")
-                    
-                    # Update Cookie
-                    cookie_manager.set('mks_round_id', last_round['id'], expires_at=datetime.now(LOCAL_TZ) + pd.Timedelta(days=1))
-                    
-                    # --- AUTO-JUMP TO NEXT HOLE ---
-                # Check practice notes for max hole number
-                try:
-                    notes_res = supabase.table("practice_notes")\
-                        .select("hole_number")\
-                        .eq("round_id", last_round['id'])\
-                        .order("hole_number", desc=True)\
-                        .limit(1)\
-                        .execute()
-                    
-                    if notes_res.data:
-                        last_hole = notes_res.data[0]['hole_number']
-                        next_hole = min(last_hole + 1, 18)
-                        
-                        # Set session state and cookie for hole
-                        if 'hole_input' not in st.session_state or st.session_state.hole_input == 1:
-                             st.session_state.hole_input = next_hole
-                             cookie_manager.set('mks_hole_num', next_hole)
-                             
-                except Exception as e:
-                    pass # Fail silently on hole jump
-                    
-    except Exception as e:
-        # st.error(f"Resume check failed: {e}") # Debug only
-        pass
-
-
-
+# Round restoration (mks_round_id cookie / Smart Resume) is one resume_session RPC, run with
+# the other startup fetches once the user is known to be logged in (see PARALLEL STARTUP FETCHES).
 
 # --- CONNECT TO SUPABASE ---
 # --- CONNECT TO SUPABASE ---
@@ -220,7 +178,8 @@ def login():
                 st.error("Cannot log in: Supabase secrets are missing.")
             else:
                 try:
-                    response = supabase.auth.sign_in_with_password({"email": email, "password": password})
+                    with call_log.timing("auth", "sign_in_with_password"):
+                        response = pool.auth().sign_in_with_password({"email": email, "password": password})
                     if response.user:
                         st.session_state.logged_in = True
                         st.session_state.supabase_session = response.session
@@ -239,7 +198,9 @@ def login():
 
 def logout():
     try:
-        supabase.auth.sign_out()
+        # Revoke the refresh token server-side
+        with call_log.timing("auth", "sign_out"):
+            pool.auth().admin.sign_out(st.session_state.supabase_session.access_token)
     except:
         pass
     
@@ -253,46 +214,334 @@ def logout():
     st.session_state.logged_in = False
     st.rerun()
 
-# @st.cache_data(ttl=3600) <- CAUSING ISSUES WITH AUTH STATE
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_bag(user_id):
+    """Fetch all discs from Supabase, cached per user.
+
+    user_id is only the cache key: the query runs with the caller's session.
+    An empty result usually means the token expired (RLS hides every row),
+    so it raises instead of caching an empty bag for the next hour.
+    """
+    response = supabase.table("discs").select("*").order("name").execute()
+    if not response.data:
+        raise LookupError("No discs returned (session may have expired).")
+    return response.data
+
 def get_bag():
-    """Fetch all discs from Supabase."""
+    """Return the disc inventory from the shared per-user cache (no session copy, so a refresh reaches every session)."""
     if OFFLINE_MODE:
         return []
     try:
-        response = supabase.table("discs").select("*").order("name").execute()
-        return response.data if response.data else []
+        user_id = st.session_state.supabase_session.user.id
+        return fetch_bag(user_id)
+    except LookupError:
+        return []
     except Exception as e:
         st.error(f"Error fetching discs: {e}")
         return []
 
+def invalidate_bag():
+    """Drop the shared bag cache after the discs table is edited; every session refetches on its next run."""
+    fetch_bag.clear()
+
+# --- COURSE DATA CACHE ---
+# course_metadata + mindset_axioms + hole_geometry are static and identical for every user (RLS read is `true`),
+# so one index is shared across all sessions and only reloaded when course_version changes.
+COURSE_COLUMNS = "hole_number, layout, protocol_notes, par, suggested_disc, Attack_Hole, shot_shape, execution_notes, mindset_axioms(short_name, title, corollary)"
+GEOMETRY_COLUMNS = "hole_number, layout, distance_feet, elevation_change_feet, bearing_deg"
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_course_version():
+    """Cheap probe of the course_version marker (see course_version.sql)."""
+    try:
+        res = supabase.table("course_version").select("version").eq("id", 1).execute()
+        return res.data[0]['version'] if res.data else 0
+    except Exception:
+        # Marker table not installed: cache until the process restarts
+        return 0
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def load_course_index(version):
+    """Load all holes for both layouts into a dict keyed by (layout, hole_number)."""
+    res = supabase.table("course_metadata").select(COURSE_COLUMNS).execute()
+    if not res.data:
+        # Raising keeps an empty result (e.g. auth not restored yet) out of the shared cache
+        raise LookupError("course_metadata returned no rows")
+
+    holes = {}
+    attack_counts = {}
+    for row in res.data:
+        # Flattening logic: handles cases where axiom comes back as a single-item list
+        axiom_raw = row.get('mindset_axioms')
+        row['mindset_axioms'] = axiom_raw[0] if isinstance(axiom_raw, list) and len(axiom_raw) > 0 else axiom_raw
+        holes[(row['layout'], row['hole_number'])] = row
+
+        attack_counts.setdefault(row['layout'], 0)
+        if row.get('Attack_Hole') == "Yes":
+            attack_counts[row['layout']] += 1
+
+    # Logic: Target = -1 * floor(Attack Holes / 2)
+    targets = {}
+    for course_layout, count in attack_counts.items():
+        target_strokes = int(count // 2)
+        targets[course_layout] = f"-{target_strokes}" if target_strokes > 0 else "EVEN PAR"
+
+    # Processed geometry, with the 16-direction wind lookup precomputed per hole
+    geometry = {}
+    try:
+        geo_res = supabase.table("hole_geometry").select(GEOMETRY_COLUMNS).not_.is_("bearing_deg", "null").execute()
+        for row in geo_res.data or []:
+            row['wind_table'] = wind_table(row['bearing_deg'])
+            geometry[(row['layout'], row['hole_number'])] = row
+    except Exception:
+        # bearing_deg not migrated yet (add_wind_components.sql): no wind HUD
+        pass
+
+    return {"version": version, "holes": holes, "targets": targets, "geometry": geometry}
+
+def get_course_index():
+    """Return the shared course index, or None when offline."""
+    if OFFLINE_MODE:
+        return None
+    return load_course_index(get_course_version())
+
+# --- NOTE QUEUE ---
+@st.cache_resource
+def get_note_queue():
+    """Process-wide local journal for practice_notes, flushed in the background."""
+    # Token is used as-is: the flusher must never rotate the user's refresh token
+    queue = NoteQueue(DEFAULT_QUEUE_PATH, pool.client)
+    queue.start()
+    return queue
+
 # --- WEATHER FUNCTIONS ---
-def get_wind_direction(degrees):
-    directions = ["N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE", "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"]
-    index = round(degrees / (360. / len(directions))) % len(directions)
-    return directions[index]
+@st.cache_resource
+def get_weather_service():
+    """Process-wide weather snapshot, refreshed in the background (see weather.py)."""
+    service = WeatherService()
+    service.start()
+    return service
 
-@st.cache_data(ttl=600)
 def get_loriella_weather():
-    URL = "https://api.open-meteo.com/v1/forecast?latitude=38.2544&longitude=-77.5443&current=temperature_2m,apparent_temperature,wind_speed_10m,wind_direction_10m,wind_gusts_10m&temperature_unit=fahrenheit&wind_speed_unit=mph&precipitation_unit=inch"
-    try:
-        response = requests.get(URL)
-        data = response.json()
-        current = data['current']
-        return {
-            "temp": round(current['temperature_2m']),
-            "feels_like": round(current['apparent_temperature']),
-            "wind_speed": round(current['wind_speed_10m']),
-            "wind_gust": round(current['wind_gusts_10m']),
-            "wind_dir": get_wind_direction(current['wind_direction_10m'])
-        }
-    except Exception as e:
+    """Latest snapshot (with age_seconds) or None. Only a cold start waits, and at most 2s."""
+    return get_weather_service().get(wait=2)
+
+def hole_wind(hole_geo, weather):
+    """(headwind, crosswind) in mph for this hole from the cached lookup table, or None."""
+    if not hole_geo or not weather:
+        return None
+    unit = hole_geo['wind_table'].get(weather['wind_dir'])
+    if unit is None:
         return None
+    return unit[0] * weather['wind_speed'], unit[1] * weather['wind_speed']
+
+# --- ROUND RESTORATION ---
+def fetch_resume_session(user_id, round_cookie):
+    """Cookie round / Smart Resume / next hole in one round trip (see resume_session.sql)."""
+    res = supabase.rpc("resume_session", {"p_user_id": user_id, "p_round_id": round_cookie}).execute()
+    return res.data
+
+# --- HOLE BUNDLE ---
+def fetch_hole_bundle(layout, hole_number, round_id):
+    """Protocol, last note, geometry and this round's notes for one hole in one request (see hole_bundle.sql)."""
+    res = supabase.rpc("hole_bundle", {"p_layout": layout, "p_hole_number": hole_number, "p_round_id": round_id}).execute()
+    return res.data
+
+# --- HOLE BUNDLE CACHE ---
+# Per-session bundles keyed by (layout, hole_number, round_id). After a hole renders, a
+# background thread warms hole+1/hole-1 and then the rest of the layout, so Prev/Next and
+# Save & Next render from memory. Notes still in the local queue are overlaid at read
+# time; an entry is refetched once a note that was pending when it was fetched uploads.
+BUNDLE_TTL = 600             # Seconds; also picks up notes logged from other devices
+PREFETCH_IDLE_DELAY = 1.0    # Pause before warming the rest of the layout
+
+def load_bundle_entry(layout, hole_number, round_id, user_id):
+    """Fetch a bundle plus the queued note ids it can't contain yet. No st calls (runs off-thread)."""
+    pending = note_queue.pending_notes(user_id) if note_queue else []
+    # Read the queue first: a note uploaded mid-fetch then still counts as pending and forces a refetch later
+    pending_ids = frozenset(n['client_id'] for n in pending if n.get('layout') == layout and n.get('hole_number') == hole_number)
+    return {
+        "bundle": fetch_hole_bundle(layout, hole_number, round_id),
+        "pending": pending_ids,
+        "fetched_at": time.time()
+    }
+
+def merge_pending(bundle, pending, layout, hole_number, round_id):
+    """Overlay queued (not yet uploaded) notes for this hole onto a bundle."""
+    notes = [n for n in pending if n.get('layout') == layout and n.get('hole_number') == hole_number]
+    if not notes:
+        return bundle
+    bundle = dict(bundle or {})
+    uploaded = {n.get('client_id') for n in bundle.get('round_notes') or []}
+    if round_id:
+        bundle['round_notes'] = list(bundle.get('round_notes') or []) + \
+            [n for n in notes if n.get('round_id') == round_id and n['client_id'] not in uploaded]
+    # Queued notes were saved in this session, so the newest one is the last practice result
+    bundle['last_note'] = notes[-1]
+    return bundle
+
+def bundle_cache():
+    if "hole_bundles" not in st.session_state:
+        st.session_state.hole_bundles = {}
+        st.session_state.hole_bundle_lock = threading.Lock()
+    return st.session_state.hole_bundles, st.session_state.hole_bundle_lock
+
+def get_hole_bundle(layout, hole_number, round_id, user_id):
+    """Bundle for one hole from the session cache (fetched on a miss), with queued notes merged in."""
+    cache, lock = bundle_cache()
+    pending = note_queue.pending_notes(user_id) if note_queue else []
+    pending_now = {n['client_id'] for n in pending}
+
+    key = (layout, hole_number, round_id)
+    entry = cache.get(key)
+    if entry is None or not entry['pending'] <= pending_now or time.time() - entry['fetched_at'] > BUNDLE_TTL:
+        entry = load_bundle_entry(layout, hole_number, round_id, user_id)
+        with lock:
+            cache[key] = entry
+    return merge_pending(entry['bundle'], pending, layout, hole_number, round_id)
+
+def stop_prefetch():
+    stop = st.session_state.get("prefetch_stop")
+    if stop:
+        stop.set()
+
+def invalidate_hole_bundles(layout=None, hole_number=None):
+    """Drop cached bundles (one hole, one layout, or everything) and cancel the running prefetch."""
+    cache, lock = bundle_cache()
+    with lock:
+        stop_prefetch()
+        for key in list(cache):
+            if (layout is None or key[0] == layout) and (hole_number is None or key[1] == hole_number):
+                del cache[key]
+
+def prefetch_hole_bundles(layout, hole_number, round_id, user_id):
+    """Warm the session cache from a background thread: neighbours first, then the rest of the layout."""
+    cache, lock = bundle_cache()
+    stop_prefetch()
+    stop = threading.Event()
+    st.session_state.prefetch_stop = stop
+
+    order = [hole_number + 1, hole_number - 1]
+    for offset in range(2, 18):
+        order += [hole_number + offset, hole_number - offset]
+    order = [h for h in order if 1 <= h <= 18]
+
+    def run():
+        for i, h in enumerate(order):
+            if i == 2:
+                stop.wait(PREFETCH_IDLE_DELAY)
+            if stop.is_set():
+                return
+            key = (layout, h, round_id)
+            entry = cache.get(key)
+            if entry and time.time() - entry['fetched_at'] <= BUNDLE_TTL:
+                continue
+            try:
+                entry = load_bundle_entry(layout, h, round_id, user_id)
+            except Exception:
+                return # Offline / expired token: holes load on demand instead
+            with lock:
+                if stop.is_set():
+                    return
+                cache[key] = entry
+
+    threading.Thread(target=run, name="mks-prefetch", daemon=True).start()
+
+# --- PARALLEL STARTUP FETCHES ---
+def run_concurrently(tasks):
+    """Run independent fetches on a thread pool and wait for all of them.
+
+    `tasks` maps a name to a zero-argument callable; returns {name: (value, error)}.
+    Workers carry this script run's context so st.cache_* and session_state work,
+    but they must not render anything (or touch the cookie manager).
+    """
+    if not tasks:
+        return {}
+    ctx = get_script_run_ctx()
+
+    def run(fn):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        try:
+            return fn(), None
+        except Exception as e:
+            return None, e
+
+    with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="mks-startup") as pool:
+        futures = {name: pool.submit(run, fn) for name, fn in tasks.items()}
+        return {name: future.result() for name, future in futures.items()}
 
 # --- AUTH GATEKEEPER ---
 if not st.session_state.logged_in:
     login()
     st.stop()
 
+# Hand the current token to the flusher so this user's queued notes can upload
+note_queue = None
+if not OFFLINE_MODE:
+    note_queue = get_note_queue()
+    note_queue.register_session(
+        st.session_state.supabase_session.user.id,
+        st.session_state.supabase_session.access_token
+    )
+
+# Everything below needs the restored auth session but not each other: round restore
+# (one RPC), weather, bag and course index go out together and are joined here, before anything
+# renders, so a cold load waits for the slowest request instead of the sum.
+user_id = st.session_state.supabase_session.user.id
+round_cookie = None
+startup_tasks = {"weather": get_loriella_weather}
+if not OFFLINE_MODE:
+    startup_tasks["course_index"] = get_course_index
+    # Warms fetch_bag's cache (a hit after the first run); get_bag() reads it when rendering
+    startup_tasks["bag"] = lambda: fetch_bag(user_id)
+    if not st.session_state.current_round:
+        round_cookie = cookie_manager.get('mks_round_id')
+        startup_tasks["resume"] = lambda: fetch_resume_session(user_id, round_cookie)
+
+startup = run_concurrently(startup_tasks)
+# Bag: failures fall through to get_bag(), which retries and reports
+
+# --- RESTORE ROUND ---
+resume, resume_error = startup.get("resume", (None, None))
+if resume and not st.session_state.current_round:
+    restored_round = resume.get('round')
+
+    # 1. Round Restoration (cookie)
+    if resume['source'] == 'cookie':
+        st.session_state.current_round = restored_round
+        # Ensure we have selected_discs in session_state format
+        if not st.session_state.current_round.get('selected_discs'):
+            st.session_state.current_round['selected_discs'] = []
+    else:
+        if round_cookie and not resume['cookie_found']:
+            # Round not found (maybe deleted?), clear cookie
+            cookie_manager.delete('mks_round_id')
+
+        # 2. Smart Resume: latest round started in the last 3 hours
+        recent = False
+        if restored_round:
+            # created_at is an ISO string from the RPC; compare in python to be safe with formats
+            created_dt = datetime.fromisoformat(restored_round['created_at'].replace('Z', '+00:00'))
+            recent = (datetime.now(pytz.utc) - created_dt).total_seconds() < (3 * 3600) # 3 hours
+
+        if recent:
+            # Not ended (resumable is the same 3-hour window plus ended_at IS NULL)
+            if resume['resumable']:
+                st.session_state.current_round = restored_round
+                st.toast(f"Resumed Active Round: {restored_round['name']}", icon="🔄")
+
+                # Update Cookie
+                # Own component keys: this run may set both the round and hole cookies
+                cookie_manager.set('mks_round_id', restored_round['id'], key="resume_round_cookie", expires_at=datetime.now(LOCAL_TZ) + pd.Timedelta(days=1))
+
+            # --- AUTO-JUMP TO NEXT HOLE ---
+            next_hole = resume.get('next_hole')
+            if next_hole:
+                # Set session state and cookie for hole
+                if 'hole_input' not in st.session_state or st.session_state.hole_input == 1:
+                    st.session_state.hole_input = next_hole
+                    cookie_manager.set('mks_hole_num', next_hole, key="resume_hole_cookie")
+
 # --- SIDEBAR & GLOBAL SETTINGS ---
 with st.sidebar:
     st.title("🥏 MKS Control (v2.0)")
@@ -305,13 +554,29 @@ with st.sidebar:
     mapper_mode = st.toggle("🗺️ Mapper Mode", help="Enable GPS data collection for Teepads and Baskets.")
     
     st.header("📍 Loriella Park Conditions")
-    weather = get_loriella_weather()
+    weather = startup["weather"][0]
     if weather:
         c1, c2 = st.columns(2)
         with c1:
             st.metric("Temp", f"{weather['temp']}°F", f"{weather['feels_like']}°F")
         with c2:
             st.metric("Wind", f"{weather['wind_speed']} mph", f"{weather['wind_dir']} | Gust {weather['wind_gust']}")
+        st.caption(f"Updated {int(weather['age_seconds'] // 60)} min ago")
+    else:
+        st.caption("Conditions unavailable.")
+
+    # Sync status for notes saved to the local queue
+    if note_queue:
+        sync = note_queue.counts(st.session_state.supabase_session.user.id)
+        if sync['failing']:
+            st.caption(f"📡 Sync: {sync['pending']} pending ({sync['failing']} retrying) | {sync['flushed']} uploaded")
+        else:
+            st.caption(f"📡 Sync: {sync['pending']} pending | {sync['flushed']} uploaded")
+
+    # Shared connection pool (process-wide, every session)
+    if not OFFLINE_MODE:
+        pool_stats = pool.stats()
+        st.caption(f"🔌 Pool: {pool_stats['requests']} requests | {pool_stats['reuse_rate']:.0%} on reused connections | {pool_stats['avg_ms']:.0f} ms avg")
     
     st.divider()
     st.divider()
@@ -338,7 +603,10 @@ with st.sidebar:
             st.warning("Are you sure? This will delete all data for this round.")
             if st.button("Yes, Delete Round", type="primary"):
                 try:
-                    # Delete notes first
+                    # Drop queued notes that haven't uploaded yet, then delete notes in the DB
+                    if note_queue:
+                        note_queue.discard_round(st.session_state.current_round['id'])
+                    invalidate_hole_bundles()
                     supabase.table("practice_notes").delete().eq("round_id", st.session_state.current_round['id']).execute()
                     # Delete round
                     supabase.table("rounds").delete().eq("id", st.session_state.current_round['id']).execute()
@@ -403,68 +671,36 @@ with st.sidebar:
         
         bag_data = get_bag()
         # Filter if round is active
-        if st.session_state.current_round and bag_data:
-             allowed = set(st.session_state.current_round['selected_discs'])
-             bag_data = [d for d in bag_data if d['name'] in allowed]
-             
-        if bag_data:
-            # Grouping logic
-            categories = {
-                "Putters": ["Putter", "Approach"],
-                "Mids": ["Midrange"],
-                "Fairways": ["Fairway Driver"],
-                "Distance": ["Distance Driver"]
-            }
-            
-            for cat_name, types in categories.items():
+        allowed = st.session_state.current_round['selected_discs'] if st.session_state.current_round else None
+        bag_groups = group_bag(bag_data, allowed) if bag_data else []
+
+        if any(lines for _, lines in bag_groups):
+            # Grouping logic (bag.py)
+            for cat_name, lines in bag_groups:
                 st.markdown(f"**{cat_name}**")
-                # Filter discs for this category
-                current_discs = [d for d in bag_data if d.get('disc_type') in types]
-                
-                for d in current_discs:
-                    # Format: Name (Plastic) - Speed/Glide/Turn/Fade
-                    flight_nums = f"{d.get('speed')}/{d.get('glide')}/{d.get('turn')}/{d.get('fade')}"
-                    # Handle decimals cleanly (e.g. 5.0 -> 5)
-                    flight_nums = flight_nums.replace('.0', '')
-                    
-                    note = f"• **{d['name']}** ({d.get('plastic', 'N/A')}) | *{flight_nums}*"
+                for note in lines:
                     st.caption(note)
         else:
             st.warning("No discs found in database.")
 
+        # Bag edits happen in Supabase; this drops the cached inventory for everyone
+        if st.button("🔄 Refresh Bag", use_container_width=True):
+            invalidate_bag()
+            st.rerun()
+
 # --- MAIN UI ---
 # Mobile Header (HUD) replaces the standard title
 
+# Shared course index, loaded with the startup fetches (dictionary lookup after the first load)
+course_index, course_error = startup.get("course_index", (None, None))
+
 # Calculate Dynamic Target
 # Logic: Target = -1 * floor(Attack Holes / 2)
 # "50% of attack holes under par"
+# 'layout' is defined in the sidebar (active round layout or the Start New Round radio)
 target_score = "EVEN PAR"
-try:
-    if not OFFLINE_MODE:
-        # We need to know the layout context.
-        # If a round is active, use that layout.
-        # If not, we can default to the one selected in the sidebar (but that variable might not be in scope here if sidebar run first? Yes it is)
-        # Sidebar runs top-to-bottom. 'layout' is defined in sidebar.
-        
-        # Verify layout is defined (it should be from sidebar)
-        if 'layout' in locals() or 'layout' in globals():
-             # Count Attack Holes
-             res = supabase.table("course_metadata")\
-                 .select("id", count="exact")\
-                 .eq("layout", layout)\
-                 .eq("Attack_Hole", "Yes")\
-                 .execute()
-             
-             count = res.count
-             if count is not None:
-                 target_strokes = int(count // 2) # Floor division
-                 if target_strokes > 0:
-                     target_score = f"-{target_strokes}"
-                 else:
-                     target_score = "EVEN PAR"
-except Exception as e:
-    # Fallback
-    pass
+if course_index:
+    target_score = course_index['targets'].get(layout, "EVEN PAR")
 
 st.markdown(f"**Target:** {target_score}")
 
@@ -499,15 +735,28 @@ def change_hole(delta):
 # --- FIX: Ensure hole_num is defined from session state ---
 hole_num = st.session_state.hole_input
 
+# Everything hole-specific (last note, geometry, this round's notes): one request, or none if prefetched
+hole_bundle = None
+hole_bundle_error = None
+current_round_id = st.session_state.current_round['id'] if st.session_state.current_round else None
+if not OFFLINE_MODE:
+    try:
+        hole_bundle = get_hole_bundle(layout, hole_num, current_round_id, user_id)
+    except Exception as e:
+        hole_bundle_error = e
+
 
 # --- 1. RETRIEVE RELATIONAL STRATEGY & AXIOM ---
+hole_geo = None
+basket_color = None
 try:
-    # Querying the metadata and joining the mindset_axioms table
-    resp = supabase.table("course_metadata")\
-        .select("protocol_notes, par, suggested_disc, Attack_Hole, shot_shape, execution_notes, mindset_axioms(short_name, title, corollary)")\
-        .eq("hole_number", hole_num)\
-        .eq("layout", layout)\
-        .execute()
+    # Metadata joined with mindset_axioms: served from the shared course index, else from the hole bundle
+    hole_data = course_index['holes'].get((layout, hole_num)) if course_index else None
+    if hole_data is None and hole_bundle:
+        hole_data = hole_bundle.get('protocol')
+    if hole_data is None and course_error:
+        raise course_error
+    hole_geo = course_index['geometry'].get((layout, hole_num)) if course_index else None
 
     # Defaults
     default_par = 3
@@ -516,18 +765,17 @@ try:
     suggested_shape = None
     exec_notes = None
 
-    if resp.data:
-        data = resp.data[0]
+    if hole_data:
+        data = hole_data
         # notes = data.get('protocol_notes', "") # Legacy Column
         default_par = data.get('par', 3)
         suggested_disc = data.get('suggested_disc')
         attack_hole = data.get('Attack_Hole', "No")
         suggested_shape = data.get('shot_shape')
         exec_notes = data.get('execution_notes')
-        
-        # Flattening logic: handles cases where axiom comes back as a single-item list
-        axiom_raw = data.get('mindset_axioms')
-        axiom = axiom_raw[0] if isinstance(axiom_raw, list) and len(axiom_raw) > 0 else axiom_raw
+
+        # Axiom is already flattened by load_course_index()
+        axiom = data.get('mindset_axioms')
 
         # BASKET LOGIC
         # Default: Shorts = Red, Longs = Yellow
@@ -559,6 +807,18 @@ try:
                 st.markdown(f"## Hole {hole_num} | Par {default_par} | {basket_color} Basket")
             with c_hud_2:
                 st.markdown(f"### {attack_status}")
+
+            # Hole-relative wind (table lookup, no query)
+            wind = hole_wind(hole_geo, weather)
+            if wind:
+                headwind, crosswind = wind
+                wind_label = f"Headwind {headwind:.0f}" if headwind >= 0 else f"Tailwind {-headwind:.0f}"
+                cross_label = "R→L" if crosswind >= 0 else "L→R"
+                wind_line = f"💨 {wind_label} mph | Cross {abs(crosswind):.0f} mph {cross_label}"
+                if hole_geo.get('distance_feet'):
+                    effective = plays_like(hole_geo['distance_feet'], headwind, hole_geo.get('elevation_change_feet'))
+                    wind_line += f" | Plays like **{effective:.0f} ft** ({hole_geo['distance_feet']:.0f} ft)"
+                st.markdown(wind_line)
         
         # --- PROTOCOL & STRATEGY (COLLAPSIBLE) ---
         with st.expander("📋 Protocol & Strategy", expanded=True):
@@ -583,24 +843,24 @@ except Exception as e:
     st.error(f"Error retrieving protocol: {e}")
 
 # --- MAPPER MODE INTERFACE ---
-if mapper_mode:
+# A fragment: Set Teepad/Set Basket and the GPS component rerun only this panel.
+# A saved point reruns the whole app so the hole bundle and HUD pick it up.
+@st.fragment
+def mapper_panel(hole_num, layout, basket_color, hole_bundle, hole_bundle_error):
     st.write("---")
     st.subheader("🗺️ Mapper Mode")
     
     # Display Basket Color for verification
-    st.info(f"🎯 Target Basket Color: **{basket_color}**")
+    if basket_color:
+        st.info(f"🎯 Target Basket Color: **{basket_color}**")
     
     # 1. Check if already verified
     is_verified = False
-    existing_geo = None
-    try:
-        geo_res = supabase.table("hole_geometry").select("*").eq("hole_number", hole_num).eq("layout", layout).execute()
-        if geo_res.data:
-            existing_geo = geo_res.data[0]
-            if existing_geo.get('verified'):
-                is_verified = True
-    except Exception as e:
-        st.error(f"Error checking geometry: {e}")
+    existing_geo = hole_bundle.get('geometry') if hole_bundle else None
+    if existing_geo and existing_geo.get('verified'):
+        is_verified = True
+    if hole_bundle_error:
+        st.error(f"Error checking geometry: {hole_bundle_error}")
 
     if is_verified:
         st.success(f"✅ Geometry Verified for Hole {hole_num} ({layout})")
@@ -670,6 +930,7 @@ if mapper_mode:
                     payload["elevation_change_feet"] = None
                     supabase.table("hole_geometry").insert(payload).execute()
                     
+                invalidate_hole_bundles(layout, hole_num)
                 st.toast(f"{label.capitalize()} Set! ({lat:.5f}, {lon:.5f})", icon="📍")
                 time.sleep(1)
                 st.rerun()
@@ -721,10 +982,19 @@ if mapper_mode:
                     st.session_state.mapping_basket_active = False
                     st.rerun()
 
+if mapper_mode:
+    mapper_panel(hole_num, layout, basket_color, hole_bundle, hole_bundle_error)
+
 
 # --- 2. CONDITIONAL CONTENT ---
-if not tournament_mode:
-    # --- NAVIGATION (MOVED HERE) ---
+# Panels below are fragments: a widget inside one reruns only that function, so score
+# taps, the Confidence slider and the Analysis/Export filters cost no network calls and
+# leave the rest of the page alone. Their inputs are passed in explicitly. Anything that
+# changes the hole (Prev/Next, Save & Next) calls st.rerun() for a full-app rerun.
+
+@st.fragment
+def hole_navigator():
+    """Prev/Next: the click reruns only this fragment, which then reruns the app once for the new hole."""
     c_nav_1, c_nav_2 = st.columns([1, 1])
     with c_nav_1:
         if st.button("⬅️ Prev Hole", key="nav_prev_mid", use_container_width=True):
@@ -735,174 +1005,250 @@ if not tournament_mode:
             change_hole(1)
             st.rerun()
 
-    tab1, tab2, tab3 = st.tabs(["📝 Hole Entry", "📊 Analysis", "📂 History & Export"])
-    
-    with tab1:
-        # Retrieve Last Practice result
-        db_note = None
-        if not OFFLINE_MODE:
-            try:
-                res = supabase.table("practice_notes")\
-                    .select("*")\
-                    .eq("hole_number", hole_num)\
-                    .eq("layout", layout)\
-                    .order("created_at", desc=True)\
-                    .limit(1)\
-                    .execute()
-                if res.data:
-                    db_note = res.data[0]
-            except: pass
-
-        if db_note:
-            with st.expander("🔍 Last Practice Result", expanded=False):
-                st.write(f"**Disc:** {db_note['disc_used']} | **Strokes:** {db_note.get('strokes', 'N/A')}")
-                st.markdown(f"*{db_note['notes']}*")
-
-        if st.session_state.current_round:
-            st.info(f"💾 Saving to Round: {st.session_state.current_round['name']}")
-
-        with st.container():
-            st.subheader(f"Log Practice: Hole {hole_num}")
-            
-            # --- SIMPLIFIED UI ---
-            # Removed: Disc Pills, Shot Shape Segmeted Control
-            # Added: Generic Notes Text Area
-            
-            notes_input = st.text_area("Log / Notes", placeholder="Disc used, Shot Shape, Result details...", height=150)
-            
-            st.divider()
-            
-            # 3. Big Button Scoring
-            st.caption("Score (Strokes)")
-            c_score_sub, c_score_disp, c_score_add = st.columns([1, 2, 1])
-            
-            # Callbacks for score
-            def decrement_score():
-                if st.session_state.current_score_input > 1:
-                    st.session_state.current_score_input -= 1
-            def increment_score():
-                 st.session_state.current_score_input += 1
-            
-            # Sync session state default if not set for this hole context logic (re-using old logic partially)
-            # Actually, let's just default to Par content if we changed holes?
-            # For simplicity, we stick to session state.
-            
-            with c_score_sub:
-                st.button("➖", on_click=decrement_score, use_container_width=True)
-            with c_score_disp:
-                st.markdown(f"<h1 style='text-align: center; margin: 0; padding: 0;'>{st.session_state.current_score_input}</h1>", unsafe_allow_html=True)
-            with c_score_add:
-                st.button("➕", on_click=increment_score, use_container_width=True)
-                
-            rating = st.slider("Confidence", 1, 5, 3)
-            # notes_input moved up
+@st.fragment
+def scoring_panel(hole_num, layout, hole_geo, weather, current_round):
+    """Notes, score, confidence and Save & Next. Only the save touches anything outside session state."""
+    with st.container():
+        st.subheader(f"Log Practice: Hole {hole_num}")
+        
+        # --- SIMPLIFIED UI ---
+        # Removed: Disc Pills, Shot Shape Segmeted Control
+        # Added: Generic Notes Text Area
+        
+        notes_input = st.text_area("Log / Notes", placeholder="Disc used, Shot Shape, Result details...", height=150)
+        
+        st.divider()
+        
+        # 3. Big Button Scoring
+        st.caption("Score (Strokes)")
+        c_score_sub, c_score_disp, c_score_add = st.columns([1, 2, 1])
+        
+        # Callbacks for score
+        def decrement_score():
+            if st.session_state.current_score_input > 1:
+                st.session_state.current_score_input -= 1
+        def increment_score():
+             st.session_state.current_score_input += 1
+        
+        # Sync session state default if not set for this hole context logic (re-using old logic partially)
+        # Actually, let's just default to Par content if we changed holes?
+        # For simplicity, we stick to session state.
+        
+        with c_score_sub:
+            st.button("➖", on_click=decrement_score, use_container_width=True)
+        with c_score_disp:
+            st.markdown(f"<h1 style='text-align: center; margin: 0; padding: 0;'>{st.session_state.current_score_input}</h1>", unsafe_allow_html=True)
+        with c_score_add:
+            st.button("➕", on_click=increment_score, use_container_width=True)
             
-            # --- STICKY FOOTER ---
-            # Use a container with a marker for CSS targeting
-            with st.container():
-                st.markdown('<div class="sticky-nav-marker"></div>', unsafe_allow_html=True)
-                # Centered Save Button
-                f1, f2, f3 = st.columns([1, 2, 1])
-                with f2:
-                    if st.button("✅ Save & Next", use_container_width=True, type="primary"):
-                        data_entry = {
-                            "hole_number": hole_num,
-                            "layout": layout,
-                            "disc_used": None, # Specific selection removed in Simplified UI
-                            "result_rating": rating,
-                            "strokes": st.session_state.current_score_input,
-                            "notes": notes_input, # Everything goes here
-                            "created_at": datetime.now(LOCAL_TZ).isoformat(),
-                            "round_id": st.session_state.current_round['id'] if st.session_state.current_round else None,
-                            # Auto-log Weather
-                            "temperature": weather['temp'] if weather else None,
-                            "wind_speed": weather['wind_speed'] if weather else None,
-                            "wind_gust": weather['wind_gust'] if weather else None,
-                            "wind_direction": weather['wind_dir'] if weather else None
-                        }
-                        supabase.table("practice_notes").insert(data_entry).execute()
+        rating = st.slider("Confidence", 1, 5, 3)
+        # notes_input moved up
+        
+        # --- STICKY FOOTER ---
+        # Use a container with a marker for CSS targeting
+        with st.container():
+            st.markdown('<div class="sticky-nav-marker"></div>', unsafe_allow_html=True)
+            # Centered Save Button
+            f1, f2, f3 = st.columns([1, 2, 1])
+            with f2:
+                if st.button("✅ Save & Next", use_container_width=True, type="primary"):
+                    data_entry = {
+                        "hole_number": hole_num,
+                        "layout": layout,
+                        "disc_used": None, # Specific selection removed in Simplified UI
+                        "result_rating": rating,
+                        "strokes": st.session_state.current_score_input,
+                        "notes": notes_input, # Everything goes here
+                        "created_at": datetime.now(LOCAL_TZ).isoformat(),
+                        "round_id": current_round['id'] if current_round else None,
+                        # Auto-log Weather
+                        "temperature": weather['temp'] if weather else None,
+                        "wind_speed": weather['wind_speed'] if weather else None,
+                        "wind_gust": weather['wind_gust'] if weather else None,
+                        "wind_direction": weather['wind_dir'] if weather else None
+                    }
+                    # Hole-relative wind components (None when the hole has no bearing yet)
+                    wind = hole_wind(hole_geo, weather)
+                    data_entry["headwind_mph"] = round(wind[0], 1) if wind else None
+                    data_entry["crosswind_mph"] = round(wind[1], 1) if wind else None
+                    # Journal locally; the background flusher uploads it
+                    try:
+                        note_queue.enqueue(data_entry, st.session_state.supabase_session.user.id)
+                        invalidate_hole_bundles(layout, hole_num)
+                    except Exception as e:
+                        st.error(f"Save failed: {e}")
+                    else:
                         st.toast("Hole Saved!", icon="✅")
-                        
+
                         # Auto Advance
                         change_hole(1)
-                        time.sleep(0.5)
                         st.rerun()
 
-    with tab2:
-        st.subheader("📊 Performance Review & Analysis")
-        view_layout = st.selectbox("Filter Analysis", ["Shorts (Round 1)", "Longs (Round 2)"])
-        try:
-            response = supabase.table("practice_notes").select("*").eq("layout", view_layout).execute()
-            if response.data:
-                df = pd.DataFrame(response.data)
-                col_a, col_b = st.columns(2)
-                with col_a: st.metric("Avg Strokes", f"{df['strokes'].mean():.2f}")
-                with col_b: st.metric("Entries", len(df))
-                st.write("### Disc Confidence (Avg Rating)")
-                st.bar_chart(df.groupby("disc_used")["result_rating"].mean())
-                st.write("### Stroke Trends per Hole")
-                st.line_chart(df.groupby("hole_number")["strokes"].mean())
-            else:
-                st.info("No data logged for this layout.")
-        except Exception as e:
-            st.error(f"Error loading stats: {e}")
+@st.fragment
+def analysis_panel():
+    """Server-side aggregates for one layout; the filter reruns only this panel."""
+    st.subheader("📊 Performance Review & Analysis")
+    view_layout = st.selectbox("Filter Analysis", ["Shorts (Round 1)", "Longs (Round 2)"])
+    try:
+        # Aggregated server-side (analysis_stats.sql): one row per hole / per disc
+        hole_res = supabase.table("practice_hole_stats").select("*").eq("layout", view_layout).execute()
+        if hole_res.data:
+            disc_res = supabase.table("practice_disc_stats").select("*").eq("layout", view_layout).execute()
+            summary = summarize_hole_stats(hole_res.data)
+            avg_strokes = summary['avg_strokes']
 
-    with tab3:
-        st.subheader("📂 Round History & Export")
+            col_a, col_b = st.columns(2)
+            with col_a: st.metric("Avg Strokes", f"{avg_strokes:.2f}" if avg_strokes is not None else "N/A")
+            with col_b: st.metric("Entries", summary['entries'])
+            st.write("### Disc Confidence (Avg Rating)")
+            st.bar_chart(rating_by_disc(disc_res.data or []))
+            st.write("### Stroke Trends per Hole")
+            st.line_chart(summary['strokes_by_hole'])
+        else:
+            st.info("No data logged for this layout.")
+    except Exception as e:
+        st.error(f"Error loading stats: {e}")
+
+@st.fragment
+def export_panel(course_index):
+    """Round history, JSON / bulk / Parquet exports; picking a round reruns only this panel."""
+    st.subheader("📂 Round History & Export")
+    
+    # 1. Fetch Rounds
+    if OFFLINE_MODE:
+        return
+    try:
+        rounds_res = supabase.table("rounds").select("*").order("created_at", desc=True).limit(20).execute()
+        rounds = rounds_res.data if rounds_res.data else []
         
-        # 1. Fetch Rounds
-        if not OFFLINE_MODE:
-            try:
-                rounds_res = supabase.table("rounds").select("*").order("created_at", desc=True).limit(20).execute()
-                rounds = rounds_res.data if rounds_res.data else []
+        if rounds:
+            # Select Round to Export
+            round_names = [f"{r['name']} ({r['layout']})" for r in rounds]
+            selected_round_name = st.selectbox("Select Round to Export", round_names)
+            
+            if selected_round_name:
+                # Find selected round object
+                selected_round = next(r for r in rounds if f"{r['name']} ({r['layout']})" == selected_round_name)
                 
-                if rounds:
-                    # Select Round to Export
-                    round_names = [f"{r['name']} ({r['layout']})" for r in rounds]
-                    selected_round_name = st.selectbox("Select Round to Export", round_names)
-                    
-                    if selected_round_name:
-                        # Find selected round object
-                        selected_round = next(r for r in rounds if f"{r['name']} ({r['layout']})" == selected_round_name)
-                        
-                        # Fetch notes for this round
-                        notes_res = supabase.table("practice_notes").select("*").eq("round_id", selected_round['id']).execute()
-                        round_data = {
-                            "round_info": selected_round,
-                            "shots": notes_res.data if notes_res.data else []
-                        }
-                        
-                        st.write("### Round Data (JSON)")
-                        import json
-                        json_str = json.dumps(round_data, indent=2, default=str)
-                        st.code(json_str, language="json")
-                        
-                        st.download_button(
-                            label="📥 Download JSON",
-                            data=json_str,
-                            file_name=f"{selected_round['name']}.json",
-                            mime="application/json"
-                        )
-                        
-                    st.divider()
-                    st.write("### Bulk Export (Last 50 Rounds)")
-                    if st.button("Generate Bulk Export"):
-                        # Fetch all recent rounds + notes
-                        # Note: This is a heavy query, keeping it simple for now
-                        all_rounds = supabase.table("rounds").select("*, practice_notes(*)").order("created_at", desc=True).limit(50).execute()
-                        
-                        if all_rounds.data:
-                            bulk_json = json.dumps(all_rounds.data, indent=2, default=str)
-                            st.download_button(
-                                label="📥 Download Bulk Export",
-                                data=bulk_json,
-                                file_name=f"mks_bulk_export_{datetime.now().strftime('%Y%m%d')}.json",
-                                mime="application/json"
-                            )
+                # Fetch notes for this round
+                notes_res = supabase.table("practice_notes").select("*").eq("round_id", selected_round['id']).execute()
+                round_data = {
+                    "round_info": selected_round,
+                    "shots": notes_res.data if notes_res.data else []
+                }
+                
+                st.write("### Round Data (JSON)")
+                import json
+                json_str = json.dumps(round_data, indent=2, default=str)
+                # Preview only; the full document is in the download
+                st.code(preview_text(json_str), language="json")
+                
+                st.download_button(
+                    label="📥 Download JSON",
+                    data=json_str,
+                    file_name=f"{selected_round['name']}.json",
+                    mime="application/json"
+                )
+                
+            st.divider()
+            st.write("### Bulk Export (All Rounds)")
+            st.caption("One round per line (NDJSON), gzip-compressed.")
+            if st.button("Generate Bulk Export"):
+                # Rounds + notes paged by (created_at, id) and streamed into gzip
+                with st.spinner("Exporting rounds..."):
+                    bulk_export, round_count = export_rounds_ndjson_gz(supabase)
+
+                if round_count:
+                    st.download_button(
+                        label=f"📥 Download Bulk Export ({round_count} rounds)",
+                        data=bulk_export,
+                        file_name=f"mks_bulk_export_{datetime.now().strftime('%Y%m%d')}.ndjson.gz",
+                        mime="application/gzip"
+                    )
+
+            st.divider()
+            st.write("### Shot History (Parquet)")
+            st.caption("Every shot with round, protocol and weather columns, for pandas/DuckDB.")
+            if st.button("Generate Parquet Export"):
+                # Par / attack flag / suggested disc come from the cached course index
+                course_holes = course_index['holes'] if course_index else {}
+                with st.spinner("Exporting shots..."):
+                    shots_export, shot_count = export_shots_parquet(supabase, course_holes)
+
+                if shot_count:
+                    st.download_button(
+                        label=f"📥 Download Parquet ({shot_count} shots)",
+                        data=shots_export,
+                        file_name=f"mks_shots_{datetime.now().strftime('%Y%m%d')}.parquet",
+                        mime="application/vnd.apache.parquet"
+                    )
                 else:
-                    st.info("No rounds recorded yet.")
-            except Exception as e:
-                st.error(f"Error fetching history: {e}")
+                    st.info("No shots recorded yet.")
+        else:
+            st.info("No rounds recorded yet.")
+    except Exception as e:
+        st.error(f"Error fetching history: {e}")
+
+if not tournament_mode:
+    # --- NAVIGATION (MOVED HERE) ---
+    hole_navigator()
+
+    # Lazy tabs: only the selected tab's body runs, so Hole Entry never pays for Analysis/Export queries
+    tab1, tab2, tab3 = st.tabs(["📝 Hole Entry", "📊 Analysis", "📂 History & Export"], key="main_tab", on_change="rerun")
+    
+    if tab1.open:
+        with tab1:
+            # Last Practice result (from the hole bundle)
+            db_note = hole_bundle.get('last_note') if hole_bundle else None
+
+            if db_note:
+                with st.expander("🔍 Last Practice Result", expanded=False):
+                    st.write(f"**Disc:** {db_note['disc_used']} | **Strokes:** {db_note.get('strokes', 'N/A')}")
+                    st.markdown(f"*{db_note['notes']}*")
+
+            if st.session_state.current_round:
+                st.info(f"💾 Saving to Round: {st.session_state.current_round['name']}")
+
+                round_notes = hole_bundle.get('round_notes') if hole_bundle else None
+                if round_notes:
+                    with st.expander(f"🗒️ This Round: {len(round_notes)} saved", expanded=False):
+                        for note in round_notes:
+                            st.caption(f"**Strokes:** {note.get('strokes', 'N/A')} | {note.get('notes') or ''}")
+
+            scoring_panel(hole_num, layout, hole_geo, weather, st.session_state.current_round)
+
+    if tab2.open:
+        with tab2:
+            analysis_panel()
+
+    if tab3.open:
+        with tab3:
+            export_panel(course_index)
 
 else:
     st.success("🏆 Tournament Mode Active. Focus on the Axioms. Execution only.")
+
+# --- PREFETCH ---
+# The hole is on screen: warm the neighbouring holes for the next tap
+if not OFFLINE_MODE and hole_bundle is not None:
+    prefetch_hole_bundles(layout, hole_num, current_round_id, user_id)
+
+# --- DEBUG: SUPABASE CALLS ---
+# Rendered last so it covers this whole rerun (prefetch calls land in it as they finish)
+if DEBUG_PANEL:
+    with st.sidebar.expander("🐞 Debug: Supabase Calls", expanded=False):
+        rerun_stats = call_log.summary()
+        session_stats = st.session_state.supabase_calls.summary()
+        st.caption(f"This rerun: {rerun_stats['calls']} calls | {rerun_stats['ms']:.0f} ms | {rerun_stats['bytes'] / 1024:.1f} KB | {rerun_stats['errors']} errors")
+        st.caption(f"Session: {session_stats['reruns']} reruns | {session_stats['calls']} calls ({session_stats['calls_per_rerun']:.1f}/rerun) | {session_stats['errors']} errors")
+
+        for kind, target, detail, count in call_log.repeated():
+            st.warning(f"Repeated {count}x: {kind} {target} {detail}")
+
+        calls = call_log.snapshot()
+        if calls:
+            st.dataframe(
+                pd.DataFrame(calls)[["thread", "kind", "target", "detail", "ms", "bytes", "error"]],
+                hide_index=True,
+                use_container_width=True
+            )
@@ -0,0 +1,193 @@
+import math
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+# Loriella Park conditions from Open-Meteo.
+# WeatherService keeps the last good snapshot in memory and refreshes it from a
+# background thread, so callers never wait on the network (except for a short,
+# bounded wait on a cold start).
+
+LORIELLA_LAT = 38.2544
+LORIELLA_LON = -77.5443
+
+FORECAST_URL = f"https://api.open-meteo.com/v1/forecast?latitude={LORIELLA_LAT}&longitude={LORIELLA_LON}&current=temperature_2m,apparent_temperature,wind_speed_10m,wind_direction_10m,wind_gusts_10m&temperature_unit=fahrenheit&wind_speed_unit=mph&precipitation_unit=inch"
+
+CONNECT_TIMEOUT = 3.05   # Seconds to establish the connection
+READ_TIMEOUT = 5         # Seconds to wait for the response body
+REFRESH_INTERVAL = 300   # Refresh every 5 min (data was previously cached for 10)
+RETRY_INTERVAL = 60      # Retry sooner after a failed refresh
+
+COMPASS = ["N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE", "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"]
+
+
+def get_wind_direction(degrees):
+    index = round(degrees / (360. / len(COMPASS))) % len(COMPASS)
+    return COMPASS[index]
+
+
+def compass_degrees(direction):
+    """Compass point ("NNE") -> degrees the wind blows from."""
+    return COMPASS.index(direction) * (360. / len(COMPASS))
+
+
+# --- HOLE-RELATIVE WIND ---
+# Rule of thumb: a headwind costs ~1% of distance per mph, a tailwind gives back about half that.
+HEADWIND_FACTOR = 0.01
+TAILWIND_FACTOR = 0.005
+
+
+def wind_components(wind_speed, wind_from_deg, bearing_deg):
+    """Split wind into (headwind, crosswind) along a throw toward `bearing_deg`.
+
+    Headwind > 0 blows into the thrower's face (< 0 is a tailwind);
+    crosswind > 0 comes from the right (pushes the disc left).
+    """
+    angle = math.radians(wind_from_deg - bearing_deg)
+    return wind_speed * math.cos(angle), wind_speed * math.sin(angle)
+
+
+def wind_table(bearing_deg):
+    """Unit (headwind, crosswind) for all 16 compass directions on one hole.
+
+    Built once per hole with the course index; scaling by the live wind speed is
+    then a dictionary lookup per rerun.
+    """
+    return {direction: wind_components(1.0, compass_degrees(direction), bearing_deg) for direction in COMPASS}
+
+
+def plays_like(distance_feet, headwind, elevation_change_feet=None):
+    """Effective distance: wind-adjusted, plus the climb (or minus the drop) to the basket."""
+    factor = HEADWIND_FACTOR if headwind > 0 else TAILWIND_FACTOR
+    effective = distance_feet * (1 + factor * headwind)
+    if elevation_change_feet is not None:
+        effective += elevation_change_feet
+    return effective
+
+
+def parse_current(data):
+    """Turn an Open-Meteo `current` payload into the app's weather dict."""
+    current = data['current']
+    return {
+        "temp": round(current['temperature_2m']),
+        "feels_like": round(current['apparent_temperature']),
+        "wind_speed": round(current['wind_speed_10m']),
+        "wind_gust": round(current['wind_gusts_10m']),
+        "wind_dir": get_wind_direction(current['wind_direction_10m'])
+    }
+
+
+class WeatherService:
+    """Stale-while-revalidate weather snapshot with a background refresher."""
+
+    def __init__(self, url=FORECAST_URL, refresh_interval=REFRESH_INTERVAL,
+                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.last_error = None
+
+        self._http = requests.Session()
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._fetched_at = None
+        self._first_attempt = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the background refresher (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="mks-weather", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def refresh(self):
+        """Fetch once; keeps the previous snapshot on failure. Returns True on success."""
+        try:
+            response = self._http.get(self.url, timeout=self.timeout)
+            response.raise_for_status()
+            snapshot = parse_current(response.json())
+        except Exception as e:
+            self.last_error = str(e)
+            return False
+        finally:
+            self._first_attempt.set()
+
+        with self._lock:
+            self._snapshot = snapshot
+            self._fetched_at = time.time()
+        self.last_error = None
+        return True
+
+    def get(self, wait=0):
+        """Return the latest snapshot plus `age_seconds`, or None if nothing has loaded.
+
+        `wait` bounds how long to block for the very first fetch.
+        """
+        if wait and not self._first_attempt.is_set():
+            self._first_attempt.wait(wait)
+        with self._lock:
+            if self._snapshot is None:
+                return None
+            return dict(self._snapshot, age_seconds=time.time() - self._fetched_at)
+
+    def _run(self):
+        while not self._stop.is_set():
+            ok = self.refresh()
+            self._stop.wait(self.refresh_interval if ok else RETRY_INTERVAL)
+
+
+# --- HOURLY SERIES (ARCHIVE BACKFILL) ---
+ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+HOURLY_FIELDS = "temperature_2m,wind_speed_10m,wind_gusts_10m,wind_direction_10m"
+
+
+def archive_params(day, timezone="America/New_York"):
+    """Query params for one local day of hourly history at Loriella Park."""
+    return {
+        "latitude": LORIELLA_LAT,
+        "longitude": LORIELLA_LON,
+        "start_date": day,
+        "end_date": day,
+        "hourly": HOURLY_FIELDS,
+        "temperature_unit": "fahrenheit",
+        "wind_speed_unit": "mph",
+        "timezone": timezone
+    }
+
+
+def parse_hourly(data):
+    """Turn an Open-Meteo `hourly` payload into a list of (naive local datetime, weather dict).
+
+    Hours with missing readings are skipped.
+    """
+    hourly = data.get('hourly') or {}
+    series = []
+    for i, stamp in enumerate(hourly.get('time', [])):
+        values = [hourly[field][i] for field in HOURLY_FIELDS.split(",")]
+        if any(v is None for v in values):
+            continue
+        temp, speed, gust, direction = values
+        series.append((datetime.fromisoformat(stamp), {
+            "temperature": round(temp),
+            "wind_speed": round(speed),
+            "wind_gust": round(gust),
+            "wind_direction": get_wind_direction(direction)
+        }))
+    return series
+
+
+def nearest_hour(series, when):
+    """Weather dict from `series` closest to `when` (naive local time), or None."""
+    if not series:
+        return None
+    return min(series, key=lambda item: abs((item[0] - when).total_seconds()))[1]